@@ -0,0 +1,213 @@
+"""
+네트워크 없이 LLM 호출을 흉내 내는 가짜 chat model (오프라인 벤치마크용)
+
+프롬프트 종류(번역, 자기소개서 생성, main 답변 생성, 문장 패치)를 구분해 그럴듯한 길이의 응답과
+토큰 사용량을 돌려주며, 지연 시간과 길이 분포는 FakeModelProfile로 조절한다.
+"""
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# 로컬 길이 조정(축약, 부사 제거)이 동작할 수 있도록 본딧말과 부사를 섞은 문장
+KOREAN_SENTENCES = [
+    "저는 데이터 분석 프로젝트에서 팀원들과 함께 문제를 정의하였습니다.",
+    "특히 고객 이탈 원인을 찾기 위해 매우 많은 로그를 직접 정리하였습니다.",
+    "그 결과 핵심 지표를 정말 빠르게 개선할 수 있었습니다.",
+    "이 경험을 통해 협업과 소통의 중요성을 배우게 되었습니다.",
+    "또한 실패한 실험도 기록으로 남겨 다음 과제에 활용하였습니다.",
+    "입사 후에도 주도적으로 문제를 찾고 해결하는 인재가 되겠습니다.",
+    "당시 일정이 너무 촉박하였지만 역할을 나누어 끝까지 완수하였습니다.",
+    "고객의 불편을 줄이는 것이 가장 중요한 목표였습니다.",
+]
+ENGLISH_WORDS = ("the applicant should write a cover letter about their experience with data analysis "
+                 "teamwork communication and growth in a professional environment").split()
+
+ANSWER_LIMIT_PATTERN = re.compile(r'최대 (\d+)자 이내이며, 최소 (\d+)자')
+PATCH_DELTA_PATTERN = re.compile(r'약 (-?\d+)자를 (줄여|늘려)')
+PATCH_LINE_PATTERN = re.compile(r'^\[(\d+)\] \((\d+)자\) (.*)$', re.MULTILINE)
+QUESTION_LIMIT_PATTERN = re.compile(r'(\d{1,2}(?:,\d{3})+|\d+)\s*(?:자|characters)')
+
+
+def korean_text(length, rng):
+    """length자에 가까운 한국어 답변 (문장 단위로 잇고 마지막 문장을 잘라 맞춘다)"""
+    sentences = []
+    current = 0
+    while current < length:
+        sentence = rng.choice(KOREAN_SENTENCES)
+        sentences.append(sentence)
+        current += len(sentence) + 1
+    text = " ".join(sentences)
+    if len(text) > length:
+        text = text[:max(1, length - 1)].rstrip() + "."
+    return text
+
+
+def english_text(length, rng):
+    words = []
+    current = 0
+    while current < length:
+        word = rng.choice(ENGLISH_WORDS)
+        words.append(word)
+        current += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def _message_text(message):
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+@dataclass
+class FakeModelProfile:
+    """가짜 모델의 응답 특성
+
+    latency_ms: 응답 전체 지연 시간의 중앙값 (로그정규분포, latency_sigma로 퍼짐 조절)
+    first_token_ms: 스트리밍 첫 조각까지의 지연 시간
+    chars_per_token: 한국어 답변의 토큰당 글자 수 (영어는 4자로 계산)
+    length_ratio_mean, length_ratio_sd: 요청한 최대 길이 대비 첫 답변 길이 비율의 평균과 표준편차
+    correction_sd: 수정 요청(재작성/패치)에서 목표 길이를 벗어나는 정도 (목표 길이 대비 표준편차)
+    """
+    latency_ms: float = 800
+    latency_sigma: float = 0.3
+    first_token_ms: float = 300
+    chars_per_token: float = 1.2
+    length_ratio_mean: float = 0.97
+    length_ratio_sd: float = 0.05
+    correction_sd: float = 0.01
+    default_length: int = 1000
+    seed: Optional[int] = None
+    calls: Counter = field(default_factory=Counter)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def latency(self):
+        with self._lock:
+            return self.latency_ms / 1000 * self._rng.lognormvariate(0, self.latency_sigma)
+
+    def record(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+
+    def respond(self, prompt):
+        """프롬프트 종류에 맞는 응답 텍스트와 종류를 반환하는 함수"""
+        with self._lock:
+            rng = random.Random(self._rng.random())
+        if "Translate the following prompt into English" in prompt:
+            return english_text(int(len(prompt) * 1.3), rng), "translation"
+        if "JSON 배열" in prompt:
+            return self._patch(prompt, rng), "patch"
+        limit = ANSWER_LIMIT_PATTERN.search(prompt)
+        if limit:
+            max_length, lower_bound = int(limit.group(1)), int(limit.group(2))
+            if "이전 답변" in prompt or "현재 생성된 답변" in prompt:
+                target = rng.gauss((max_length + lower_bound) / 2, max_length * self.correction_sd)
+            else:
+                target = rng.gauss(max_length * self.length_ratio_mean, max_length * self.length_ratio_sd)
+            return korean_text(max(1, round(target)), rng), "answer"
+        match = QUESTION_LIMIT_PATTERN.search(prompt)
+        max_length = int(match.group(1).replace(",", "")) if match else self.default_length
+        target = rng.gauss(max_length * self.length_ratio_mean, max_length * self.length_ratio_sd)
+        return korean_text(max(1, round(target)), rng), "cover_letter"
+
+    def _patch(self, prompt, rng):
+        """가장 긴 문장 하나를 요청한 만큼 (약간의 오차와 함께) 줄이거나 늘리는 패치"""
+        delta_match = PATCH_DELTA_PATTERN.search(prompt)
+        lines = PATCH_LINE_PATTERN.findall(prompt)
+        if not delta_match or not lines:
+            return "[]"
+        delta = int(delta_match.group(1)) * (-1 if delta_match.group(2) == "줄여" else 1)
+        number, length, _ = max(lines, key=lambda line: int(line[1]))
+        error = rng.gauss(0, max(1.0, abs(delta) * self.correction_sd * 10))
+        new_length = max(5, int(length) + delta + round(error))
+        return json.dumps([{"op": "replace", "index": int(number), "text": korean_text(new_length, rng)}],
+                          ensure_ascii=False)
+
+    def tokens(self, text):
+        if not text:
+            return 0
+        ascii_chars = sum(1 for char in text if ord(char) < 128)
+        return max(1, round(ascii_chars / 4 + (len(text) - ascii_chars) / self.chars_per_token))
+
+
+def snapshot_model_name(model):
+    """실제 API처럼 응답 model_name에 스냅샷 날짜를 붙인 이름을 반환하는 함수"""
+    if model.endswith("-latest"):
+        return model[:-len("-latest")] + "-20250219"
+    return f"{model}-2024-08-06"
+
+
+class FakeChatModel(BaseChatModel):
+    """FakeModelProfile로 응답을 만드는 LangChain chat model"""
+    model: str = "fake"
+    behavior: Any = None
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def _respond(self, messages):
+        prompt = "\n".join(_message_text(message) for message in messages)
+        text, kind = self.behavior.respond(prompt)
+        self.behavior.record(kind)
+        completion_tokens = self.behavior.tokens(text)
+        if self.max_tokens and completion_tokens > self.max_tokens:
+            # max_tokens에서 잘린 응답을 흉내 낸다
+            text = text[:int(len(text) * self.max_tokens / completion_tokens)]
+            completion_tokens = self.max_tokens
+            self.behavior.record("truncated")
+        prompt_tokens = self.behavior.tokens(prompt)
+        usage = {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        metadata = {"token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                    "total_tokens": prompt_tokens + completion_tokens},
+                    "model_name": snapshot_model_name(self.model), "model": snapshot_model_name(self.model)}
+        return text, usage, metadata
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text, usage, metadata = self._respond(messages)
+        time.sleep(self.behavior.latency())
+        message = AIMessage(content=text, usage_metadata=usage, response_metadata=metadata)
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output=metadata)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text, usage, metadata = self._respond(messages)
+        await asyncio.sleep(self.behavior.latency())
+        message = AIMessage(content=text, usage_metadata=usage, response_metadata=metadata)
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output=metadata)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        text, usage, metadata = self._respond(messages)
+        total = self.behavior.latency()
+        first_token = min(total, self.behavior.first_token_ms / 1000)
+        time.sleep(first_token)
+        pieces: List[str] = [text[index:index + 8] for index in range(0, len(text), 8)] or [""]
+        per_piece = (total - first_token) / len(pieces)
+        for index, piece in enumerate(pieces):
+            last = index == len(pieces) - 1
+            chunk = AIMessageChunk(content=piece, usage_metadata=usage if last else None,
+                                   response_metadata=metadata if last else {})
+            yield ChatGenerationChunk(message=chunk)
+            time.sleep(per_piece)
+
+
+def fake_model_factory(profile):
+    """use_llm.client_registry.create_chat_model 대신 쓸 가짜 모델 생성 함수"""
+    def factory(provider, model, temperature=None, max_tokens=None, **kwargs):
+        return FakeChatModel(model=model, behavior=profile, temperature=temperature, max_tokens=max_tokens)
+    return factory
@@ -0,0 +1,266 @@
+"""
+Google Sheets v4 REST API의 로컬 대역 서버 (오프라인 벤치마크용)
+
+GoogleSheet가 쓰는 요청만 지원한다.
+    GET  /v4/spreadsheets/{id}                    메타데이터 (sheets.properties)
+    GET  /v4/spreadsheets/{id}/values/{range}     values().get
+    GET  /v4/spreadsheets/{id}/values:batchGet    values().batchGet
+    PUT  /v4/spreadsheets/{id}/values/{range}     values().update
+    POST /v4/spreadsheets/{id}/values:batchUpdate values().batchUpdate
+    POST /v4/spreadsheets/{id}:batchUpdate        insertDimension, updateCells
+
+sheet.modify_sheet.get_sheets_service를 sheets_service_factory(server.url)로 바꾸면 실제 googleapiclient가
+인증 없이 이 서버로 요청한다.
+"""
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+A1_PATTERN = re.compile(r'^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$')
+GRID_ROWS = 1000
+GRID_COLUMNS = 26
+
+
+def sheets_service_factory(server_url):
+    """sheet.sheet_service.get_sheets_service 대신 쓸, 로컬 서버로 요청하는 service 생성 함수를 반환하는 함수
+
+    실제 구현처럼 httplib2.Http를 스레드 간에 공유하지 않도록 service는 스레드별로 만든다.
+    """
+    local = threading.local()
+
+    def get_sheets_service(service_account_file=None, scopes=None):
+        service = getattr(local, 'service', None)
+        if service is None:
+            from googleapiclient.discovery import build
+            import httplib2
+            service = local.service = build('sheets', 'v4', http=httplib2.Http(), cache_discovery=False,
+                                            client_options={'api_endpoint': server_url})
+        return service
+    return get_sheets_service
+
+
+def column_index(letters):
+    index = 0
+    for char in letters:
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index - 1
+
+
+def parse_range(a1):
+    """'sheet!B2:F' 같은 A1 표기를 (시트 이름, 시작 행, 시작 열, 끝 행, 끝 열)로 변환하는 함수
+
+    행/열은 0부터 시작하며, 범위가 열려 있으면 끝 값은 None이다.
+    """
+    sheet_name, _, cells = a1.partition('!')
+    sheet_name = sheet_name.strip("'")
+    match = A1_PATTERN.match(cells.upper())
+    if not cells or match is None:
+        return sheet_name, 0, 0, None, None
+    start_column, start_row, end_column, end_row = match.groups()
+    start_row_index = int(start_row) - 1 if start_row else 0
+    start_column_index = column_index(start_column) if start_column else 0
+    if end_column is None and end_row is None:
+        # 'A2'처럼 셀 하나이거나 'B'처럼 열 하나
+        end_row_index = start_row_index if start_row else None
+        end_column_index = start_column_index if start_column else None
+    else:
+        end_row_index = int(end_row) - 1 if end_row else None
+        end_column_index = column_index(end_column) if end_column else None
+    return sheet_name, start_row_index, start_column_index, end_row_index, end_column_index
+
+
+def _cell_value(cell):
+    value = cell.get('userEnteredValue') or {}
+    for key in ('stringValue', 'numberValue', 'boolValue', 'formulaValue'):
+        if key in value:
+            return value[key]
+    return None
+
+
+def _formatted(value):
+    """FORMATTED_VALUE 응답처럼 셀 값을 문자열로 만든다"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class MockSpreadsheet:
+    """시트 이름 -> 행 목록(각 행은 값 목록)을 보관하는 스프레드시트"""
+
+    def __init__(self):
+        self.sheets = {}
+        self.sheet_ids = {}
+
+    def add_sheet(self, title, rows=None):
+        self.sheet_ids[title] = len(self.sheet_ids) + 1
+        self.sheets[title] = [list(row) for row in rows or []]
+
+    def title_of(self, sheet_id):
+        for title, known_id in self.sheet_ids.items():
+            if known_id == sheet_id:
+                return title
+        raise KeyError(f"No grid with id: {sheet_id}")
+
+    def read(self, a1):
+        sheet_name, start_row, start_column, end_row, end_column = parse_range(a1)
+        rows = self.sheets[sheet_name]
+        end_row = len(rows) - 1 if end_row is None else min(end_row, len(rows) - 1)
+        values = []
+        for row in rows[start_row:end_row + 1]:
+            last = len(row) - 1 if end_column is None else end_column
+            cells = [_formatted(value) for value in row[start_column:last + 1]]
+            while cells and cells[-1] == '':
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def write(self, sheet_name, row_index, column_index, values):
+        rows = self.sheets[sheet_name]
+        for row_offset, row_values in enumerate(values):
+            target = row_index + row_offset
+            while len(rows) <= target:
+                rows.append([])
+            row = rows[target]
+            for column_offset, value in enumerate(row_values):
+                column = column_index + column_offset
+                while len(row) <= column:
+                    row.append(None)
+                if value is not None:
+                    row[column] = value
+
+    def write_range(self, a1, values):
+        sheet_name, start_row, start_column, _, _ = parse_range(a1)
+        self.write(sheet_name, start_row, start_column, values)
+
+    def metadata(self):
+        return {'sheets': [
+            {'properties': {'sheetId': sheet_id, 'title': title,
+                            'gridProperties': {'rowCount': max(GRID_ROWS, len(self.sheets[title])),
+                                               'columnCount': GRID_COLUMNS}}}
+            for title, sheet_id in self.sheet_ids.items()]}
+
+    def batch_update(self, requests):
+        for request in requests:
+            if 'insertDimension' in request:
+                dimension = request['insertDimension']['range']
+                rows = self.sheets[self.title_of(dimension['sheetId'])]
+                for _ in range(dimension['endIndex'] - dimension['startIndex']):
+                    rows.insert(dimension['startIndex'], [])
+            elif 'updateCells' in request:
+                update = request['updateCells']
+                start = update['start']
+                values = [[_cell_value(cell) for cell in row.get('values', [])] for row in update.get('rows', [])]
+                self.write(self.title_of(start['sheetId']), start.get('rowIndex', 0), start.get('columnIndex', 0), values)
+            else:
+                raise ValueError(f"Unsupported request: {list(request)}")
+        return {'replies': [{} for _ in requests]}
+
+
+class MockSheetsServer:
+    """MockSpreadsheet들을 Sheets v4 REST 형식으로 제공하는 로컬 HTTP 서버
+
+    latency_ms만큼 요청마다 지연시켜 실제 API 왕복 시간을 흉내 내고, 요청 종류별 호출 수를 calls에 센다.
+    """
+
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000
+        self.spreadsheets = {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def spreadsheet(self, spreadsheet_id):
+        if spreadsheet_id not in self.spreadsheets:
+            self.spreadsheets[spreadsheet_id] = MockSpreadsheet()
+        return self.spreadsheets[spreadsheet_id]
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, method):
+                time.sleep(server.latency)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+                try:
+                    name, payload = server.handle(method, self.path, body)
+                    status = 200
+                except KeyError as e:
+                    name, payload, status = 'error', {'error': {'code': 400, 'message': str(e)}}, 400
+                with server._lock:
+                    server.calls[name] += 1
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_PUT(self):
+                self._respond('PUT')
+
+            def do_POST(self):
+                self._respond('POST')
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-sheets', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def handle(self, method, path, body):
+        """(호출 이름, 응답 JSON)을 반환하는 함수"""
+        parts = urlsplit(path)
+        query = parse_qs(parts.query)
+        route = unquote(parts.path)
+        match = re.match(r'^/v4/spreadsheets/([^/:]+)(.*)$', route)
+        if match is None:
+            raise KeyError(f"Unknown path: {route}")
+        spreadsheet_id, rest = match.groups()
+        with self._lock:
+            spreadsheet = self.spreadsheet(spreadsheet_id)
+            if method == 'GET' and rest == '':
+                return 'spreadsheets.get', spreadsheet.metadata()
+            if method == 'GET' and rest == '/values:batchGet':
+                return 'values.batchGet', {'valueRanges': [
+                    {'range': a1, 'values': spreadsheet.read(a1)} for a1 in query.get('ranges', [])]}
+            if method == 'GET' and rest.startswith('/values/'):
+                a1 = rest[len('/values/'):]
+                return 'values.get', {'range': a1, 'values': spreadsheet.read(a1)}
+            if method == 'PUT' and rest.startswith('/values/'):
+                spreadsheet.write_range(rest[len('/values/'):], body.get('values', []))
+                return 'values.update', {}
+            if method == 'POST' and rest == '/values:batchUpdate':
+                for value_range in body.get('data', []):
+                    spreadsheet.write_range(value_range['range'], value_range.get('values', []))
+                return 'values.batchUpdate', {}
+            if method == 'POST' and rest == ':batchUpdate':
+                return 'spreadsheets.batchUpdate', spreadsheet.batch_update(body.get('requests', []))
+        raise KeyError(f"Unsupported request: {method} {route}")
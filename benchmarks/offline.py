@@ -0,0 +1,362 @@
+"""
+네트워크 없이 단계별 지연 시간, API 호출 수, 길이 맞추기 시도 수를 측정하는 오프라인 벤치마크
+
+가짜 chat model(benchmarks.fake_llm)과 로컬 Sheets 서버(benchmarks.mock_sheets)를 띄운 뒤
+실제 코드 경로(use_llm.generate, main.generate_answer, GoogleSheet, pipeline)를 그대로 실행한다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.offline                              # 모든 시나리오
+    python -m benchmarks.offline answer --runs 20 --candidates 4
+    python -m benchmarks.offline sheets evaluation --sheets-latency-ms 150 --json .cache/offline.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_llm import FakeModelProfile, fake_model_factory, korean_text  # noqa: E402
+from benchmarks.mock_sheets import MockSheetsServer, column_index, sheets_service_factory  # noqa: E402
+
+SCENARIOS = ('translate', 'cover_letter', 'answer', 'sheets', 'evaluation', 'batch')
+SPREADSHEET_IDS = {'motivation': 'offline-motivation', 'core_experience': 'offline-core-experience',
+                   'cost': 'offline-cost'}
+
+# cost 시트 가격 (토큰당 USD)
+MODEL_PRICES = {
+    'gpt-4o': ('0.0000025', '0.00001'),
+    'gpt-4o-mini': ('0.00000015', '0.0000006'),
+    'o1-mini': ('0.0000011', '0.0000044'),
+    'claude-3-7-sonnet-latest': ('0.000003', '0.000015'),
+}
+# model_setting 시트 행 (model, temperature, max_tokens, thinking, budget_tokens)
+MODEL_SETTINGS = [
+    ('gpt-4o', '1', '4000', 'off', ''),
+    ('gpt-4o-mini', '1', '4000', 'off', ''),
+    ('claude-3-7-sonnet-latest', '1', '4000', 'off', '1024'),
+]
+QUESTION = "지원 동기와 입사 후 포부를 작성해 주세요. (1,000자 이내)"
+
+
+def sheet_values(purpose, seed=0):
+    """purpose 스프레드시트의 설정 항목별 값 (DATA_CONFIG의 각 열 두 번째 행에 들어간다)"""
+    rng = random.Random(seed)
+    prompt_structure = (
+        "역할: {role}\n\n상황: {situation}\n\n채용 공고:\n{job_posting}\n\n핵심 경험:\n{core_experience}\n\n"
+        "참고 지식:\n{knowledge}\n\n문항: {question}\n\n보완할 점: {issue}"
+    )
+    return {
+        'situation': "{company}의 {job} 직무에 지원하는 상황입니다.",
+        'role': "당신은 채용 담당자의 시선으로 자기소개서를 쓰는 전문 컨설턴트입니다.",
+        'knowledge': korean_text(300, rng),
+        'company': "오프라인전자",
+        'job': "데이터 분석",
+        # PROMPT_CACHE=on으로 실행할 때 캐시 대상이 되도록 고정 앞부분을 PROMPT_CACHE_MIN_TOKENS보다 길게 만든다
+        'job_posting': korean_text(900, rng),
+        'core_experience': korean_text(500, rng),
+        'question': QUESTION,
+        'issue': "구체적인 수치를 더 넣어 주세요." if purpose == 'motivation' else None,
+        'prompt_structure': prompt_structure,
+        'translation_model': 'gpt-4o-mini',
+        'translation_temperature': '0',
+    }
+
+
+def seed_sheets(server, purpose, seed=0):
+    """로컬 Sheets 서버에 purpose 스프레드시트와 cost 스프레드시트를 만드는 함수"""
+    from sheet.modify_sheet import DATA_CONFIG
+
+    values = sheet_values(purpose, seed)
+    sheets = defaultdict(lambda: [[], []])
+    for data_type, config in DATA_CONFIG[purpose].items():
+        if config['sheet'] == 'model_setting':
+            # model_setting 시트는 아래에서 여러 행으로 만든다 (load_config는 마지막 행을 쓴다)
+            continue
+        column = column_index(config['column'].split(':')[0])
+        header, row = sheets[config['sheet']]
+        for target in (header, row):
+            target.extend([''] * (column + 1 - len(target)))
+        header[column] = data_type
+        row[column] = values[data_type] or ''
+
+    spreadsheet = server.spreadsheet(SPREADSHEET_IDS[purpose])
+    for sheet_name, rows in sheets.items():
+        spreadsheet.add_sheet(sheet_name, rows)
+    spreadsheet.add_sheet('model_setting', [['', 'model', 'temperature', 'max_tokens', 'thinking', 'budget_tokens']]
+                          + [[''] + list(setting) for setting in MODEL_SETTINGS])
+    spreadsheet.add_sheet('evaluation', [['index'], [0]])
+
+    cost = server.spreadsheet(SPREADSHEET_IDS['cost'])
+    if 'cost' not in cost.sheets:
+        cost.add_sheet('cost', [['', 'model'] + [''] * 6 + ['input', 'output']]
+                       + [['', model] + [''] * 6 + list(prices) for model, prices in MODEL_PRICES.items()])
+
+
+def configure_environment(cache_dir):
+    """저장소 모듈을 불러오기 전에 스프레드시트 ID와 임시 캐시 경로를 환경 변수로 지정하는 함수
+
+    이미 설정된 값은 덮어쓰지 않으므로 RATE_LIMIT_SHEETS 등을 직접 지정해 비교할 수 있다.
+    """
+    os.environ['MOTIVATION_SPREADSHEET_ID'] = SPREADSHEET_IDS['motivation']
+    os.environ['CORE_EXPERIENCE_SPREADSHEET_ID'] = SPREADSHEET_IDS['core_experience']
+    os.environ['COST_SPREADSHEET_ID'] = SPREADSHEET_IDS['cost']
+    os.environ.setdefault('RUN_STORE_PATH', os.path.join(cache_dir, 'runs.sqlite3'))
+    os.environ.setdefault('TRANSLATION_CACHE_PATH', os.path.join(cache_dir, 'translation_cache.sqlite3'))
+    os.environ.setdefault('TOKEN_BUDGET_PATH', os.path.join(cache_dir, 'token_budget.json'))
+    os.environ.setdefault('EXCHANGE_RATE_CACHE_FILE', os.path.join(cache_dir, 'exchange_rate.json'))
+    os.environ.setdefault('EXCHANGE_RATE', '1300')
+    # 로컬 서버에는 할당량이 없으므로 기본적으로 Sheets 속도 제한을 끈다
+    os.environ.setdefault('RATE_LIMIT_SHEETS', '0')
+    os.environ.setdefault('OPENAI_API_KEY', 'offline')
+    os.environ.setdefault('ANTHROPIC_API_KEY', 'offline')
+
+
+@contextmanager
+def offline_backends(server, profile):
+    """Sheets service와 LLM 생성 함수를 로컬 서버와 가짜 모델로 바꿨다가 되돌리는 context manager
+
+    운영 코드에는 대체 경로를 두지 않고, 벤치마크에서만 모듈 속성을 바꿔 끼운다.
+    """
+    import sheet.modify_sheet as modify_sheet
+    import use_llm.client_registry as client_registry
+
+    original_service, original_factory = modify_sheet.get_sheets_service, client_registry.create_chat_model
+    modify_sheet.get_sheets_service = sheets_service_factory(server.url)
+    client_registry.create_chat_model = fake_model_factory(profile)
+    client_registry.clear_clients()
+    try:
+        yield
+    finally:
+        modify_sheet.get_sheets_service = original_service
+        client_registry.create_chat_model = original_factory
+        client_registry.clear_clients()
+
+
+class StageTimer:
+    """단계 이름별 소요 시간(초)을 모아 p50/p95를 계산하는 클래스"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.failures = Counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.failures[name] += 1
+            raise
+        finally:
+            self.samples[name].append(time.perf_counter() - start)
+
+    def summary(self):
+        result = {}
+        for name, samples in self.samples.items():
+            if len(samples) > 1:
+                cut_points = statistics.quantiles(samples, n=20, method='inclusive')
+                p50, p95 = statistics.median(samples), cut_points[18]
+            else:
+                p50 = p95 = samples[0]
+            result[name] = {'runs': len(samples), 'failures': self.failures[name],
+                            'p50_ms': p50 * 1000, 'p95_ms': p95 * 1000, 'mean_ms': statistics.fmean(samples) * 1000}
+        return result
+
+
+def _distribution(values):
+    if not values:
+        return {}
+    return {'mean': statistics.fmean(values), 'p50': statistics.median(values), 'max': max(values)}
+
+
+class OfflineBenchmark:
+    """시나리오별로 실제 코드 경로를 실행하고 지연 시간과 호출 수를 모으는 클래스"""
+
+    def __init__(self, profile, server, purpose='motivation', runs=5, candidates=1, max_length=1000,
+                 models=('gpt-4o', 'claude-3-7-sonnet-latest')):
+        self.profile = profile
+        self.server = server
+        self.purpose = purpose
+        self.runs = runs
+        self.candidates = candidates
+        self.max_length = max_length
+        self.models = models
+        self.timer = StageTimer()
+        self.calls = {}
+        self.extra = {}
+
+    def run(self, scenarios):
+        for scenario in scenarios:
+            llm_calls, sheets_calls = Counter(self.profile.calls), Counter(self.server.calls)
+            getattr(self, f"scenario_{scenario}")()
+            self.calls[scenario] = {'llm': dict(Counter(self.profile.calls) - llm_calls),
+                                    'sheets': dict(Counter(self.server.calls) - sheets_calls)}
+        return self.report()
+
+    def _repeat(self, stage, func, *args, **kwargs):
+        results = []
+        for _ in range(self.runs):
+            try:
+                with self.timer.stage(stage):
+                    results.append(func(*args, **kwargs))
+            except Exception as e:
+                logging.getLogger(__name__).error(f"{stage} failed: {str(e)}")
+        return results
+
+    def _korean_prompt(self):
+        from pipeline.evaluation import format_prompt
+        from sheet.modify_sheet import GoogleSheet
+
+        return format_prompt(GoogleSheet(self.purpose).load_config())
+
+    def scenario_translate(self):
+        from use_llm.generate import translate_to_english
+
+        prompt = self._korean_prompt()
+        self._repeat('translate_to_english', translate_to_english, prompt, model='gpt-4o-mini', use_cache=False)
+
+    def scenario_cover_letter(self):
+        from use_llm.generate import generate_cover_letter
+
+        prompt = f"Write a cover letter answer. Question: {QUESTION}"
+        for model in self.models:
+            self._repeat(f"generate_cover_letter[{model}]", generate_cover_letter, prompt, model=model,
+                         temperature=1, max_tokens=4000)
+
+    def scenario_answer(self):
+        """main.generate_answer의 길이 맞추기: 답변당 LLM 호출 수와 로컬 조정 횟수"""
+        import main
+        from fit_length.fitter import fit_stats
+
+        llm_calls = []
+        local_fits_before = fit_stats.local_fits
+        for _ in range(self.runs):
+            before = self.profile.calls['answer'] + self.profile.calls['patch']
+            try:
+                with self.timer.stage('generate_answer'):
+                    main.generate_answer(QUESTION, self.max_length, candidates=self.candidates)
+            except Exception as e:
+                logging.getLogger(__name__).error(f"generate_answer failed: {str(e)}")
+            llm_calls.append(self.profile.calls['answer'] + self.profile.calls['patch'] - before)
+        self.extra['answer'] = {'llm_calls_per_answer': _distribution(llm_calls),
+                                'local_fits': fit_stats.local_fits - local_fits_before,
+                                'candidates': self.candidates}
+
+    def scenario_sheets(self):
+        from sheet.modify_sheet import GoogleSheet
+
+        sheet = GoogleSheet(self.purpose)
+        data = {'formatted_prompt': 'offline', 'prompt_english': 'offline', 'thinking': None, 'result': 'offline',
+                'model_name': 'gpt-4o', 'temperature': '1', 'prompt_tokens': 1, 'completion_tokens': 1,
+                'total_tokens': 2, 'translation_total_tokens': 0}
+        self._repeat('sheets.load_config', sheet.load_config)
+        self._repeat('sheets.get_model_settings', sheet.get_model_settings)
+        self._repeat('sheets.get_sheet_metadata', sheet.get_sheet_metadata, refresh=True)
+        self._repeat('sheets.commit_evaluation_rows', sheet.commit_evaluation_rows, [data])
+        self._repeat('sheets.get_token_usage', sheet.get_token_usage)
+
+    def _flush_runs(self, sheet):
+        from pipeline.run_store import get_exporter, get_run_store
+
+        store = get_run_store()
+        if store is not None:
+            with self.timer.stage('run_store.export'):
+                get_exporter(store, sheet, self.purpose).flush()
+
+    def scenario_evaluation(self):
+        from pipeline.evaluation import run_evaluation
+        from sheet.modify_sheet import GoogleSheet
+
+        sheet = GoogleSheet(self.purpose)
+        self._repeat('run_evaluation', run_evaluation, self.purpose, sheet=sheet)
+        self._flush_runs(sheet)
+
+    def scenario_batch(self):
+        from pipeline.batch import run_batch
+        from sheet.modify_sheet import GoogleSheet
+
+        sheet = GoogleSheet(self.purpose)
+        self._repeat('run_batch', run_batch, self.purpose, sheet=sheet)
+        self._flush_runs(sheet)
+
+    def report(self):
+        return {'stages': self.timer.summary(), 'calls': self.calls, 'extra': self.extra}
+
+
+def print_report(report):
+    print(f"{'stage':<45}{'runs':>6}{'fail':>6}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    for name, stats in report['stages'].items():
+        print(f"{name:<45}{stats['runs']:>6}{stats['failures']:>6}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['mean_ms']:>10.1f}")
+    print("\nAPI calls per scenario")
+    for scenario, calls in report['calls'].items():
+        llm = ', '.join(f"{kind}={count}" for kind, count in sorted(calls['llm'].items())) or '-'
+        sheets = ', '.join(f"{kind}={count}" for kind, count in sorted(calls['sheets'].items())) or '-'
+        print(f"  {scenario:<14} llm: {llm}\n  {'':<14} sheets: {sheets}")
+    answer = report['extra'].get('answer')
+    if answer:
+        calls = answer['llm_calls_per_answer']
+        print(f"\nAttempts to fit (candidates={answer['candidates']}): "
+              f"LLM calls per answer mean {calls.get('mean', 0):.2f}, p50 {calls.get('p50', 0)}, "
+              f"max {calls.get('max', 0)}; local fits {answer['local_fits']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 LLM과 로컬 Sheets 서버로 주요 경로의 성능을 측정합니다.")
+    parser.add_argument('scenarios', nargs='*', help=f"실행할 시나리오 (기본: 모두, {', '.join(SCENARIOS)})")
+    parser.add_argument('--purpose', choices=['motivation', 'core_experience'], default='motivation')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=800, help="가짜 LLM 응답 지연 시간 중앙값")
+    parser.add_argument('--first-token-ms', type=float, default=300)
+    parser.add_argument('--chars-per-token', type=float, default=1.2)
+    parser.add_argument('--length-ratio-mean', type=float, default=0.97)
+    parser.add_argument('--length-ratio-sd', type=float, default=0.05)
+    parser.add_argument('--sheets-latency-ms', type=float, default=100, help="로컬 Sheets 서버 요청당 지연 시간")
+    parser.add_argument('--candidates', type=int, default=1, help="generate_answer의 첫 시도 후보 수")
+    parser.add_argument('--max-length', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', help="결과를 JSON으로 저장할 경로")
+    parser.add_argument('--log-level', default='ERROR')
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.scenarios) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"invalid scenarios: {', '.join(unknown)}")
+    scenarios = args.scenarios or list(SCENARIOS)
+
+    # 측정 중 로그 출력이 시간을 차지하지 않도록 기본은 ERROR만 남긴다
+    from telemetry.logging_config import configure_logging
+    configure_logging(level=args.log_level)
+    server = MockSheetsServer(latency_ms=args.sheets_latency_ms).start()
+    with tempfile.TemporaryDirectory(prefix='offline-benchmark-') as cache_dir:
+        configure_environment(cache_dir)
+        profile = FakeModelProfile(latency_ms=args.latency_ms, first_token_ms=args.first_token_ms,
+                                   chars_per_token=args.chars_per_token, length_ratio_mean=args.length_ratio_mean,
+                                   length_ratio_sd=args.length_ratio_sd, seed=args.seed)
+        seed_sheets(server, args.purpose, seed=args.seed or 0)
+        try:
+            with offline_backends(server, profile):
+                benchmark = OfflineBenchmark(profile, server, args.purpose, runs=args.runs,
+                                             candidates=args.candidates, max_length=args.max_length)
+                report = benchmark.run(scenarios)
+        finally:
+            server.stop()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
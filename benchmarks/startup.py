@@ -0,0 +1,100 @@
+"""
+진입점 모듈의 import 시간을 python -X importtime으로 측정해 예산과 비교하는 벤치마크
+
+사용법 (저장소 루트에서):
+    python benchmarks/startup.py                 # 기본 진입점 모두 측정
+    python benchmarks/startup.py main --runs 5   # main만 5번 측정
+    python benchmarks/startup.py main --budget-ms 300
+
+예산을 넘거나 진입점에서 불러오면 안 되는 무거운 모듈이 import되면 종료 코드 1을 반환한다.
+같은 예산은 tests/test_startup.py에서도 확인한다.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 진입점 -> (import 예산(ms), 시작 시 불러오면 안 되는 모듈)
+ENTRY_POINTS = {
+    # main은 OpenAI 답변 생성만 하므로 Anthropic, Google, 환율 의존성은 필요 없고,
+    # langchain_core도 첫 체인을 만들 때 불러온다
+    'main': (500, ('langchain_core', 'langchain_anthropic', 'anthropic', 'googleapiclient', 'yfinance', 'pandas')),
+    # 평가 파이프라인은 LLM SDK, Google API 클라이언트를 첫 호출 때 불러온다
+    'pipeline.evaluation': (800, ('langchain_core', 'langchain_openai', 'langchain_anthropic', 'googleapiclient',
+                                  'yfinance', 'pandas')),
+    'pipeline.batch': (800, ('langchain_core', 'langchain_openai', 'langchain_anthropic', 'googleapiclient',
+                             'yfinance', 'pandas')),
+}
+STARTUP_RUNS = int(os.getenv('STARTUP_RUNS', '3'))
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력을 (모듈 이름, 깊이, self(us), cumulative(us)) 목록으로 변환하는 함수"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            fields = line[len('import time:'):].split('|')
+            self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2]
+        except (ValueError, IndexError):
+            continue
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        entries.append((stripped, depth, self_us, cumulative_us))
+    return entries
+
+
+def run_importtime(code):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"'{code}' failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def measure(module, runs=STARTUP_RUNS):
+    """module import에 걸린 시간(ms, runs회 중앙값)과 마지막 실행의 import 항목을 반환하는 함수
+
+    인터프리터 시작 시 불러오는 모듈(python -c pass)은 제외한다.
+    """
+    baseline = {name for name, _, _, _ in run_importtime('pass')}
+    totals = []
+    entries = []
+    for _ in range(runs):
+        entries = [entry for entry in run_importtime(f'import {module}') if entry[0] not in baseline]
+        totals.append(sum(cumulative for _, depth, _, cumulative in entries if depth == 0) / 1000)
+    return statistics.median(totals), entries
+
+
+def check(module, budget_ms=None, forbidden=None, runs=STARTUP_RUNS, top=10):
+    """module의 import 시간과 금지 모듈을 확인해 출력하고, 통과 여부를 반환하는 함수"""
+    default_budget, default_forbidden = ENTRY_POINTS.get(module, (500, ()))
+    budget_ms = default_budget if budget_ms is None else budget_ms
+    forbidden = default_forbidden if forbidden is None else forbidden
+
+    total_ms, entries = measure(module, runs)
+    imported = {name for name, _, _, _ in entries}
+    loaded_forbidden = sorted(name for name in forbidden if name in imported)
+    passed = total_ms <= budget_ms and not loaded_forbidden
+
+    print(f"{module}: {total_ms:.1f}ms (budget {budget_ms}ms) {'OK' if passed else 'FAIL'}")
+    for name, _, self_us, cumulative_us in sorted(entries, key=lambda entry: entry[3], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f}ms cumulative {self_us / 1000:8.1f}ms self  {name}")
+    if loaded_forbidden:
+        print(f"  heavy modules imported at startup: {', '.join(loaded_forbidden)}")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="진입점 import 시간을 예산과 비교합니다.")
+    parser.add_argument('modules', nargs='*', default=list(ENTRY_POINTS))
+    parser.add_argument('--budget-ms', type=float, default=None)
+    parser.add_argument('--runs', type=int, default=STARTUP_RUNS)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+    results = [check(module, args.budget_ms, runs=args.runs, top=args.top) for module in args.modules]
+    sys.exit(0 if all(results) else 1)
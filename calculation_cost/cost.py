@@ -3,25 +3,63 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from get_data.get_token_price import get_token_price
+from calculation_cost.exchange_rate import get_exchange_rate
+from telemetry.tracing import traced
 import logging
-import yfinance as yf
-from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-def calculation_cost(model_name, translation_model_name, prompt_tokens, completion_tokens, translation_prompt_tokens, translation_completion_tokens):
+# cost 시트에 캐시 가격(K, L열)이 없을 때 쓰는 입력 토큰 가격 대비 (캐시 읽기, 캐시 쓰기) 가격 비율
+# 모델 이름 접두사별이며 가장 긴 접두사를 쓴다
+CACHE_PRICE_RATIOS = {
+    'claude': (0.1, 1.25),
+    'gpt-4o': (0.5, 1.0),
+    'gpt-4.1': (0.25, 1.0),
+    'o1': (0.5, 1.0),
+    'o3': (0.25, 1.0),
+    'o4-mini': (0.25, 1.0),
+}
+DEFAULT_CACHE_PRICE_RATIO = (0.5, 1.0)
+
+
+def _cache_price_ratios(model_name):
+    prefixes = [prefix for prefix in CACHE_PRICE_RATIOS if model_name.startswith(prefix)]
+    if not prefixes:
+        return DEFAULT_CACHE_PRICE_RATIO
+    return CACHE_PRICE_RATIOS[max(prefixes, key=len)]
+
+
+@traced('cost.calculation_cost')
+def calculation_cost(model_name, translation_model_name, prompt_tokens, completion_tokens, translation_prompt_tokens, translation_completion_tokens, price_table=None,
+                     cache_read_tokens=0, cache_creation_tokens=0):
+    """토큰 사용량과 cost 시트의 가격으로 총 비용(USD)을 계산합니다.
+
+    price_table(PriceTable)을 넘기지 않으면 프로세스 공용 가격표를 사용합니다.
+    prompt_tokens 중 프롬프트 캐시에서 읽은 토큰(cache_read_tokens)과 캐시에 쓴 토큰(cache_creation_tokens)은
+    cost 시트의 캐시 가격으로 계산하고, 시트에 캐시 가격이 없으면 입력 토큰 가격에 모델별 캐시 가격 비율을 곱합니다.
+    """
     logger.debug("Starting cost calculation")
 
-    token_price = get_token_price(model_name, translation_model_name)
+    token_price = get_token_price(model_name, translation_model_name, price_table=price_table)
     input_token_price = token_price['input_token_price']
     translation_input_token_price = token_price['translation_input_token_price']
     output_token_price = token_price['output_token_price']
     translation_output_token_price = token_price['translation_output_token_price']
 
-    prompt_cost = (prompt_tokens * float(input_token_price))
+    cache_read_ratio, cache_write_ratio = _cache_price_ratios(model_name)
+    cache_read_token_price = token_price['cache_read_token_price']
+    if cache_read_token_price is None:
+        cache_read_token_price = float(input_token_price) * cache_read_ratio
+    cache_write_token_price = token_price['cache_write_token_price']
+    if cache_write_token_price is None:
+        cache_write_token_price = float(input_token_price) * cache_write_ratio
+    uncached_prompt_tokens = prompt_tokens - cache_read_tokens - cache_creation_tokens
+    prompt_cost = (uncached_prompt_tokens * float(input_token_price))
+    prompt_cost += cache_read_tokens * float(cache_read_token_price)
+    prompt_cost += cache_creation_tokens * float(cache_write_token_price)
     completion_cost = (completion_tokens * float(output_token_price))
     translation_prompt_cost = (translation_prompt_tokens * float(translation_input_token_price))
     translation_completion_cost = (translation_completion_tokens * float(translation_output_token_price))
@@ -30,45 +68,26 @@ def calculation_cost(model_name, translation_model_name, prompt_tokens, completi
     
     return total_cost
 
-def usd_to_krw(dollar_amount):
+@traced('cost.usd_to_krw')
+def usd_to_krw(dollar_amount, rate_provider=None):
     """
-    yfinance를 사용하여 실시간 원달러 환율을 가져와 달러를 원화로 변환합니다.
+    환율 provider(기본: 캐시된 yfinance)에서 원달러 환율을 가져와 달러를 원화로 변환합니다.
     
     Args:
         dollar_amount (float): 변환할 달러 금액
+        rate_provider: get_rate(date)를 제공하는 환율 provider (기본값: get_default_rate_provider())
         
     Returns:
         int: 원화로 변환된 금액 (정수로 반올림)
     """
-    logger.debug(f"Converting {dollar_amount} USD to KRW")
-    
-    try:
-        # USD/KRW 환율 정보 가져오기
-        ticker = "KRW=X"  # Yahoo Finance에서 원달러 환율 티커
-        
-        # 오늘과 어제 날짜 설정
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)  # 최근 7일 데이터 요청 (데이터 누락 가능성 대비)
-        
-        # 환율 데이터 가져오기
-        exchange_data = yf.download(ticker, start=start_date, end=end_date, progress=False)
-        
-        if exchange_data.empty:
-            logger.warning("환율 데이터를 가져오지 못했습니다. 기본값 1300 사용")
-            exchange_rate = 1300
-        else:
-            # 가장 최근 종가 사용 (float 값으로 변환) - 경고 메시지 수정
-            exchange_rate = float(exchange_data['Close'].iloc[-1].item())
-            logger.info(f"현재 원달러 환율: {exchange_rate:.2f}")
-        
-        # 달러를 원화로 변환
-        krw_amount = dollar_amount * exchange_rate
-        logger.debug(f"변환 결과: {dollar_amount} USD = {krw_amount:.2f} KRW (환율: {exchange_rate:.2f})")
-        
-        # 정수로 반올림하여 반환
-        return round(krw_amount)
-    
-    except Exception as e:
-        logger.error(f"환율 변환 중 오류 발생: {str(e)}")
-        logger.warning("기본 환율 1300 사용")
-        return round(dollar_amount * 1300)
\ No newline at end of file
+    logger.debug("Converting %s USD to KRW", dollar_amount)
+
+    exchange_rate = get_exchange_rate(rate_provider=rate_provider)
+    logger.info("현재 원달러 환율: %.2f", exchange_rate)
+
+    # 달러를 원화로 변환
+    krw_amount = dollar_amount * exchange_rate
+    logger.debug("변환 결과: %s USD = %.2f KRW (환율: %.2f)", dollar_amount, krw_amount, exchange_rate)
+
+    # 정수로 반올림하여 반환
+    return round(krw_amount)
@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from telemetry.tracing import set_attributes, traced
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXCHANGE_RATE = 1300
+EXCHANGE_RATE_CACHE_FILE = os.getenv('EXCHANGE_RATE_CACHE_FILE', os.path.join('.cache', 'exchange_rate.json'))
+EXCHANGE_RATE_CACHE_TTL = float(os.getenv('EXCHANGE_RATE_CACHE_TTL', '21600'))
+# 원본 provider 조회가 실패한 뒤 다시 시도하기까지 기다리는 시간(초)
+EXCHANGE_RATE_RETRY_INTERVAL = float(os.getenv('EXCHANGE_RATE_RETRY_INTERVAL', '600'))
+# 캐시 파일에서 마지막 조회 실패 시각을 저장하는 키 (날짜 키와 겹치지 않음)
+FAILED_AT_KEY = '_failed_at'
+
+
+class YFinanceRateProvider:
+    """yfinance로 최근 원달러 환율 종가를 가져오는 provider (yfinance는 호출 시점에 import)"""
+
+    ticker = "KRW=X"  # Yahoo Finance에서 원달러 환율 티커
+
+    def get_rate(self, day):
+        import yfinance as yf
+
+        end_date = datetime.combine(day, datetime.min.time()) + timedelta(days=1)
+        start_date = end_date - timedelta(days=7)  # 최근 7일 데이터 요청 (데이터 누락 가능성 대비)
+        exchange_data = yf.download(self.ticker, start=start_date, end=end_date, progress=False)
+        if exchange_data.empty:
+            logger.warning("환율 데이터를 가져오지 못했습니다.")
+            return None
+        # 가장 최근 종가 사용 (float 값으로 변환)
+        return float(exchange_data['Close'].iloc[-1].item())
+
+
+class FixedRateProvider:
+    """항상 고정된 환율을 반환하는 provider (테스트, 재현용)"""
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+
+    def get_rate(self, day):
+        return self.rate
+
+
+class FileRateProvider:
+    """로컬 JSON 파일에서 환율을 읽는 provider
+
+    파일 형식: {"rate": 1385.5} (고정 환율) 또는 {"2025-03-14": 1452.3, ...} (날짜별 환율).
+    날짜별 환율은 요청 날짜 이하의 가장 최근 값을 사용한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def get_rate(self, day):
+        with open(self.path, encoding='utf-8') as f:
+            rates = json.load(f)
+        if 'rate' in rates:
+            return float(rates['rate'])
+        return _latest_rate(rates, day)
+
+
+class CachedRateProvider:
+    """다른 provider의 결과를 날짜별로 메모리와 디스크에 캐시하는 provider
+
+    ttl(초) 안에 가져온 환율은 다시 요청하지 않는다. 원본 provider가 실패하면
+    디스크 캐시의 가장 최근 환율(만료 여부와 무관)을 사용하고, 실패 시각을 캐시에 기록해
+    retry_interval(초)이 지날 때까지는 원본 provider를 다시 호출하지 않는다 (오프라인에서 매번 네트워크를 기다리지 않도록).
+    """
+
+    def __init__(self, provider, cache_path=EXCHANGE_RATE_CACHE_FILE, ttl=EXCHANGE_RATE_CACHE_TTL,
+                 retry_interval=EXCHANGE_RATE_RETRY_INTERVAL):
+        self.provider = provider
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._cache = None
+        self._lock = threading.Lock()
+
+    def get_rate(self, day):
+        key = day.isoformat()
+        with self._lock:
+            cache = self._load_cache()
+            entry = cache.get(key)
+            if entry is not None and time.time() - entry['fetched_at'] <= self.ttl:
+                return entry['rate']
+
+            failed_at = cache.get(FAILED_AT_KEY)
+            if failed_at is not None and time.time() - failed_at < self.retry_interval:
+                logger.debug("최근 환율 조회가 실패해 원본 provider 호출을 건너뜁니다.")
+                return self._cached_rate(cache, day)
+
+            try:
+                rate = self.provider.get_rate(day)
+            except Exception as e:
+                logger.error("환율 조회 중 오류 발생: %s", e)
+                rate = None
+
+            if rate is None:
+                cache[FAILED_AT_KEY] = time.time()
+                self._save_cache(cache)
+                return self._cached_rate(cache, day)
+
+            cache.pop(FAILED_AT_KEY, None)
+            cache[key] = {'rate': rate, 'fetched_at': time.time()}
+            self._save_cache(cache)
+            return rate
+
+    @staticmethod
+    def _cached_rate(cache, day):
+        rates = {key: entry['rate'] for key, entry in cache.items() if key != FAILED_AT_KEY}
+        cached_rate = _latest_rate(rates, day)
+        if cached_rate is not None:
+            logger.warning("캐시된 환율 사용: %.2f", cached_rate)
+        return cached_rate
+
+    def _load_cache(self):
+        if self._cache is not None:
+            return self._cache
+        self._cache = {}
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, encoding='utf-8') as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("환율 캐시를 읽지 못했습니다: %s", e)
+        return self._cache
+
+    def _save_cache(self, cache):
+        if not self.cache_path:
+            return
+        try:
+            cache_dir = os.path.dirname(self.cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning("환율 캐시를 저장하지 못했습니다: %s", e)
+
+
+def _latest_rate(rates, day):
+    """날짜(ISO 문자열) -> 환율 dict에서 day 이하의 가장 최근 환율을 반환하는 함수"""
+    candidates = [key for key in rates if key <= day.isoformat()]
+    if not candidates:
+        return None
+    return float(rates[max(candidates)])
+
+
+_default_rate_provider = None
+_default_rate_provider_lock = threading.Lock()
+
+
+def get_default_rate_provider():
+    """환경 변수에 따라 공용 환율 provider를 만드는 함수
+
+    EXCHANGE_RATE: 고정 환율, EXCHANGE_RATE_FILE: 로컬 환율 파일,
+    둘 다 없으면 캐시된 yfinance provider를 사용한다.
+    """
+    global _default_rate_provider
+    with _default_rate_provider_lock:
+        if _default_rate_provider is None:
+            if os.getenv('EXCHANGE_RATE'):
+                _default_rate_provider = FixedRateProvider(os.getenv('EXCHANGE_RATE'))
+            elif os.getenv('EXCHANGE_RATE_FILE'):
+                _default_rate_provider = FileRateProvider(os.getenv('EXCHANGE_RATE_FILE'))
+            else:
+                _default_rate_provider = CachedRateProvider(YFinanceRateProvider())
+    return _default_rate_provider
+
+
+@traced('exchange_rate.get_exchange_rate')
+def get_exchange_rate(day=None, rate_provider=None):
+    """원달러 환율을 반환하는 함수 (조회 실패 시 DEFAULT_EXCHANGE_RATE)"""
+    if day is None:
+        day = date.today()
+    if rate_provider is None:
+        rate_provider = get_default_rate_provider()
+    set_attributes(provider=type(rate_provider).__name__)
+    try:
+        rate = rate_provider.get_rate(day)
+    except Exception as e:
+        logger.error("환율 조회 중 오류 발생: %s", e)
+        rate = None
+    if rate is None:
+        logger.warning("기본 환율 %s 사용", DEFAULT_EXCHANGE_RATE)
+        return DEFAULT_EXCHANGE_RATE
+    return rate
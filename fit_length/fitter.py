@@ -0,0 +1,203 @@
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 의미를 바꾸지 않는 축약/본딧말 쌍 (본딧말, 축약형). 축약하면 1자 줄고, 풀면 1자 는다.
+# '해/하여', '돼/되어'는 '이해', '돼지'처럼 축약이 아닌 경우가 많아 제외한다.
+CONTRACTIONS = [
+    ('하였', '했'),
+    ('되었', '됐'),
+    ('주었', '줬'),
+    ('보았', '봤'),
+    ('두었', '뒀'),
+]
+
+# 지워도 문장이 성립하는 부사 (단어 경계에서만 제거)
+FILLER_WORDS = ['정말', '매우', '굉장히', '아주', '너무', '특히', '또한', '그리고']
+
+# 문장 끝 구두점 뒤의 공백이나 줄바꿈에서 문장을 나눈다
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?。])[ \t]+|\n+')
+
+# 한 번의 로컬 조정에서 허용하는 최대 미세 편집 수 (넘으면 LLM으로 보정)
+MAX_FINE_EDITS = 30
+
+
+@dataclass
+class FitResult:
+    """fit_answer 결과"""
+    text: str
+    fitted: bool
+    length: int
+    operations: List[str] = field(default_factory=list)
+
+
+class FitStats:
+    """로컬 길이 조정으로 절약한 LLM 호출 수를 집계하는 클래스"""
+
+    def __init__(self):
+        self.attempts = 0
+        self.local_fits = 0
+        self.llm_calls_saved = 0
+        self._lock = threading.Lock()
+
+    def record(self, result: FitResult, needed_fit: bool) -> None:
+        with self._lock:
+            self.attempts += 1
+            if result.fitted and needed_fit:
+                self.local_fits += 1
+                # 로컬 조정에 성공하면 최소 한 번의 재생성 호출을 건너뛴다
+                self.llm_calls_saved += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'attempts': self.attempts, 'local_fits': self.local_fits, 'llm_calls_saved': self.llm_calls_saved}
+
+
+fit_stats = FitStats()
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """문장별 (시작, 끝) 위치 목록을 반환한다. 끝 위치는 뒤따르는 공백/줄바꿈을 포함한다."""
+    spans = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        if match.start() > start:
+            spans.append((start, match.end()))
+            start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def normalize_whitespace(text: str) -> str:
+    """연속 공백, 줄 끝 공백, 앞뒤 공백을 정리한다."""
+    text = re.sub(r'[ \t]{2,}', ' ', text)
+    text = re.sub(r'[ \t]+\n', '\n', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+def _shrink_edits(text: str) -> List[Tuple[int, int, str, str]]:
+    """한 번의 편집으로 텍스트를 줄이는 (시작, 끝, 대체 문자열, 설명) 목록 (뒤쪽 편집 우선)"""
+    edits = []
+    for long_form, short_form in CONTRACTIONS:
+        for match in re.finditer(long_form, text):
+            edits.append((match.start(), match.end(), short_form, f"축약 '{long_form}'->'{short_form}'"))
+    for word in FILLER_WORDS:
+        for match in re.finditer(rf'(?:^|(?<=\s)){word} ', text):
+            edits.append((match.start(), match.end(), '', f"부사 제거 '{word}'"))
+    edits.sort(reverse=True)
+    return edits
+
+
+def _expand_edits(text: str) -> List[Tuple[int, int, str, str]]:
+    """한 번의 편집으로 텍스트를 늘리는 (시작, 끝, 대체 문자열, 설명) 목록 (뒤쪽 편집 우선)"""
+    edits = []
+    for long_form, short_form in CONTRACTIONS:
+        for match in re.finditer(short_form, text):
+            edits.append((match.start(), match.end(), long_form, f"본딧말 '{short_form}'->'{long_form}'"))
+    edits.sort(reverse=True)
+    return edits
+
+
+def _edit_deltas(count: Callable[[str], int]) -> Tuple[int, int]:
+    """count 규칙에서 미세 편집 한 번으로 줄어드는 최대 길이와 늘어나는 최대 길이
+
+    바이트 단위 규칙에서는 한글 한 글자가 2~3으로 세어지므로 글자 수가 아닌 count로 잰다.
+    """
+    contraction_deltas = [count(long_form) - count(short_form) for long_form, short_form in CONTRACTIONS]
+    max_shrink = max(contraction_deltas + [count(word + ' ') for word in FILLER_WORDS])
+    return max_shrink, max(contraction_deltas)
+
+
+def _fine_tune(text: str, lower_bound: int, max_length: int, count: Callable[[str], int],
+               max_edits: int = MAX_FINE_EDITS) -> Optional[Tuple[str, List[str]]]:
+    """축약/부사 제거/본딧말 복원을 한 번에 하나씩 적용해 길이를 범위 안으로 맞춘다.
+
+    범위를 건너뛰는 편집은 적용하지 않으며, max_edits 안에 맞추지 못하면 None을 반환한다.
+    """
+    operations = []
+    length = count(text)
+    while not (lower_bound <= length <= max_length):
+        if len(operations) >= max_edits:
+            return None
+        edits = _shrink_edits(text) if length > max_length else _expand_edits(text)
+        for start, end, replacement, description in edits:
+            candidate = text[:start] + replacement + text[end:]
+            candidate_length = count(candidate)
+            # 방향이 맞고 반대쪽 경계를 넘지 않는 편집만 적용
+            if length > max_length and lower_bound <= candidate_length < length:
+                break
+            if length < lower_bound and length < candidate_length <= max_length:
+                break
+        else:
+            return None
+        text, length = candidate, candidate_length
+        operations.append(description)
+    return text, operations
+
+
+def fit_answer(text: str, lower_bound: int, max_length: int, count: Callable[[str], int] = len,
+               variants: Optional[Dict[str, List[str]]] = None, max_edits: int = MAX_FINE_EDITS) -> FitResult:
+    """
+    LLM 호출 없이 답변 길이를 [lower_bound, max_length] 범위로 맞춘다.
+
+    1. 공백 정리
+    2. 축약/부사 제거/본딧말 복원 같은 1~4자 단위 미세 편집
+    3. (초과 시) 첫 문장을 제외한 문장 하나를 제거한 뒤 미세 편집
+    4. variants(원래 문장 -> 대체 문장 목록)가 있으면 문장 하나를 대체한 뒤 미세 편집
+
+    편집 수가 가장 적은 결과를 고르며, 맞추지 못하면 원문과 fitted=False를 반환한다.
+    """
+    length = count(text)
+    if lower_bound <= length <= max_length:
+        return FitResult(text, True, length)
+
+    normalized = normalize_whitespace(text)
+    base_operations = ['공백 정리'] if normalized != text else []
+
+    # (원문 변경 정도, 후보 텍스트, 적용한 편집)
+    candidates = [(0, normalized, base_operations)]
+    spans = split_sentences(normalized)
+    if count(normalized) > max_length and len(spans) > 2:
+        for start, end in spans[1:]:
+            sentence = normalized[start:end].strip()
+            removed = normalize_whitespace(normalized[:start] + normalized[end:])
+            candidates.append((1, removed, base_operations + [f"문장 제거 '{sentence[:20]}'"]))
+    for original, alternatives in (variants or {}).items():
+        if original not in normalized:
+            continue
+        for alternative in alternatives:
+            replaced = normalized.replace(original, alternative, 1)
+            candidates.append((1, replaced, base_operations + [f"문장 대체 '{original[:20]}'"]))
+
+    # 미세 편집 한 번으로 바뀌는 최대 길이를 count 규칙으로 재서, 닿을 수 없는 후보는 건너뛴다
+    max_shrink, max_grow = _edit_deltas(count)
+    reachable_min = lower_bound - max_edits * max_grow
+    reachable_max = max_length + max_edits * max_shrink
+
+    best = None
+    for rank, candidate, operations in candidates:
+        if best is not None and rank > best[0][0]:
+            break
+        if not (reachable_min <= count(candidate) <= reachable_max):
+            continue
+        tuned = _fine_tune(candidate, lower_bound, max_length, count, max_edits)
+        if tuned is None:
+            continue
+        tuned_text, tuned_operations = tuned
+        score = (rank, len(tuned_operations))
+        if best is None or score < best[0]:
+            best = (score, tuned_text, operations + tuned_operations)
+
+    if best is None:
+        logger.debug("로컬 길이 조정 실패: %s자 (목표 %s~%s자)", length, lower_bound, max_length)
+        return FitResult(text, False, length)
+
+    _, fitted_text, operations = best
+    fitted_length = count(fitted_text)
+    logger.info("로컬 길이 조정 성공: %s자 -> %s자 (%s개 편집)", length, fitted_length, len(operations))
+    return FitResult(fitted_text, True, fitted_length, operations)
@@ -0,0 +1,126 @@
+import logging
+import unicodedata
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+UNITS = ('chars', 'utf8_bytes', 'cp949_bytes')
+
+
+@dataclass(frozen=True)
+class CountRule:
+    """
+    지원 사이트마다 다른 글자 수 계산 규칙.
+
+    unit: 'chars'(문자 수), 'utf8_bytes'(UTF-8 바이트), 'cp949_bytes'(CP949/EUC-KR 바이트, 한글 2바이트)
+    include_whitespace: 공백/줄바꿈을 글자 수에 포함할지 여부
+    newline_width: 줄바꿈 하나를 몇으로 셀지 (CRLF로 세는 사이트는 2)
+    normalize: 세기 전에 적용할 유니코드 정규화 ('NFC' 등, None이면 그대로)
+    """
+    unit: str = 'chars'
+    include_whitespace: bool = True
+    newline_width: int = 1
+    normalize: Optional[str] = 'NFC'
+
+    def __post_init__(self):
+        if self.unit not in UNITS:
+            raise ValueError(f"Invalid count unit: {self.unit}")
+
+    def _encoded_length(self, text: str) -> int:
+        if self.unit == 'chars':
+            return len(text)
+        if self.unit == 'utf8_bytes':
+            return len(text.encode('utf-8'))
+        # CP949로 표현할 수 없는 문자는 '?' 한 바이트로 센다
+        return len(text.encode('cp949', errors='replace'))
+
+    def count(self, text: str) -> int:
+        """규칙에 따른 text의 길이"""
+        if self.normalize:
+            text = unicodedata.normalize(self.normalize, text)
+        if not self.include_whitespace:
+            text = ''.join(text.split())
+            return self._encoded_length(text)
+        length = self._encoded_length(text)
+        if self.newline_width != 1:
+            # 줄바꿈은 모든 단위에서 1로 세어졌으므로 차이만 더한다
+            length += text.count('\n') * (self.newline_width - 1)
+        return length
+
+    def __call__(self, text: str) -> int:
+        return self.count(text)
+
+
+# 자주 쓰는 규칙
+COUNT_RULES = {
+    'chars': CountRule(),
+    'chars_no_space': CountRule(include_whitespace=False),
+    'chars_crlf': CountRule(newline_width=2),
+    'utf8_bytes': CountRule(unit='utf8_bytes'),
+    'cp949_bytes': CountRule(unit='cp949_bytes'),
+    'cp949_bytes_crlf': CountRule(unit='cp949_bytes', newline_width=2),
+}
+DEFAULT_COUNT_RULE = COUNT_RULES['chars']
+
+
+def get_count_rule(name: Optional[str]) -> CountRule:
+    """이름으로 CountRule을 찾는다 (None이나 빈 문자열이면 기본 규칙)."""
+    if not name:
+        return DEFAULT_COUNT_RULE
+    if name not in COUNT_RULES:
+        raise ValueError(f"Invalid count rule: {name} (choose from {', '.join(COUNT_RULES)})")
+    return COUNT_RULES[name]
+
+
+def _is_stable_boundary(char: str) -> bool:
+    """정규화 시 앞 문자와 결합하지 않는 문자인지 (결합 문자, 한글 자모가 아니면 안전)"""
+    return unicodedata.combining(char) == 0 and not ('ᄀ' <= char <= 'ᇿ')
+
+
+class LengthCounter:
+    """
+    스트리밍/편집 중 전체 문자열을 다시 세지 않고 길이를 갱신하는 카운터.
+
+    append는 추가된 조각만, apply_edit은 바뀐 부분만 센다 (O(delta)).
+    정규화 규칙이 있으면 다음 조각과 결합될 수 있는 끝부분만 보류했다가 함께 센다.
+    """
+
+    def __init__(self, rule: CountRule = DEFAULT_COUNT_RULE, text: str = ''):
+        self.rule = rule
+        self._committed = 0
+        self._pending = ''
+        if text:
+            self.append(text)
+
+    @property
+    def value(self) -> int:
+        return self._committed + (self.rule.count(self._pending) if self._pending else 0)
+
+    def append(self, text: str) -> int:
+        """스트리밍으로 받은 조각을 더하고 현재 길이를 반환한다."""
+        if not self.rule.normalize:
+            self._committed += self.rule.count(text)
+            return self._committed
+        buffer = self._pending + text
+        split = len(buffer)
+        # 마지막 안전한 경계 문자부터는 다음 조각과 결합될 수 있으므로 보류
+        for index in range(len(buffer) - 1, -1, -1):
+            if _is_stable_boundary(buffer[index]):
+                split = index
+                break
+        else:
+            split = 0
+        self._committed += self.rule.count(buffer[:split])
+        self._pending = buffer[split:]
+        return self.value
+
+    def apply_edit(self, removed: str, inserted: str) -> int:
+        """removed를 inserted로 바꾼 편집을 반영하고 현재 길이를 반환한다."""
+        self._committed += self.rule.count(inserted) - self.rule.count(removed)
+        return self.value
+
+    def reset(self, text: str = '') -> int:
+        self._committed = 0
+        self._pending = ''
+        return self.append(text) if text else 0
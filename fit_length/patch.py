@@ -0,0 +1,115 @@
+import json
+import logging
+import re
+from typing import Callable, Dict, List
+
+from fit_length.fitter import split_sentences
+
+logger = logging.getLogger(__name__)
+
+# 답변 전체 대신 바꿀 문장만 JSON 패치로 받는 수정 프롬프트
+PATCH_PROMPT = (
+    "다음은 자기소개서 문항에 대한 답변을 문장 단위로 번호를 매긴 것입니다. 괄호 안은 문장의 글자 수입니다.\n"
+    "답변의 현재 길이는 {answer_length}자이며, 총 {lower_bound}~{max_length}자가 되어야 합니다. "
+    "의미를 유지하면서 약 {delta}자를 {direction} 주세요.\n"
+    "답변 전체를 다시 쓰지 말고, 바꿀 문장만 JSON 배열로 출력하세요. 각 항목의 형식은 다음 중 하나입니다.\n"
+    '{{"op": "replace", "index": 문장 번호, "text": "새 문장"}}\n'
+    '{{"op": "delete", "index": 문장 번호}}\n'
+    '{{"op": "insert", "after": 문장 번호(맨 앞이면 0), "text": "새 문장"}}\n'
+    "JSON 배열 외에는 아무것도 출력하지 마세요.\n\n"
+    "자기소개서 문항: {question}\n\n"
+    "답변:\n{numbered_answer}"
+)
+
+
+class PatchError(ValueError):
+    """LLM이 반환한 패치를 해석하거나 적용할 수 없는 경우"""
+
+
+def number_sentences(text: str, count: Callable[[str], int] = len) -> str:
+    """답변을 '[번호] (글자 수) 문장' 형식의 줄로 만든다 (번호는 1부터)."""
+    lines = []
+    for number, (start, end) in enumerate(split_sentences(text), start=1):
+        sentence = text[start:end].strip()
+        lines.append(f"[{number}] ({count(sentence)}자) {sentence}")
+    return "\n".join(lines)
+
+
+def patch_prompt_inputs(question: str, answer: str, lower_bound: int, max_length: int,
+                        count: Callable[[str], int] = len) -> Dict[str, str]:
+    """PATCH_PROMPT에 넣을 값을 만든다."""
+    answer_length = count(answer)
+    if answer_length > max_length:
+        delta, direction = answer_length - max_length, "줄여"
+    else:
+        delta, direction = lower_bound - answer_length, "늘려"
+    return {
+        "question": question,
+        "answer_length": str(answer_length),
+        "lower_bound": str(lower_bound),
+        "max_length": str(max_length),
+        "delta": str(delta),
+        "direction": direction,
+        "numbered_answer": number_sentences(answer, count),
+    }
+
+
+def parse_patch(response: str) -> List[dict]:
+    """LLM 응답에서 JSON 패치 배열을 꺼낸다 (코드 블록 표시는 무시)."""
+    match = re.search(r"\[.*\]", response, re.DOTALL)
+    if match is None:
+        raise PatchError(f"패치 배열을 찾을 수 없습니다: {response[:100]}")
+    try:
+        operations = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise PatchError(f"패치 JSON 해석 실패: {e}") from e
+    if not isinstance(operations, list) or not all(isinstance(operation, dict) for operation in operations):
+        raise PatchError("패치는 객체의 배열이어야 합니다.")
+    return operations
+
+
+def apply_patch(text: str, operations: List[dict]) -> str:
+    """
+    문장 번호(1부터, 원래 답변 기준)를 사용하는 패치를 답변에 적용한다.
+    바뀌지 않은 문장과 문장 사이의 공백/줄바꿈은 그대로 유지한다.
+    """
+    spans = split_sentences(text)
+    # 문장 본문과 뒤따르는 구분자(공백/줄바꿈)를 나눠서 보관
+    sentences = []
+    for start, end in spans:
+        chunk = text[start:end]
+        body = chunk.rstrip()
+        sentences.append([body, chunk[len(body):]])
+
+    inserts = {}
+    for operation in operations:
+        op = operation.get("op")
+        try:
+            if op in ("replace", "delete"):
+                index = int(operation["index"])
+                if not 1 <= index <= len(sentences):
+                    raise PatchError(f"잘못된 문장 번호: {index}")
+                sentences[index - 1][0] = operation["text"].strip() if op == "replace" else None
+            elif op == "insert":
+                after = int(operation["after"])
+                if not 0 <= after <= len(sentences):
+                    raise PatchError(f"잘못된 삽입 위치: {after}")
+                inserts.setdefault(after, []).append(operation["text"].strip())
+            else:
+                raise PatchError(f"알 수 없는 패치 연산: {op}")
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            if isinstance(e, PatchError):
+                raise
+            raise PatchError(f"잘못된 패치 항목: {operation}") from e
+
+    parts = []
+    for new_sentence in inserts.get(0, []):
+        parts.append(new_sentence + " ")
+    for number, (body, separator) in enumerate(sentences, start=1):
+        if body:
+            parts.append(body + separator)
+        for new_sentence in inserts.get(number, []):
+            if parts and not parts[-1][-1:].isspace():
+                parts[-1] += " "
+            parts.append(new_sentence + " ")
+    return "".join(parts).strip()
@@ -1,55 +1,147 @@
 import logging
+import os
+import threading
+import time
 from sheet.modify_sheet import GoogleSheet
+from use_llm.model_names import model_name_candidates
 
 
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def get_token_price(model_name, translation_model_name):
-    cost_sheet = GoogleSheet('cost')
-    cost_model_data = cost_sheet.get_whole_data('cost', 'B:B')
-    model_index = 0
-    translation_model_index = 0
-    
-    logger.debug(f"모델 이름: {model_name}, 번역 모델 이름: {translation_model_name}")
-    logger.debug(f"가져온 모델 데이터 길이: {len(cost_model_data)}")
-    
-    model_found = False
-    for i in range(len(cost_model_data)):
-        if cost_model_data[i][0] == model_name:
-            model_index = i
-            model_found = True
-            logger.debug(f"모델 '{model_name}' 찾음: 인덱스 {i}")
-            break
-    
-    if not model_found:
-        logger.warning(f"모델 '{model_name}'을(를) 데이터에서 찾을 수 없습니다. 기본 인덱스 0을 사용합니다.")
-    
-    translation_model_found = False
-    for i in range(len(cost_model_data)):
-        if cost_model_data[i][0] == translation_model_name:
-            translation_model_index = i
-            translation_model_found = True
-            logger.debug(f"번역 모델 '{translation_model_name}' 찾음: 인덱스 {i}")
-            break
-    
-    if not translation_model_found:
-        logger.warning(f"번역 모델 '{translation_model_name}'을(를) 데이터에서 찾을 수 없습니다. 기본 인덱스 0을 사용합니다.")
-    
-    input_token_price_data = cost_sheet.get_whole_data('cost', 'I:I')
-    input_token_price = input_token_price_data[model_index][0]
-    logger.info(f"input_token_price: {input_token_price}")
-    translation_input_token_price = input_token_price_data[translation_model_index][0]
-    logger.info(f"translation_input_token_price: {translation_input_token_price}")
-
-    output_token_price_data = cost_sheet.get_whole_data('cost', 'J:J')
-    output_token_price = output_token_price_data[model_index][0]
-    logger.info(f"output_token_price: {output_token_price}")
-    translation_output_token_price = output_token_price_data[translation_model_index][0]
-    logger.info(f"translation_output_token_price: {translation_output_token_price}")
+# cost 시트: B열 모델 이름, I열 입력 토큰 가격, J열 출력 토큰 가격,
+# K열 프롬프트 캐시 읽기 토큰 가격, L열 캐시 쓰기 토큰 가격 (K, L열은 비어 있어도 된다)
+PRICE_RANGE = 'B:L'
+MODEL_COLUMN = 0
+INPUT_PRICE_COLUMN = 7
+OUTPUT_PRICE_COLUMN = 8
+CACHE_READ_PRICE_COLUMN = 9
+CACHE_WRITE_PRICE_COLUMN = 10
+
+PRICE_TABLE_TTL = float(os.getenv('PRICE_TABLE_TTL', '3600'))
+
+
+class PriceTable:
+    """cost 시트를 한 번에 읽어 모델 이름 -> (입력 가격, 출력 가격) 인덱스를 만드는 클래스
+
+    ttl(초)이 지나면 다음 조회 시 시트를 다시 읽는다. ttl이 None이면 만료되지 않는다.
+    """
+
+    def __init__(self, sheet=None, ttl=PRICE_TABLE_TTL):
+        self.sheet = sheet
+        self.ttl = ttl
+        self.prices = {}
+        self.cache_prices = {}
+        self.loaded_at = None
+        self._lock = threading.Lock()
+
+    def is_expired(self):
+        if self.loaded_at is None:
+            return True
+        if self.ttl is None:
+            return False
+        return time.monotonic() - self.loaded_at > self.ttl
+
+    def refresh(self):
+        """cost 시트의 B:L 범위를 한 번 읽어 가격 인덱스를 다시 만드는 함수"""
+        if self.sheet is None:
+            self.sheet = GoogleSheet('cost')
+        rows = self.sheet.get_whole_data('cost', PRICE_RANGE) or []
+
+        prices = {}
+        cache_prices = {}
+        for row in rows:
+            # 뒤쪽 빈 셀은 응답에서 생략되므로 길이를 확인한다
+            if len(row) <= OUTPUT_PRICE_COLUMN or not row[MODEL_COLUMN]:
+                continue
+            model_name = row[MODEL_COLUMN].strip()
+            if model_name not in prices:
+                prices[model_name] = (row[INPUT_PRICE_COLUMN], row[OUTPUT_PRICE_COLUMN])
+                cache_prices[model_name] = tuple(
+                    row[column] if len(row) > column and row[column] != '' else None
+                    for column in (CACHE_READ_PRICE_COLUMN, CACHE_WRITE_PRICE_COLUMN))
+
+        self.prices = prices
+        self.cache_prices = cache_prices
+        self.loaded_at = time.monotonic()
+        logger.debug("가격표 로드 완료: %s개 모델", len(prices))
+
+    def load(self):
+        """가격표가 만료되었으면 다시 읽는 함수 (조회 전에 미리 로드해 두는 용도)"""
+        with self._lock:
+            if self.is_expired():
+                self.refresh()
+
+    @staticmethod
+    def _lookup(table, model_name):
+        for candidate in model_name_candidates(model_name):
+            price = table.get(candidate)
+            if price is not None:
+                return price
+        return None
+
+    def get_price(self, model_name):
+        """모델의 (입력 토큰 가격, 출력 토큰 가격)을 반환하는 함수
+
+        가격표에 이름이 그대로 없으면 스냅샷 날짜를 뗀 기본 이름('gpt-4o-2024-08-06' -> 'gpt-4o')으로 찾는다.
+
+        Raises:
+            ValueError: 가격표에 모델이 없는 경우
+        """
+        with self._lock:
+            refreshed = self.is_expired()
+            if refreshed:
+                self.refresh()
+            price = self._lookup(self.prices, model_name)
+            if price is None and not refreshed:
+                # 시트에 모델이 새로 추가되었을 수 있으므로 한 번 다시 읽는다
+                self.refresh()
+                price = self._lookup(self.prices, model_name)
+        if price is None:
+            raise ValueError(f"Model price not found: {model_name}")
+        return price
+
+    def get_cache_price(self, model_name):
+        """모델의 (캐시 읽기 토큰 가격, 캐시 쓰기 토큰 가격)을 반환하는 함수 (시트에 없는 값은 None)
+
+        get_price로 모델을 찾은 뒤에 호출한다 (가격표를 다시 읽지 않는다).
+        """
+        with self._lock:
+            return self._lookup(self.cache_prices, model_name) or (None, None)
+
+
+_default_price_table = None
+_default_price_table_lock = threading.Lock()
+
+
+def get_default_price_table():
+    """프로세스 전체에서 공유하는 PriceTable을 반환하는 함수"""
+    global _default_price_table
+    with _default_price_table_lock:
+        if _default_price_table is None:
+            _default_price_table = PriceTable()
+    return _default_price_table
+
+
+def get_token_price(model_name, translation_model_name, price_table=None):
+    if price_table is None:
+        price_table = get_default_price_table()
+
+    logger.debug("모델 이름: %s, 번역 모델 이름: %s", model_name, translation_model_name)
+
+    input_token_price, output_token_price = price_table.get_price(model_name)
+    logger.info("input_token_price: %s", input_token_price)
+    logger.info("output_token_price: %s", output_token_price)
+
+    translation_input_token_price, translation_output_token_price = price_table.get_price(translation_model_name)
+    logger.info("translation_input_token_price: %s", translation_input_token_price)
+    logger.info("translation_output_token_price: %s", translation_output_token_price)
+
+    cache_read_token_price, cache_write_token_price = price_table.get_cache_price(model_name)
 
     return {
         'input_token_price': input_token_price,
+        'cache_read_token_price': cache_read_token_price,
+        'cache_write_token_price': cache_write_token_price,
         'translation_input_token_price': translation_input_token_price,
         'output_token_price': output_token_price,
         'translation_output_token_price': translation_output_token_price
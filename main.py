@@ -1,65 +1,265 @@
 #!/usr/bin/env python3
+import contextvars
 import logging
 import math
-from langchain_openai import ChatOpenAI
-from langchain import PromptTemplate, LLMChain
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from use_llm.client_registry import get_chat_model
+from use_llm.token_budget import TokenBudget, get_default_token_budget
+from resilience.retry import CircuitOpenError, call_with_retry, is_retryable, stream_with_retry
+from telemetry.logging_config import configure_logging, payload
+from telemetry.tracing import mark_first_token, set_attributes, traced
+from fit_length.fitter import FitResult, fit_answer, fit_stats
+from fit_length.length_counter import DEFAULT_COUNT_RULE, CountRule, LengthCounter, get_count_rule
+from fit_length.patch import PATCH_PROMPT, PatchError, apply_patch, parse_patch, patch_prompt_inputs
 from dotenv import load_dotenv
-from typing import Tuple
+from typing import Callable, Optional, Tuple
 
 
 load_dotenv()
 
-# 로깅 설정: DEBUG 레벨
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def generate_answer(question: str, max_length: int, max_attempts: int = 10) -> str:
+ANSWER_MODEL = "o1-mini"
+# 첫 시도에서 동시에 생성할 후보 답변 수 (기본 1: 순차 재시도만 사용)
+# 2 이상이면 첫 시도 비용이 후보 수만큼 늘고 스트리밍 출력도 쓰지 않으므로 필요할 때만 켠다
+ANSWER_CANDIDATES = int(os.getenv("ANSWER_CANDIDATES", "1"))
+
+# 프롬프트 템플릿 구성 (추가 지시사항을 위한 변수 추가)
+ANSWER_PROMPT = (
+    "자기소개서 문항: {question}\n\n"
+    "위 문항에 대해 답변을 작성해 주세요. "
+    "답변은 최대 {max_length}자 이내이며, 최소 {lower_bound}자 이상 작성되어야 합니다.\n"
+    "{additional_instruction}"
+    "답변은 해당 조건을 엄격하게 준수해야 합니다."
+)
+
+@lru_cache(maxsize=None)
+def _prompt_template(template: str):
+    """template의 PromptTemplate (langchain_core는 import가 느리므로 첫 체인을 만들 때 불러온다)"""
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate.from_template(template)
+
+def get_answer_chain(max_tokens: Optional[int] = None):
+    """답변 생성용 체인 (프롬프트 | LLM)을 반환한다. 응답 메시지의 usage_metadata로 토큰 예산을 보정한다."""
+    return _prompt_template(ANSWER_PROMPT) | get_chat_model('openai', ANSWER_MODEL, temperature=1, max_tokens=max_tokens)
+
+def get_patch_chain():
+    """문장 단위 패치 수정용 체인 (프롬프트 | LLM)을 반환한다."""
+    return _prompt_template(PATCH_PROMPT) | get_chat_model('openai', ANSWER_MODEL, temperature=1)
+
+def _observe_answer(token_budget: Optional[TokenBudget], answer: str, usage: Optional[dict]) -> None:
+    """잘리지 않은 답변의 출력 토큰 수를 토큰 예산 보정값에 반영하고 저장한다."""
+    if token_budget is None or not usage:
+        return
+    if token_budget.observe(ANSWER_MODEL, answer, usage.get("output_tokens")):
+        token_budget.save()
+
+@traced('answer.stream_answer')
+def stream_answer(inputs: dict, stop_length: int, on_token: Optional[Callable[[str, int], None]] = None,
+                  attempt: int = 1, count_rule: CountRule = DEFAULT_COUNT_RULE,
+                  max_tokens: Optional[int] = None, token_budget: Optional[TokenBudget] = None) -> Tuple[str, bool]:
+    """
+    답변을 스트리밍으로 받으면서 누적 문자 수를 추적한다.
+    누적 문자 수가 stop_length를 넘으면 스트림을 닫아 더 이상 출력 토큰을 받지 않는다.
+    끝까지 받은 답변은 마지막 조각의 토큰 사용량으로 token_budget을 보정한다.
+    반환값은 (지금까지 받은 답변, 조기 중단 여부)이다.
+    """
+    chunks = []
+    usage = None
+    # 조각마다 전체를 다시 세지 않고 추가된 부분만 센다
+    counter = LengthCounter(count_rule)
+    # 첫 조각을 받기 전의 오류는 공용 재시도 계층(속도 제한, circuit breaker)에서 재시도한다
+    stream = stream_with_retry(get_answer_chain(max_tokens).stream, inputs, endpoint='openai')
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage_metadata", None):
+                usage = chunk.usage_metadata
+                set_attributes(completion_tokens=usage.get("output_tokens"))
+            text = chunk.content
+            if not text:
+                continue
+            if not chunks:
+                mark_first_token()
+            chunks.append(text)
+            answer_length = counter.append(text)
+            if on_token is not None:
+                on_token(text, attempt)
+            if answer_length > stop_length:
+                logger.warning("답변이 %s자를 넘어 스트림을 중단합니다. (현재 %s자)", stop_length, answer_length)
+                return "".join(chunks), True
+    finally:
+        stream.close()
+    answer = "".join(chunks)
+    _observe_answer(token_budget, answer, usage)
+    return answer, False
+
+def _fit_locally(answer: str, lower_bound: int, max_length: int,
+                 count_rule: CountRule = DEFAULT_COUNT_RULE) -> Optional[FitResult]:
+    """LLM 재시도 전에 로컬 길이 조정을 시도한다. 성공하면 FitResult, 실패하면 None을 반환한다."""
+    result = fit_answer(answer, lower_bound, max_length, count=count_rule.count)
+    fit_stats.record(result, needed_fit=True)
+    if not result.fitted:
+        return None
+    logger.info(
+        "로컬 길이 조정으로 LLM 재시도를 건너뜁니다. (%s자 -> %s자, 누적 절약 호출: %s회)",
+        count_rule.count(answer), result.length, fit_stats.llm_calls_saved
+    )
+    return result
+
+@traced('answer.patch_answer')
+def patch_answer(question: str, answer: str, lower_bound: int, max_length: int,
+                 count_rule: CountRule = DEFAULT_COUNT_RULE) -> str:
+    """
+    답변 전체를 다시 생성하지 않고, 바꿀 문장만 JSON 패치로 받아 로컬에서 적용한다.
+    패치를 해석하거나 적용할 수 없으면 PatchError를 발생시킨다.
+    """
+    inputs = patch_prompt_inputs(question, answer, lower_bound, max_length, count=count_rule.count)
+    response = call_with_retry(get_patch_chain().invoke, inputs, endpoint='openai')
+    operations = parse_patch(response.content)
+    logger.debug("패치 연산 %s개 수신", len(operations))
+    return apply_patch(answer, operations)
+
+def _length_gap(answer_length: int, lower_bound: int, max_length: int) -> int:
+    """답변 길이가 허용 범위에서 벗어난 문자 수 (범위 안이면 0)"""
+    if answer_length < lower_bound:
+        return lower_bound - answer_length
+    if answer_length > max_length:
+        return answer_length - max_length
+    return 0
+
+def sample_best_answer(inputs: dict, lower_bound: int, max_length: int, n: int,
+                       max_concurrency: Optional[int] = None, local_fit: bool = True,
+                       count_rule: CountRule = DEFAULT_COUNT_RULE,
+                       max_tokens: Optional[int] = None,
+                       token_budget: Optional[TokenBudget] = None) -> Tuple[str, bool]:
+    """
+    같은 프롬프트로 n개의 답변을 동시에 생성하고 가장 적합한 하나를 고른다.
+    1. 범위 안의 후보 중 가장 긴 답변
+    2. 로컬 길이 조정으로 범위에 맞출 수 있는 후보 (범위에 가까운 순)
+    3. 범위에 가장 가까운 답변 (이후 수정 프롬프트로 보완)
+    후보마다 call_with_retry로 호출하므로 속도 제한, circuit breaker, 재시도가 순차 호출과 같게 적용된다.
+    반환값은 (선택한 답변, 로컬 조정을 이미 시도했는지 여부)이다.
+    """
+    chain = get_answer_chain(max_tokens)
+    with ThreadPoolExecutor(max_workers=max_concurrency or n) as executor:
+        # 후보 호출도 현재 trace의 하위 span으로 기록되도록 context를 복사해 넘긴다
+        futures = [executor.submit(contextvars.copy_context().run, call_with_retry, chain.invoke, inputs,
+                                   endpoint='openai')
+                   for _ in range(n)]
+    candidates = []
+    for future in futures:
+        try:
+            result = future.result()
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error("후보 답변 생성 중 오류 발생: %s", e)
+            continue
+        _observe_answer(token_budget, result.content, result.usage_metadata)
+        candidates.append(result.content)
+    if not candidates:
+        raise ValueError("후보 답변을 하나도 생성하지 못했습니다.")
+    lengths = {candidate: count_rule.count(candidate) for candidate in candidates}
+    logger.debug("후보 답변 길이: %s", list(lengths.values()))
+
+    in_range = [candidate for candidate in candidates if lower_bound <= lengths[candidate] <= max_length]
+    if in_range:
+        logger.info("%s개 후보 중 %s개가 조건을 만족합니다.", len(candidates), len(in_range))
+        return max(in_range, key=lengths.get), False
+
+    candidates.sort(key=lambda candidate: _length_gap(lengths[candidate], lower_bound, max_length))
+    if local_fit:
+        for candidate in candidates:
+            fit_result = _fit_locally(candidate, lower_bound, max_length, count_rule)
+            if fit_result is not None:
+                return fit_result.text, True
+    return candidates[0], local_fit
+
+@traced('answer.generate_answer')
+def generate_answer(question: str, max_length: int, max_attempts: int = 10, stream: bool = False,
+                    on_token: Optional[Callable[[str, int], None]] = None, overshoot_ratio: float = 0.1,
+                    local_fit: bool = True, candidates: int = 1, max_concurrency: Optional[int] = None,
+                    correction: str = "patch", count_rule: CountRule = DEFAULT_COUNT_RULE,
+                    token_budget: Optional[TokenBudget] = None) -> str:
     """
     LLM을 통해 자기소개서 문항에 대해 답변을 생성하며, 생성된 답변의 길이가
     max_length의 0.5% 오차 범위(최소: max_length * 0.995, 최대: max_length) 내에 있는지 확인한다.
     만약 조건을 만족하지 않으면, 최대 max_attempts만큼 재시도하며, 부족한 문자 수를 LLM에 안내한다.
+    stream이 True이면 답변을 스트리밍으로 받아 on_token(text, attempt)으로 바로 전달하고,
+    max_length * (1 + overshoot_ratio)자를 넘는 순간 해당 시도를 중단한다.
+    local_fit이 True이면 범위를 벗어난 답변을 LLM에 다시 보내기 전에 fit_answer로 로컬 조정을 시도한다.
+    candidates가 1보다 크면 첫 시도에서 후보를 동시에(max_concurrency개씩) 생성해 가장 적합한 답변을 고르고,
+    조건을 만족하는 후보가 없을 때만 수정 프롬프트로 재시도한다 (첫 시도는 스트리밍하지 않음).
+    correction이 "patch"이면 재시도 시 답변 전체를 다시 받지 않고 바꿀 문장만 패치로 받아 적용하며,
+    패치가 실패하면 다음 시도는 기존 방식("rewrite": 답변 전체 재작성)으로 진행한다.
+    답변 길이는 count_rule(지원 사이트의 글자 수 계산 규칙)로 센다.
+    token_budget이 보정되어 있으면 max_length * (1 + overshoot_ratio)자에 맞춘 max_tokens로 출력을 제한하고,
+    잘리지 않고 끝까지 받은 답변의 토큰 사용량으로 token_budget을 다시 보정한다.
     """
     # 답변 길이 허용 범위 설정
     lower_bound = math.ceil(max_length * 0.995)
-    logger.debug(f"요청된 최대 길이: {max_length}자, 허용 최소 길이: {lower_bound}자")
-    
-    # 프롬프트 템플릿 구성 (추가 지시사항을 위한 변수 추가)
-    prompt_template_str = (
-        "자기소개서 문항: {question}\n\n"
-        "위 문항에 대해 답변을 작성해 주세요. "
-        "답변은 최대 {max_length}자 이내이며, 최소 {lower_bound}자 이상 작성되어야 합니다.\n"
-        "{additional_instruction}"
-        "답변은 해당 조건을 엄격하게 준수해야 합니다."
-    )
-    prompt_template = PromptTemplate(
-        template=prompt_template_str,
-        input_variables=["question", "max_length", "lower_bound", "additional_instruction"]
-    )
+    logger.debug("요청된 최대 길이: %s자, 허용 최소 길이: %s자", max_length, lower_bound)
     
-    # LangChain LLM 및 체인 초기화
-    llm = ChatOpenAI(model_name="o1-mini", temperature=1)
-    chain = LLMChain(llm=llm, prompt=prompt_template)
+    # 스트리밍 시 이 길이를 넘으면 명백한 초과로 보고 중단
+    stop_length = math.floor(max_length * (1 + overshoot_ratio))
+    # 명백한 초과 길이까지만 출력 토큰을 허용 (보정 데이터가 없으면 제한 없음)
+    max_tokens = token_budget.limit_max_tokens(ANSWER_MODEL, stop_length) if token_budget else None
+    # LangChain 체인 (같은 프로세스에서는 LLM 클라이언트를 재사용)
+    chain = get_answer_chain(max_tokens)
     
     attempt = 1
     additional_instruction = ""  # 첫 시도에서는 추가 안내 없음
     prev_missing = None  # 이전 부족 문자 수
     prev_excess = None   # 이전 초과 문자 수
+    patch_target = None  # 패치로 수정할 이전 답변
     while attempt <= max_attempts:
-        logger.debug(f"답변 생성 시도: {attempt}회")
+        logger.debug("답변 생성 시도: %s회", attempt)
+        set_attributes(attempts=attempt)
         try:
-            answer = chain.run(
+            inputs = dict(
                 question=question,
                 max_length=str(max_length),
                 lower_bound=str(lower_bound),
                 additional_instruction=additional_instruction
             )
-            answer_length = len(answer)
-            logger.debug(f"생성된 답변 길이: {answer_length}자")
+            fit_tried = False
+            if patch_target is not None:
+                # 다음 시도가 패치에 실패하면 전체 재작성으로 넘어가도록 먼저 비운다
+                previous_answer, patch_target = patch_target, None
+                answer = patch_answer(question, previous_answer, lower_bound, max_length, count_rule)
+                stopped_early = False
+            elif attempt == 1 and candidates > 1:
+                answer, fit_tried = sample_best_answer(inputs, lower_bound, max_length, candidates,
+                                                       max_concurrency, local_fit, count_rule, max_tokens,
+                                                       token_budget)
+                stopped_early = False
+            elif stream:
+                answer, stopped_early = stream_answer(inputs, stop_length, on_token, attempt, count_rule, max_tokens,
+                                                      token_budget)
+            else:
+                message = call_with_retry(chain.invoke, inputs, endpoint='openai')
+                _observe_answer(token_budget, message.content, message.usage_metadata)
+                answer, stopped_early = message.content, False
+            answer_length = count_rule.count(answer)
+            logger.debug("생성된 답변 길이: %s자", answer_length)
             
-            if lower_bound <= answer_length <= max_length:
+            if stopped_early:
+                # 잘린 답변은 수정 대상으로 쓸 수 없으므로 더 짧게 다시 작성하도록 안내
+                additional_instruction = (
+                    f"이전 답변은 {answer_length}자를 넘어 {max_length}자 제한을 크게 초과했습니다. "
+                    f"내용을 더 간결하게 하여 전체 조건(총 {lower_bound}~{max_length}자)을 만족하도록 다시 작성해 주세요.\n"
+                )
+                prev_excess = None
+            elif lower_bound <= answer_length <= max_length:
                 logger.info("생성된 답변이 조건을 만족합니다.")
                 return answer
             else:
+                # LLM에 다시 보내기 전에 로컬 조정으로 범위를 맞출 수 있는지 확인
+                fit_result = _fit_locally(answer, lower_bound, max_length, count_rule) if local_fit and not fit_tried else None
+                if fit_result is not None:
+                    return fit_result.text
                 # 부족하거나 초과하는 경우, LLM에 추가 정보를 제공하기 위한 안내 메시지 구성
                 if answer_length < lower_bound:
                     missing_min = lower_bound - answer_length
@@ -81,8 +281,8 @@ def generate_answer(question: str, max_length: int, max_attempts: int = 10) -> s
                         )
                     prev_missing = missing_min
                     logger.warning(
-                        f"생성된 답변 길이({answer_length}자)가 조건({lower_bound}-{max_length}자)에 맞지 않음. "
-                        f"추가 안내: {additional_instruction.strip()}"
+                        "생성된 답변 길이(%d자)가 조건(%d-%d자)에 맞지 않음. 추가 안내: %s",
+                        answer_length, lower_bound, max_length, payload(additional_instruction.strip())
                     )
                 else:  # answer_length > max_length 인 경우
                     excess = answer_length - max_length
@@ -103,11 +303,22 @@ def generate_answer(question: str, max_length: int, max_attempts: int = 10) -> s
                         )
                     prev_excess = excess
                     logger.warning(
-                        f"생성된 답변 길이({answer_length}자)가 조건({lower_bound}-{max_length}자)에 맞지 않음. "
-                        f"추가 안내: {additional_instruction.strip()}"
+                        "생성된 답변 길이(%d자)가 조건(%d-%d자)에 맞지 않음. 추가 안내: %s",
+                        answer_length, lower_bound, max_length, payload(additional_instruction.strip())
                     )
+                if correction == "patch":
+                    # 다음 시도에서는 이 답변의 바꿀 문장만 패치로 받는다
+                    patch_target = answer
+        except PatchError as e:
+            logger.warning("패치 수정 실패, 다음 시도는 전체 재작성으로 진행합니다: %s", e)
+        except CircuitOpenError:
+            # API 장애가 이어지는 중이므로 남은 시도를 소모하지 않고 중단
+            raise
         except Exception as e:
-            logger.error(f"답변 생성 중 오류 발생: {e}", exc_info=True)
+            logger.error("답변 생성 중 오류 발생: %s", e, exc_info=True)
+            if is_retryable(e):
+                # 속도 제한/일시적 오류는 call_with_retry에서 이미 재시도했으므로 시도를 더 소모하지 않는다
+                raise
         attempt += 1
     
     error_msg = f"최대 {max_attempts}회 시도 후에도 적절한 답변을 생성하지 못했습니다."
@@ -128,7 +339,7 @@ def get_user_input() -> Tuple[str, int]:
             raise ValueError("답변 길이는 양의 정수여야 합니다.")
         return question, max_length
     except Exception as e:
-        logger.error(f"입력 처리 중 오류 발생: {e}", exc_info=True)
+        logger.error("입력 처리 중 오류 발생: %s", e, exc_info=True)
         raise
 
 def main():
@@ -137,11 +348,23 @@ def main():
     """
     try:
         question, max_length = get_user_input()
-        answer = generate_answer(question, max_length)
-        print("\n생성된 답변:\n")
+
+        def print_token(text: str, attempt: int) -> None:
+            # 시도가 바뀌면 구분선을 출력하고, 생성 중인 답변을 바로 보여준다
+            if print_token.attempt != attempt:
+                print(f"\n\n[시도 {attempt}] 생성 중인 답변:\n", flush=True)
+                print_token.attempt = attempt
+            print(text, end="", flush=True)
+        print_token.attempt = None
+
+        answer = generate_answer(question, max_length, stream=True, on_token=print_token, candidates=ANSWER_CANDIDATES,
+                                 count_rule=get_count_rule(os.getenv("LENGTH_RULE")),
+                                 token_budget=get_default_token_budget())
+        print("\n\n생성된 답변:\n")
         print(answer)
     except Exception as e:
-        logger.error(f"메인 함수에서 오류 발생: {e}", exc_info=True)
+        logger.error("메인 함수에서 오류 발생: %s", e, exc_info=True)
 
 if __name__ == "__main__":
+    configure_logging()
     main()
\ No newline at end of file
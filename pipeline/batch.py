@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import itertools
+import logging
+
+from sheet.modify_sheet import GoogleSheet
+from get_data.get_token_price import get_default_price_table
+from use_llm.token_budget import get_default_token_budget
+from pipeline.run_store import flush_runs, record_runs
+from telemetry.logging_config import configure_logging
+from telemetry.tracing import traced
+from pipeline.evaluation import (SETTING_KEYS, add_cost, agenerate, atranslate, finish_prefetch, observe_token_usage,
+                                 render_prompt, resolve_settings, start_prefetch)
+
+logger = logging.getLogger(__name__)
+
+def settings_grid(**axes):
+    """설정 항목별 후보 목록의 모든 조합을 settings dict 목록으로 만드는 함수
+
+    예: settings_grid(model=['gpt-4o', 'claude-3-7-sonnet-latest'], temperature=[0, 1])
+    """
+    invalid_keys = set(axes) - set(SETTING_KEYS)
+    if invalid_keys:
+        raise ValueError(f"Invalid setting keys: {sorted(invalid_keys)}")
+    keys = list(axes)
+    values = [axis if isinstance(axis, (list, tuple)) else [axis] for axis in axes.values()]
+    return [dict(zip(keys, combination)) for combination in itertools.product(*values)]
+
+
+@traced('pipeline.batch')
+async def arun_batch(purpose, grid=None, sheet=None, price_table=None, rate_provider=None,
+                     max_concurrency=4, token_budget=None, run_store=None):
+    """여러 모델 설정으로 평가를 병렬 실행하고 모든 결과 행을 한 번에 기록하는 함수
+
+    결과는 실행 기록 저장소에 저장되고 반환 전에 evaluation 시트에 쓴다 (실패하면 백그라운드 SheetExporter가 다시 시도).
+    제공자별 속도 제한과 circuit breaker는 resilience.retry의 엔드포인트(RATE_LIMIT_OPENAI 등)가 호출마다 적용한다.
+
+    Args:
+        purpose (str): GoogleSheet purpose ('motivation', 'core_experience')
+        grid (list[dict]): 실행할 settings 목록 (없으면 model_setting 시트의 모든 행)
+        max_concurrency (int): 동시에 진행할 평가 수
+        token_budget (TokenBudget): max_tokens 예측에 쓸 보정값 (없으면 TOKEN_BUDGET_PATH에서 읽음)
+
+    Returns:
+        list[dict]: 성공한 evaluation data 목록 (grid 순서)
+    """
+    if sheet is None:
+        sheet = GoogleSheet(purpose)
+    if price_table is None:
+        price_table = get_default_price_table()
+    if token_budget is None:
+        token_budget = get_default_token_budget()
+
+    prefetch = start_prefetch(sheet, price_table, rate_provider)
+    if grid is None:
+        config, grid = await asyncio.gather(
+            asyncio.to_thread(sheet.load_config),
+            asyncio.to_thread(sheet.get_model_settings),
+        )
+    else:
+        config = await asyncio.to_thread(sheet.load_config)
+    rendered = render_prompt(config)
+    logger.info("Running batch of %s settings (max concurrency: %s)", len(grid), max_concurrency)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # 같은 번역 설정을 쓰는 실행끼리는 번역 결과를 공유한다
+    translations = {}
+
+    def get_translation(settings):
+        key = (settings['translation_model'], settings['translation_temperature'])
+        if key not in translations:
+            translations[key] = asyncio.ensure_future(atranslate(rendered.text, settings, rendered.prefix,
+                                                                    prompt_key=rendered.key))
+        return translations[key]
+
+    async def run_one(settings):
+        settings = resolve_settings(config, settings)
+        async with semaphore:
+            translation = await get_translation(settings)
+            return await agenerate(config, rendered, settings, translation=translation,
+                                   token_budget=token_budget)
+
+    results = await asyncio.gather(*(run_one(settings) for settings in grid), return_exceptions=True)
+    exchange_rate = await finish_prefetch(prefetch)
+
+    data_list = []
+    for settings, result in zip(grid, results):
+        if isinstance(result, Exception):
+            logger.error("Batch run failed for settings %s: %s", settings, result)
+            continue
+        # 비용 계산이 실패한 행은 cost_error를 남기고 나머지 행과 함께 기록한다
+        data_list.append(add_cost(result, price_table, exchange_rate))
+    cost_errors = sum(1 for data in data_list if data.get('cost_error'))
+    if cost_errors:
+        logger.warning("Cost not calculated for %s/%s batch rows", cost_errors, len(data_list))
+
+    if data_list:
+        await asyncio.to_thread(record_runs, purpose, sheet, data_list, run_store)
+        await asyncio.to_thread(observe_token_usage, token_budget, data_list)
+        await asyncio.to_thread(flush_runs, purpose, sheet, run_store)
+    logger.info("Batch finished: %s/%s succeeded", len(data_list), len(grid))
+    return data_list
+
+
+def run_batch(purpose, **kwargs):
+    """arun_batch의 동기 진입점"""
+    return asyncio.run(arun_batch(purpose, **kwargs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="model_setting 시트의 모든 설정으로 평가를 병렬 실행합니다.")
+    parser.add_argument('purpose', choices=['motivation', 'core_experience'])
+    parser.add_argument('--max-concurrency', type=int, default=4)
+    args = parser.parse_args()
+    configure_logging()
+    run_batch(args.purpose, max_concurrency=args.max_concurrency)
@@ -0,0 +1,372 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+
+from sheet.modify_sheet import GoogleSheet
+from use_llm.generate import agenerate_cover_letter, atranslate_to_english
+from get_data.get_token_price import get_default_price_table
+from calculation_cost.cost import calculation_cost, usd_to_krw
+from calculation_cost.exchange_rate import DEFAULT_EXCHANGE_RATE, FixedRateProvider, get_exchange_rate
+from use_llm.token_budget import detect_language, estimate_tokens, get_default_token_budget, parse_max_length
+from pipeline.run_store import flush_runs, record_runs
+from pipeline.prompt_template import compile_template, content_hash
+from telemetry.tracing import span, traced
+
+logger = logging.getLogger(__name__)
+
+# prompt_structure와 situation 템플릿에서 쓸 수 있는 필드
+PROMPT_FIELDS = ('role', 'situation', 'job_posting', 'question', 'core_experience', 'knowledge', 'issue')
+SITUATION_FIELDS = ('company', 'job')
+# 렌더링 결과를 결정하는 SheetConfig 항목 (프롬프트 키의 입력)
+PROMPT_INPUT_FIELDS = ('prompt_structure', 'situation', 'company', 'job', 'role', 'job_posting', 'question',
+                       'core_experience', 'knowledge', 'issue')
+# 실행마다 바뀌는 프롬프트 항목 (나머지 항목으로 이루어진 앞부분은 프롬프트 캐시 대상)
+VARIABLE_PROMPT_FIELDS = ('question', 'issue')
+# on이면 고정 앞부분과 나머지를 따로 번역해 생성 모델의 프롬프트 캐시를 적중시킨다 (번역 호출이 2번으로 늘어난다)
+PROMPT_CACHE_ENABLED = os.getenv('PROMPT_CACHE', 'off') == 'on'
+# 번역된 고정 앞부분이 이보다 짧으면 캐시되지 않으므로 나누지 않는다 (제공자 최소 캐시 단위 1024 토큰)
+PROMPT_CACHE_MIN_TOKENS = int(os.getenv('PROMPT_CACHE_MIN_TOKENS', '1024'))
+# on이면 단계별 소요 시간, 생성 속도, 재시도 수를 evaluation 시트의 추가 열에도 기록한다
+TELEMETRY_COLUMNS = os.getenv('TELEMETRY_COLUMNS', 'off') == 'on'
+
+# 실행마다 바꿀 수 있는 모델 설정 항목
+SETTING_KEYS = ('model', 'temperature', 'max_tokens', 'thinking', 'budget_tokens',
+                'translation_model', 'translation_temperature')
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    """render_prompt 결과
+
+    key: 프롬프트 입력(템플릿과 값)의 sha256. 번역 캐시 키와 실행 기록(prompt_key)에 쓰며,
+        같은 key의 실행 기록은 같은 프롬프트로 실행한 것이다.
+    prefix: split_prompt의 고정 앞부분 (프롬프트 캐싱을 쓰지 않으면 '')
+    """
+    text: str
+    key: str
+    prefix: str = ''
+
+
+def _compile(template, fields, name):
+    if not template:
+        raise ValueError(f"Empty prompt template: {name}")
+    try:
+        return compile_template(template, fields)
+    except ValueError as e:
+        raise ValueError(f"{name}: {str(e)}") from e
+
+
+def _prompt_values(config):
+    situation = _compile(config.situation, SITUATION_FIELDS, 'situation').render(
+        {'company': config.company, 'job': config.job})
+    return dict(
+        role=config.role,
+        situation=situation,
+        job_posting=config.job_posting,
+        question=config.question,
+        core_experience=config.core_experience,
+        knowledge=config.knowledge,
+        issue=config.issue,
+    )
+
+
+def prompt_key(config):
+    """프롬프트 입력(템플릿과 값)의 내용 해시"""
+    return content_hash({field: getattr(config, field) for field in PROMPT_INPUT_FIELDS})
+
+
+def render_prompt(config):
+    """prompt_structure를 검사하고 채워 RenderedPrompt를 반환하는 함수
+
+    템플릿은 한 번만 파싱하며, 허용되지 않은 placeholder가 있으면 API를 호출하기 전에 ValueError를 발생시킨다.
+    """
+    structure = _compile(config.prompt_structure, PROMPT_FIELDS, 'prompt_structure')
+    values = _prompt_values(config)
+    empty_fields = [field for field in structure.fields if values[field] is None]
+    if empty_fields:
+        logger.warning("Prompt fields without sheet values: %s", empty_fields)
+    text = structure.render(values)
+    return RenderedPrompt(text, prompt_key(config), _prompt_prefix(structure, values, text))
+
+
+def format_prompt(config):
+    """SheetConfig의 값으로 prompt_structure를 채운 프롬프트를 만드는 함수"""
+    return render_prompt(config).text
+
+
+def _prompt_prefix(structure, values, formatted_prompt):
+    if not PROMPT_CACHE_ENABLED:
+        return ''
+    markers = {field: f"\x00{field}\x00" for field in VARIABLE_PROMPT_FIELDS}
+    marked = structure.render({**values, **markers})
+    positions = [marked.find(marker) for marker in markers.values() if marker in marked]
+    prefix = marked[:min(positions)] if positions else formatted_prompt
+    # 번역 결과를 다시 이어 붙이기 쉽도록 줄 단위로 자른다
+    prefix = prefix[:prefix.rfind('\n') + 1]
+    # 한국어 원문의 추정 토큰 수는 번역 후보다 크므로, 이 값이 작으면 번역해도 최소 캐시 단위에 못 미친다
+    if estimate_tokens(prefix) < PROMPT_CACHE_MIN_TOKENS:
+        return ''
+    return prefix
+
+
+def split_prompt(config, formatted_prompt=None):
+    """프롬프트를 (고정 앞부분, 나머지)로 나누는 함수
+
+    고정 앞부분은 VARIABLE_PROMPT_FIELDS가 처음 나오는 줄 앞까지이며, 같은 공고/경험으로 실행하면 항상 같다.
+    프롬프트 캐싱(PROMPT_CACHE=on)이 꺼져 있거나 앞부분이 PROMPT_CACHE_MIN_TOKENS보다 짧으면 ('', 프롬프트)를 반환한다.
+    """
+    rendered = render_prompt(config)
+    if formatted_prompt is None:
+        formatted_prompt = rendered.text
+    if not rendered.prefix or not formatted_prompt.startswith(rendered.prefix):
+        return '', formatted_prompt
+    return rendered.prefix, formatted_prompt[len(rendered.prefix):]
+
+
+def resolve_settings(config, settings=None):
+    """config의 모델 설정에 settings의 값을 덮어쓴 dict를 반환하는 함수"""
+    resolved = {key: getattr(config, key) for key in SETTING_KEYS}
+    resolved.update(settings or {})
+    return resolved
+
+
+async def atranslate(formatted_prompt, settings, prompt_prefix='', prompt_key=None):
+    """프롬프트를 번역하고 번역 관련 evaluation 값을 dict로 반환하는 함수
+
+    prompt_prefix(split_prompt의 고정 앞부분)가 있으면 앞부분과 나머지를 따로 번역한다.
+    앞부분 번역은 번역 캐시에서 그대로 재사용되므로 영어 프롬프트의 앞부분도 실행마다 같아져
+    생성 모델의 프롬프트 캐시를 적중시킨다 (번역 temperature가 0이 아니면 TRANSLATION_CACHE=on일 때만). 번역된 앞부분이 PROMPT_CACHE_MIN_TOKENS보다 짧으면
+    캐시되지 않으므로 prompt_english_prefix는 ''로 둔다.
+    prompt_key(RenderedPrompt.key)가 있으면 프롬프트 전체 번역의 캐시 키로 원문 대신 사용한다.
+    """
+    model, temperature = settings['translation_model'], settings['translation_temperature']
+    if not prompt_prefix:
+        prompt_english, translation_completion_tokens, translation_prompt_tokens, translation_total_tokens, translation_model_name = await atranslate_to_english(
+            formatted_prompt, model=model, temperature=temperature, source_key=prompt_key)
+        prompt_english_prefix = ''
+    else:
+        rest = formatted_prompt[len(prompt_prefix):]
+        parts = [prompt_prefix, rest] if rest.strip() else [prompt_prefix]
+        results = await asyncio.gather(*(atranslate_to_english(part, model=model, temperature=temperature) for part in parts))
+        # 번역 결과의 앞뒤 공백은 일정하지 않으므로 원문 앞부분 끝의 줄바꿈으로 다시 잇는다
+        separator = prompt_prefix[len(prompt_prefix.rstrip()):]
+        prompt_english_prefix = results[0][0].rstrip() + separator
+        prompt_english = prompt_english_prefix + ''.join(result[0].lstrip() for result in results[1:])
+        if estimate_tokens(prompt_english_prefix) < PROMPT_CACHE_MIN_TOKENS:
+            prompt_english_prefix = ''
+        translation_completion_tokens, translation_prompt_tokens, translation_total_tokens = (
+            sum(result[i] for result in results) for i in (1, 2, 3))
+        translation_model_name = results[-1][4]
+    return {'prompt_english': prompt_english,
+            'prompt_english_prefix': prompt_english_prefix,
+            'translation_model': settings['translation_model'],
+            'translation_model_name': translation_model_name,
+            'translation_temperature': settings['translation_temperature'],
+            'translation_prompt_tokens': translation_prompt_tokens,
+            'translation_completion_tokens': translation_completion_tokens,
+            'translation_total_tokens': translation_total_tokens}
+
+
+def answer_language(config):
+    """답변 언어 ('ko' 또는 'en')
+
+    프롬프트는 영어로 번역해 생성하지만 답변은 문항의 언어로 쓰므로, 번역된 프롬프트가 아니라 문항으로 판단한다
+    (TokenBudget.observe도 답변 텍스트의 언어로 보정값을 저장한다). 문항이 비어 있으면 'ko'.
+    """
+    return detect_language(config.question) if config.question else 'ko'
+
+
+def budget_max_tokens(config, settings, token_budget, language=None):
+    """문항의 글자 수 제한과 보정된 토큰당 글자 수로 max_tokens를 줄이는 함수
+
+    문항에 글자 수 제한이 없거나 보정 데이터가 부족하면 시트의 max_tokens를 그대로 쓴다.
+    language는 답변 언어로, 없으면 answer_language(config)를 쓴다.
+    """
+    if token_budget is None:
+        return settings['max_tokens']
+    extra_tokens = settings['budget_tokens'] if settings['thinking'] == 'on' else 0
+    language = language or answer_language(config)
+    return token_budget.limit_max_tokens(settings['model'], parse_max_length(config.question),
+                                         settings['max_tokens'], language=language, extra_tokens=extra_tokens)
+
+
+def generation_prompt_key(prompt_key, translation):
+    """생성 캐시에 쓸 생성 입력의 키 (프롬프트 키와 번역 설정, 프롬프트 캐싱 분할 여부의 해시)
+
+    번역 결과 본문 대신 번역을 결정하는 값으로 키를 만들므로 생성 캐시가 긴 영어 프롬프트를 다시 해시하지 않는다.
+    """
+    return content_hash(prompt_key, translation['translation_model'], translation['translation_temperature'],
+                        bool(translation.get('prompt_english_prefix')))
+
+
+async def agenerate(config, prompt, settings=None, translation=None, token_budget=None):
+    """번역 -> 생성을 수행하고 비용을 제외한 evaluation data dict를 반환하는 함수
+
+    Args:
+        config (SheetConfig): 시트 설정 스냅샷
+        prompt (RenderedPrompt): render_prompt(config) 결과 (호출한 쪽에서 한 번만 렌더링해 넘긴다)
+        settings (dict): config의 모델 설정 대신 사용할 값 (SETTING_KEYS)
+        translation (dict): 이미 수행한 atranslate 결과 (없으면 새로 번역)
+        token_budget (TokenBudget): max_tokens 예측에 쓸 보정값 (없으면 시트의 max_tokens 사용)
+    """
+    settings = resolve_settings(config, settings)
+    translation_span = None
+    if translation is None:
+        with span('pipeline.translate', model=settings['translation_model']) as translation_span:
+            translation = await atranslate(prompt.text, settings, prompt.prefix, prompt_key=prompt.key)
+
+    with span('pipeline.generate', model=settings['model']) as generation_span:
+        (result, thinking_result, completion_tokens, prompt_tokens, total_tokens, model_name,
+         cache_read_tokens, cache_creation_tokens) = await agenerate_cover_letter(
+            translation['prompt_english'], model=settings['model'], temperature=settings['temperature'],
+            max_tokens=budget_max_tokens(config, settings, token_budget),
+            thinking=settings['thinking'], budget_tokens=settings['budget_tokens'],
+            prompt_prefix=translation.get('prompt_english_prefix'), prompt_key=generation_prompt_key(prompt.key, translation))
+
+    data = {'formatted_prompt': prompt.text,
+            'prompt_key': prompt.key,
+            'result': result,
+            'thinking': thinking_result,
+            'model': settings['model'],
+            'model_name': model_name,
+            'temperature': settings['temperature'],
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': total_tokens,
+            'cache_read_tokens': cache_read_tokens,
+            'cache_creation_tokens': cache_creation_tokens}
+    data.update(translation)
+    # 번역 앞부분은 생성 입력에만 쓰고 시트에는 기록하지 않는다
+    data.pop('prompt_english_prefix', None)
+    if TELEMETRY_COLUMNS:
+        data.update(telemetry_columns(generation_span, completion_tokens, translation_span))
+    return data
+
+
+def telemetry_columns(generation_span, completion_tokens, translation_span=None):
+    """생성(과 번역) span을 evaluation 시트 추가 열의 값으로 변환하는 함수
+
+    batch처럼 여러 실행이 번역을 공유하면 translation_span이 없으므로 translation_ms는 기록하지 않는다.
+    """
+    columns = {'generation_ms': generation_span.duration_ms,
+               'tokens_per_second': round(completion_tokens / generation_span.duration_ms * 1000, 1)
+               if completion_tokens and generation_span.duration_ms else None,
+               'retries': generation_span.total('retries')}
+    if translation_span is not None:
+        columns['translation_ms'] = translation_span.duration_ms
+        columns['retries'] += translation_span.total('retries')
+    return columns
+
+
+def _priced_model(price_table, *names):
+    """names 중 가격표에 있는 첫 모델 이름 (모두 없으면 첫 이름을 반환해 calculation_cost가 ValueError를 발생시킨다)"""
+    names = [name for name in dict.fromkeys(names) if name]
+    for name in names:
+        try:
+            price_table.get_price(name)
+        except ValueError:
+            continue
+        return name
+    return names[0]
+
+
+def add_cost(data, price_table, exchange_rate):
+    """evaluation data dict에 cost(USD)와 krw_cost를 추가하는 함수
+
+    가격은 요청한 모델 이름으로 먼저 찾고, 없으면 응답의 model_name(스냅샷 이름일 수 있음)으로 찾는다.
+    생성 비용은 이미 지불했으므로 비용 계산이 실패해도 예외를 던지지 않는다.
+    cost, krw_cost를 None으로 두고 cost_error에 실패 이유를 남긴 채 행을 그대로 기록한다.
+    """
+    model = data.get('model') or data['model_name']
+    try:
+        model = _priced_model(price_table, data.get('model'), data['model_name'])
+        translation_model = _priced_model(price_table, data.get('translation_model'), data['translation_model_name'])
+        data['cost'] = calculation_cost(model, translation_model,
+                                        data['prompt_tokens'], data['completion_tokens'],
+                                        data['translation_prompt_tokens'], data['translation_completion_tokens'],
+                                        price_table=price_table,
+                                        cache_read_tokens=data.get('cache_read_tokens', 0),
+                                        cache_creation_tokens=data.get('cache_creation_tokens', 0))
+        data['krw_cost'] = usd_to_krw(data['cost'], rate_provider=FixedRateProvider(exchange_rate))
+    except ValueError as e:
+        # 가격표에 모델이 없는 경우
+        logger.warning("Cost not calculated for %s: %s", model, e)
+        data.update(cost=None, krw_cost=None, cost_error=str(e))
+    except Exception as e:
+        logger.exception("Cost calculation failed for %s", model)
+        data.update(cost=None, krw_cost=None, cost_error=str(e))
+    return data
+
+
+def observe_token_usage(token_budget, data_list):
+    """생성 결과를 토큰 예산 보정값에 반영하고 저장하는 함수"""
+    observed = [token_budget.observe(data.get('model') or data['model_name'], data['result'],
+                                     data['completion_tokens'], data['thinking'])
+                for data in data_list]
+    if any(observed):
+        token_budget.save()
+
+
+def start_prefetch(sheet, price_table, rate_provider=None):
+    """설정 조회와 의존하지 않는 가격표, 환율, evaluation 시트 메타데이터 조회를 백그라운드로 시작하는 함수
+
+    Returns:
+        tuple: (가격표 로드 task, 환율 task, 메타데이터 task)
+    """
+    return (
+        asyncio.create_task(asyncio.to_thread(price_table.load)),
+        asyncio.create_task(asyncio.to_thread(get_exchange_rate, None, rate_provider)),
+        asyncio.create_task(asyncio.to_thread(sheet.get_sheet_id, 'evaluation')),
+    )
+
+
+async def finish_prefetch(tasks):
+    """start_prefetch task들을 기다려 환율을 반환하는 함수
+
+    가격표나 메타데이터 조회가 실패해도 생성 결과는 기록해야 하므로 예외를 던지지 않는다
+    (가격표는 add_cost에서 다시 읽고, 메타데이터는 기록할 때 다시 조회한다).
+    """
+    price_result, exchange_rate, metadata_result = await asyncio.gather(*tasks, return_exceptions=True)
+    for name, result in (('price table', price_result), ('sheet metadata', metadata_result)):
+        if isinstance(result, Exception):
+            logger.warning("Prefetching %s failed: %s", name, result)
+    if isinstance(exchange_rate, Exception):
+        logger.warning("Prefetching exchange rate failed: %s", exchange_rate)
+        exchange_rate = DEFAULT_EXCHANGE_RATE
+    return exchange_rate
+
+
+@traced('pipeline.evaluation')
+async def arun_evaluation(purpose, sheet=None, price_table=None, rate_provider=None, token_budget=None,
+                          run_store=None):
+    """시트 설정으로 평가 한 건을 실행하고 실행 기록 저장소에 기록하는 함수
+
+    가격표 로드, 환율 조회, 시트 메타데이터 조회는 설정 조회, 번역, 생성과 동시에 진행되므로
+    전체 시간은 가장 느린 의존 경로(설정 조회 -> 번역 -> 생성 -> 기록)에 가까워진다.
+    결과는 실행 기록 저장소에 남기고 반환 전에 evaluation 시트에 쓴다 (실패하면 백그라운드 SheetExporter가 다시 시도).
+    """
+    if sheet is None:
+        sheet = GoogleSheet(purpose)
+    if price_table is None:
+        price_table = get_default_price_table()
+    if token_budget is None:
+        token_budget = get_default_token_budget()
+
+    prefetch = start_prefetch(sheet, price_table, rate_provider)
+    config = await asyncio.to_thread(sheet.load_config)
+    data = await agenerate(config, render_prompt(config), token_budget=token_budget)
+
+    add_cost(data, price_table, await finish_prefetch(prefetch))
+
+    await asyncio.to_thread(record_runs, purpose, sheet, [data], run_store)
+    await asyncio.to_thread(observe_token_usage, token_budget, [data])
+    # 백그라운드 내보내기를 기다리지 않고 반환 전에 시트에 쓴다
+    await asyncio.to_thread(flush_runs, purpose, sheet, run_store)
+    logger.info("Evaluation run recorded: %s", data['model_name'])
+    return data
+
+
+def run_evaluation(purpose, **kwargs):
+    """arun_evaluation의 동기 진입점"""
+    return asyncio.run(arun_evaluation(purpose, **kwargs))
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import logging
+import string
+from dataclasses import dataclass
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+_formatter = string.Formatter()
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """placeholder를 검사하고 (리터럴, 필드) 조각으로 미리 나눈 템플릿
+
+    fields는 템플릿에 나오는 필드 이름 (처음 나온 순서, 중복 제거)이다.
+    """
+    template: str
+    fields: tuple
+    parts: tuple
+
+    def render(self, values):
+        """values(dict)로 템플릿을 채운 문자열 (str.format과 같은 결과)"""
+        rendered = []
+        for literal, field_name, format_spec, conversion in self.parts:
+            rendered.append(literal)
+            if field_name is None:
+                continue
+            value = values[field_name]
+            if conversion:
+                value = {'r': repr, 's': str, 'a': ascii}[conversion](value)
+            rendered.append(format(value, format_spec) if format_spec else str(value))
+        return ''.join(rendered)
+
+
+@lru_cache(maxsize=256)
+def compile_template(template, allowed_fields):
+    """template을 한 번 파싱하고 placeholder가 allowed_fields 안에 있는지 검사하는 함수 (같은 입력은 재사용)
+
+    Args:
+        template (str): str.format 형식의 템플릿
+        allowed_fields (tuple): 사용할 수 있는 필드 이름
+
+    Raises:
+        ValueError: 중괄호가 짝이 맞지 않거나, 위치 인자/속성/인덱스 접근을 쓰거나, 허용되지 않은 필드가 있는 경우
+    """
+    try:
+        parsed = list(_formatter.parse(template))
+    except ValueError as e:
+        raise ValueError(f"Invalid prompt template: {str(e)}") from e
+
+    parts = []
+    fields = []
+    invalid = []
+    for literal, field_name, format_spec, conversion in parsed:
+        if field_name is not None:
+            if not field_name.isidentifier():
+                # '{}', '{0}', '{company.name}', '{values[0]}' 등은 시트 값으로 채울 수 없다
+                invalid.append(field_name or '{}')
+            elif field_name not in allowed_fields:
+                invalid.append(field_name)
+            elif field_name not in fields:
+                fields.append(field_name)
+            if format_spec and '{' in format_spec:
+                invalid.append(f"{field_name}:{format_spec}")
+        parts.append((literal, field_name, format_spec, conversion))
+    if invalid:
+        raise ValueError(f"Invalid prompt placeholders: {sorted(set(invalid))} "
+                         f"(available: {', '.join(allowed_fields)})")
+    return CompiledTemplate(template, tuple(fields), tuple(parts))
+
+
+def content_hash(*values):
+    """값들을 JSON으로 직렬화한 sha256 (프롬프트 입력이 같은지 비교하는 키)"""
+    payload = json.dumps(values, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
@@ -0,0 +1,313 @@
+import argparse
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from resilience.retry import CircuitOpenError, is_retryable
+
+logger = logging.getLogger(__name__)
+
+RUN_STORE_PATH = os.getenv('RUN_STORE_PATH', os.path.join('.cache', 'runs.sqlite3'))
+RUN_STORE_ENABLED = os.getenv('RUN_STORE', 'on') != 'off'
+# 백그라운드 내보내기 주기(초)와 한 번에 시트에 쓰는 최대 행 수
+RUN_EXPORT_INTERVAL = float(os.getenv('RUN_EXPORT_INTERVAL', '5'))
+RUN_EXPORT_BATCH_SIZE = int(os.getenv('RUN_EXPORT_BATCH_SIZE', '50'))
+# 시트에 쓰지 못한 행을 다시 시도하는 최대 횟수 (넘으면 dead letter로 남기고 더 이상 내보내지 않는다)
+RUN_EXPORT_MAX_ATTEMPTS = int(os.getenv('RUN_EXPORT_MAX_ATTEMPTS', '5'))
+
+
+class RunStore:
+    """평가 결과(evaluation data dict)를 SQLite에 추가만 하는 실행 기록 저장소
+
+    시트에 아직 기록하지 않은 행은 exported_at이 NULL이며, SheetExporter가 모아서 시트에 쓴다.
+    시트에 쓰지 못한 횟수(attempts)가 max_attempts에 이른 행은 dead letter로 남아 pending에서 빠진다.
+    """
+
+    def __init__(self, path=RUN_STORE_PATH, max_attempts=RUN_EXPORT_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            store_dir = os.path.dirname(self.path)
+            if store_dir:
+                os.makedirs(store_dir, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, purpose TEXT NOT NULL, created_at REAL NOT NULL, "
+                "data TEXT NOT NULL, exported_at REAL)"
+            )
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(runs)")}
+            # 이전 버전에서 만든 저장소에는 내보내기 실패 기록 열이 없다
+            if 'attempts' not in columns:
+                self._connection.execute("ALTER TABLE runs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            if 'last_error' not in columns:
+                self._connection.execute("ALTER TABLE runs ADD COLUMN last_error TEXT")
+            if 'prompt_key' not in columns:
+                self._connection.execute("ALTER TABLE runs ADD COLUMN prompt_key TEXT")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS runs_pending ON runs (purpose, exported_at, id)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS runs_prompt_key ON runs (prompt_key)")
+            self._connection.commit()
+        return self._connection
+
+    def append(self, purpose, data_list):
+        """evaluation data dict 목록을 저장하고 행 id 목록을 반환하는 함수 (data의 prompt_key는 별도 열에도 저장)"""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            ids = []
+            for data in data_list:
+                cursor = connection.execute(
+                    "INSERT INTO runs (purpose, created_at, data, prompt_key) VALUES (?, ?, ?, ?)",
+                    (purpose, now, json.dumps(data, ensure_ascii=False, default=str), data.get('prompt_key')))
+                ids.append(cursor.lastrowid)
+            connection.commit()
+        logger.debug("Stored %s runs for %s", len(ids), purpose)
+        return ids
+
+    def pending(self, purpose, limit=RUN_EXPORT_BATCH_SIZE, after_id=0):
+        """시트에 기록하지 않은 (id, data) 목록을 오래된 순으로 반환하는 함수 (dead letter 제외, id > after_id)"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT id, data FROM runs WHERE purpose = ? AND exported_at IS NULL AND attempts < ? AND id > ? "
+                "ORDER BY id LIMIT ?", (purpose, self.max_attempts, after_id, limit)).fetchall()
+        return [(run_id, json.loads(data)) for run_id, data in rows]
+
+    def pending_purposes(self):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT DISTINCT purpose FROM runs WHERE exported_at IS NULL AND attempts < ?",
+                (self.max_attempts,)).fetchall()
+        return [row[0] for row in rows]
+
+    def record_failure(self, run_id, error):
+        """행 하나를 시트에 쓰지 못했음을 기록하는 함수
+
+        Returns:
+            bool: 이번 실패로 dead letter가 되었으면 True
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute("UPDATE runs SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                               (str(error), run_id))
+            attempts = connection.execute("SELECT attempts FROM runs WHERE id = ?", (run_id,)).fetchone()[0]
+            connection.commit()
+        return attempts >= self.max_attempts
+
+    def dead_letters(self, purpose=None):
+        """재시도 횟수를 넘겨 내보내지 않는 (id, purpose, attempts, last_error) 목록"""
+        query = "SELECT id, purpose, attempts, last_error FROM runs WHERE exported_at IS NULL AND attempts >= ?"
+        params = (self.max_attempts,)
+        if purpose is not None:
+            query, params = query + " AND purpose = ?", params + (purpose,)
+        with self._lock:
+            return self._connect().execute(query + " ORDER BY id", params).fetchall()
+
+    def reset_failures(self, purpose=None):
+        """dead letter 행의 실패 기록을 지워 다시 내보내게 하는 함수 (다시 시도할 행 수 반환)"""
+        query = "UPDATE runs SET attempts = 0 WHERE exported_at IS NULL AND attempts >= ?"
+        params = (self.max_attempts,)
+        if purpose is not None:
+            query, params = query + " AND purpose = ?", params + (purpose,)
+        with self._lock:
+            connection = self._connect()
+            count = connection.execute(query, params).rowcount
+            connection.commit()
+        return count
+
+    def mark_exported(self, ids):
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.executemany("UPDATE runs SET exported_at = ? WHERE id = ?", [(now, run_id) for run_id in ids])
+            connection.commit()
+
+    def runs(self, purpose=None, prompt_key=None):
+        """저장된 data dict를 오래된 순으로 반환하는 함수 (분석용, prompt_key를 주면 같은 프롬프트로 실행한 기록만)"""
+        conditions, params = [], ()
+        if purpose is not None:
+            conditions, params = conditions + ["purpose = ?"], params + (purpose,)
+        if prompt_key is not None:
+            conditions, params = conditions + ["prompt_key = ?"], params + (prompt_key,)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._connect().execute(f"SELECT data FROM runs{where} ORDER BY id", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+class SheetExporter:
+    """RunStore의 미기록 행을 백그라운드 스레드에서 모아 evaluation 시트에 한 번에 쓰는 클래스
+
+    notify()를 호출하거나 interval초가 지나면 내보낸다. 일시적인 오류(속도 제한, 서버 오류, circuit open)로
+    실패하면 다음 주기에 다시 시도하고, 그 밖의 오류는 행을 하나씩 다시 써 보고 실패한 행마다 횟수를 센다
+    (RunStore.max_attempts를 넘으면 dead letter).
+    stop()은 남은 행을 모두 내보낸 뒤 스레드를 끝낸다 (프로세스 종료 시 자동 호출).
+    """
+
+    def __init__(self, store, sheet, purpose, interval=RUN_EXPORT_INTERVAL, batch_size=RUN_EXPORT_BATCH_SIZE):
+        self.store = store
+        self.sheet = sheet
+        self.purpose = purpose
+        self.interval = interval
+        self.batch_size = batch_size
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._export_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"sheet-exporter-{self.purpose}", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def notify(self):
+        """새 행이 저장되었음을 알리는 함수 (바로 내보내기를 시작)"""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Failed to export runs to %s sheet: %s", self.purpose, e)
+
+    def flush(self):
+        """미기록 행을 batch_size개씩 모두 시트에 쓰고 기록한 행 수를 반환하는 함수"""
+        exported = 0
+        with self._export_lock:
+            last_id = 0
+            while True:
+                pending = self.store.pending(self.purpose, self.batch_size, after_id=last_id)
+                if not pending:
+                    break
+                last_id = pending[-1][0]
+                try:
+                    self.sheet.commit_evaluation_rows([data for _, data in pending])
+                except Exception as e:
+                    if isinstance(e, CircuitOpenError) or is_retryable(e):
+                        raise
+                    logger.warning("Exporting %s runs failed, retrying one by one: %s", len(pending), e)
+                    exported += self._export_each(pending)
+                    continue
+                self.store.mark_exported([run_id for run_id, _ in pending])
+                exported += len(pending)
+        if exported:
+            logger.info("Exported %s runs to %s evaluation sheet", exported, self.purpose)
+        return exported
+
+    def _export_each(self, pending):
+        """행을 하나씩 시트에 쓰고 실패한 행의 시도 횟수를 기록하는 함수 (기록한 행 수 반환)"""
+        exported = 0
+        for run_id, data in pending:
+            try:
+                self.sheet.commit_evaluation_rows([data])
+            except Exception as e:
+                if isinstance(e, CircuitOpenError) or is_retryable(e):
+                    raise
+                if self.store.record_failure(run_id, e):
+                    logger.error("Run %s moved to dead letter after %s attempts: %s",
+                                 run_id, self.store.max_attempts, e)
+                continue
+            self.store.mark_exported([run_id])
+            exported += 1
+        return exported
+
+    def stop(self, flush=True):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Runs left unexported for %s: %s", self.purpose, e)
+
+
+_default_run_store = None
+_exporters = {}
+_defaults_lock = threading.Lock()
+
+
+def get_run_store():
+    """공용 RunStore를 반환하는 함수 (RUN_STORE=off이면 None)"""
+    global _default_run_store
+    if not RUN_STORE_ENABLED:
+        return None
+    with _defaults_lock:
+        if _default_run_store is None:
+            _default_run_store = RunStore()
+    return _default_run_store
+
+
+def get_exporter(store, sheet, purpose):
+    """(저장소, purpose)별 공용 SheetExporter를 시작해서 반환하는 함수"""
+    with _defaults_lock:
+        key = (id(store), purpose)
+        exporter = _exporters.get(key)
+        if exporter is None:
+            exporter = _exporters[key] = SheetExporter(store, sheet, purpose).start()
+    return exporter
+
+
+def record_runs(purpose, sheet, data_list, store=None):
+    """평가 결과를 저장소에 기록하고 백그라운드 시트 내보내기를 요청하는 함수
+
+    저장소가 꺼져 있으면 이전처럼 시트에 바로 쓴다.
+    """
+    if store is None:
+        store = get_run_store()
+    if store is None:
+        sheet.commit_evaluation_rows(data_list)
+        return
+    store.append(purpose, data_list)
+    get_exporter(store, sheet, purpose).notify()
+
+
+def flush_runs(purpose, sheet, store=None):
+    """저장소의 미기록 행을 바로 시트에 쓰는 함수 (실패하면 로그만 남기고 백그라운드 내보내기에 맡긴다)
+
+    run_evaluation처럼 한 번 실행하고 끝나는 호출이 반환 전에 결과를 시트에 남기도록 쓴다.
+    """
+    if store is None:
+        store = get_run_store()
+    if store is None:
+        return 0
+    try:
+        return get_exporter(store, sheet, purpose).flush()
+    except Exception as e:
+        logger.warning("Runs for %s will be exported in the background: %s", purpose, e)
+        return 0
+
+
+if __name__ == "__main__":
+    from sheet.modify_sheet import GoogleSheet
+    from telemetry.logging_config import configure_logging
+
+    parser = argparse.ArgumentParser(description="실행 기록 저장소의 미기록 행을 evaluation 시트에 씁니다.")
+    parser.add_argument('purpose', nargs='?', choices=['motivation', 'core_experience'])
+    parser.add_argument('--retry-failed', action='store_true', help="dead letter 행도 다시 내보냅니다.")
+    args = parser.parse_args()
+    configure_logging()
+    run_store = RunStore()
+    if args.retry_failed:
+        print(f"{run_store.reset_failures(args.purpose)} failed runs will be retried")
+    for purpose in [args.purpose] if args.purpose else run_store.pending_purposes():
+        count = SheetExporter(run_store, GoogleSheet(purpose), purpose).flush()
+        print(f"{purpose}: {count} runs exported")
+    for run_id, purpose, attempts, last_error in run_store.dead_letters(args.purpose):
+        print(f"dead letter {run_id} ({purpose}, {attempts} attempts): {last_error}")
@@ -0,0 +1,341 @@
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from telemetry.tracing import record_retry
+
+logger = logging.getLogger(__name__)
+
+RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '5'))
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '1.0'))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '60'))
+# 연속 실패가 이 횟수에 이르면 reset_timeout(초) 동안 호출을 막는다
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '30'))
+
+# 엔드포인트별 (초당 요청 수, 버스트 크기). 요청 수가 0이면 제한하지 않는다.
+# Sheets API는 사용자당 분당 60회가 기본 할당량이다. LLM은 계정 등급마다 달라 기본값은 제한 없음.
+DEFAULT_RATE_LIMITS = {
+    'sheets': (float(os.getenv('RATE_LIMIT_SHEETS', '1.0')), 10),
+    'openai': (float(os.getenv('RATE_LIMIT_OPENAI', '0')), 5),
+    'anthropic': (float(os.getenv('RATE_LIMIT_ANTHROPIC', '0')), 5),
+}
+
+# 요청이 처리되지 않았음이 확실한 상태 코드 (쓰기 요청도 재시도할 수 있음)
+RATE_LIMIT_STATUSES = {429}
+# 일시적인 서버 오류 (멱등 요청만 재시도)
+TRANSIENT_STATUSES = {408, 500, 502, 503, 504, 529}
+# 상태 코드가 없는 SDK 예외 중 재시도할 것 (클래스 이름)
+RETRYABLE_ERROR_NAMES = {'RateLimitError', 'APIConnectionError', 'APITimeoutError', 'InternalServerError',
+                         'OverloadedError', 'ServiceUnavailableError', 'ServerNotFoundError'}
+
+
+class CircuitOpenError(RuntimeError):
+    """circuit breaker가 열려 있어 호출하지 않은 경우"""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """지수 백오프 재시도 설정
+
+    max_attempts: 첫 호출을 포함한 최대 시도 수
+    base_delay, max_delay: n번째 재시도 전 대기 시간은 min(max_delay, base_delay * 2^(n-1))에 jitter를 곱한 값
+    jitter: 대기 시간을 [1 - jitter, 1] 배 사이에서 무작위로 줄이는 비율 (동시 재시도 분산)
+    """
+    max_attempts: int = RETRY_MAX_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+    jitter: float = 0.5
+
+    def delay(self, retry_number, error=None):
+        """retry_number번째 재시도 전 대기 시간 (Retry-After가 있으면 우선)"""
+        server_delay = retry_after(error) if error is not None else None
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        delay = min(self.max_delay, self.base_delay * (2 ** (retry_number - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def status_code(error):
+    """OpenAI/Anthropic SDK 예외나 googleapiclient HttpError의 HTTP 상태 코드 (없으면 None)"""
+    code = getattr(error, 'status_code', None)
+    if code is None:
+        resp = getattr(error, 'resp', None)
+        code = getattr(resp, 'status', None)
+    try:
+        return int(code) if code is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _headers(error):
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers is None:
+        # HttpError.resp는 헤더 dict 자체이다
+        headers = getattr(error, 'resp', None)
+    return headers if hasattr(headers, 'get') else {}
+
+
+def retry_after(error):
+    """오류 응답의 Retry-After(초 또는 HTTP 날짜, retry-after-ms)를 초로 반환하는 함수 (없으면 None)"""
+    headers = _headers(error)
+    milliseconds = headers.get('retry-after-ms')
+    if milliseconds:
+        try:
+            return max(0.0, float(milliseconds) / 1000)
+        except ValueError:
+            pass
+    value = headers.get('retry-after') or headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_time = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_time.timestamp() - time.time())
+
+
+def is_retryable(error, idempotent=True):
+    """재시도할 만한 오류인지 확인하는 함수
+
+    429는 항상 재시도한다. 서버 오류와 연결 오류는 요청이 처리되었을 수 있으므로 멱등 요청만 재시도한다.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    code = status_code(error)
+    if code is not None:
+        if code in RATE_LIMIT_STATUSES:
+            return True
+        return idempotent and code in TRANSIENT_STATUSES
+    if type(error).__name__ == 'RateLimitError':
+        return True
+    if not idempotent:
+        return False
+    return isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷 (스레드/코루틴 공용)"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """토큰 하나를 예약하고 사용할 수 있을 때까지 기다려야 하는 시간(초)을 반환하는 함수"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """연속 실패가 failure_threshold번이면 reset_timeout초 동안 호출을 막는 circuit breaker
+
+    reset_timeout이 지나면 호출을 다시 허용하고(half-open), 그 호출이 실패하면 바로 다시 연다.
+    """
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """호출 전에 확인하는 함수 (열려 있으면 CircuitOpenError)"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+        if remaining > 0:
+            raise CircuitOpenError(f"Circuit open for {self.name} ({remaining:.1f}s remaining)")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            half_open = self.opened_at is not None
+            if half_open or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                logger.warning("Circuit opened for %s after %s consecutive failures", self.name, self.failures)
+
+
+class Endpoint:
+    """한 API 엔드포인트의 토큰 버킷과 circuit breaker"""
+
+    def __init__(self, name, rate=0, capacity=1):
+        self.name = name
+        self.bucket = TokenBucket(rate, capacity) if rate else None
+        self.breaker = CircuitBreaker(name)
+
+
+_endpoints = {}
+_endpoints_lock = threading.Lock()
+
+
+def get_endpoint(name):
+    """이름별 공용 Endpoint를 반환하는 함수 (DEFAULT_RATE_LIMITS에 없으면 속도 제한 없음)"""
+    with _endpoints_lock:
+        endpoint = _endpoints.get(name)
+        if endpoint is None:
+            rate, capacity = DEFAULT_RATE_LIMITS.get(name, (0, 1))
+            endpoint = _endpoints[name] = Endpoint(name, rate, capacity)
+    return endpoint
+
+
+def _record(endpoint, error):
+    # 요청 자체의 문제(4xx 등)는 엔드포인트 장애가 아니므로 circuit에 반영하지 않는다
+    if is_retryable(error):
+        endpoint.breaker.record_failure()
+
+
+def _before_call(endpoint):
+    """호출 전 circuit breaker 확인과 속도 제한 대기 (endpoint가 None이면 아무것도 하지 않음)"""
+    if endpoint is None:
+        return
+    endpoint.breaker.before_call()
+    if endpoint.bucket is not None:
+        endpoint.bucket.acquire()
+
+
+def _retry_delay(func, attempt, policy, error):
+    delay = policy.delay(attempt, error)
+    logger.warning("Retrying %s in %.1fs (attempt %s/%s): %s",
+                   getattr(func, '__qualname__', func), delay, attempt, policy.max_attempts, error)
+    record_retry()
+    return delay
+
+
+def call_with_retry(func, *args, endpoint=None, policy=DEFAULT_RETRY_POLICY, idempotent=True, **kwargs):
+    """func(*args, **kwargs)를 엔드포인트 속도 제한, circuit breaker, 지수 백오프 재시도와 함께 호출하는 함수
+
+    Args:
+        endpoint (str): get_endpoint 이름 ('sheets', 'openai', 'anthropic' 등, None이면 재시도만 적용)
+        idempotent (bool): False이면 429처럼 처리되지 않았음이 확실한 오류만 재시도
+    """
+    endpoint = get_endpoint(endpoint) if endpoint else None
+    for attempt in range(1, policy.max_attempts + 1):
+        _before_call(endpoint)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if endpoint is not None:
+                _record(endpoint, e)
+            if attempt >= policy.max_attempts or not is_retryable(e, idempotent):
+                raise
+            time.sleep(_retry_delay(func, attempt, policy, e))
+        else:
+            if endpoint is not None:
+                endpoint.breaker.record_success()
+            return result
+
+
+def stream_with_retry(func, *args, endpoint=None, policy=DEFAULT_RETRY_POLICY, **kwargs):
+    """func(*args, **kwargs)가 반환하는 스트림의 조각을 넘겨주는 generator (call_with_retry와 같은 정책)
+
+    첫 조각을 받기 전의 오류만 재시도한다. 조각을 넘긴 뒤의 오류는 다시 요청하면 출력이 중복되므로
+    circuit breaker에 반영한 뒤 그대로 던진다. generator를 닫으면 원본 스트림도 닫는다.
+    """
+    endpoint = get_endpoint(endpoint) if endpoint else None
+    for attempt in range(1, policy.max_attempts + 1):
+        _before_call(endpoint)
+        stream = None
+        try:
+            stream = iter(func(*args, **kwargs))
+            first = next(stream)
+        except StopIteration:
+            if endpoint is not None:
+                endpoint.breaker.record_success()
+            return
+        except Exception as e:
+            if stream is not None:
+                _close(stream)
+            if endpoint is not None:
+                _record(endpoint, e)
+            if attempt >= policy.max_attempts or not is_retryable(e):
+                raise
+            time.sleep(_retry_delay(func, attempt, policy, e))
+            continue
+        if endpoint is not None:
+            endpoint.breaker.record_success()
+        break
+
+    try:
+        yield first
+        for chunk in stream:
+            yield chunk
+    except Exception as e:
+        if endpoint is not None:
+            _record(endpoint, e)
+        raise
+    finally:
+        _close(stream)
+
+
+def _close(stream):
+    close = getattr(stream, 'close', None)
+    if close is not None:
+        close()
+
+
+async def acall_with_retry(func, *args, endpoint=None, policy=DEFAULT_RETRY_POLICY, idempotent=True, **kwargs):
+    """call_with_retry의 비동기 버전 (func은 코루틴 함수)"""
+    endpoint = get_endpoint(endpoint) if endpoint else None
+    for attempt in range(1, policy.max_attempts + 1):
+        if endpoint is not None:
+            endpoint.breaker.before_call()
+            if endpoint.bucket is not None:
+                await endpoint.bucket.aacquire()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            if endpoint is not None:
+                _record(endpoint, e)
+            if attempt >= policy.max_attempts or not is_retryable(e, idempotent):
+                raise
+            await asyncio.sleep(_retry_delay(func, attempt, policy, e))
+        else:
+            if endpoint is not None:
+                endpoint.breaker.record_success()
+            return result
+
+
+def execute(request, idempotent=True):
+    """googleapiclient 요청의 execute()를 'sheets' 엔드포인트 재시도 정책으로 실행하는 함수"""
+    return call_with_retry(request.execute, endpoint='sheets', idempotent=idempotent)
@@ -1,13 +1,114 @@
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
+from sheet.sheet_service import get_credentials, get_sheets_service
+from resilience.retry import execute
+from telemetry.logging_config import payload
+from telemetry.tracing import set_attributes, traced
 from dotenv import load_dotenv
+from dataclasses import dataclass
+from typing import Optional
+import json
 import logging
 import os
+import time
 import webbrowser
 load_dotenv()
 
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
+# 시트 메타데이터 디스크 캐시 (TTL이 0이면 인스턴스 캐시만 사용)
+SHEET_METADATA_CACHE_DIR = os.getenv('SHEET_METADATA_CACHE_DIR', os.path.join('.cache', 'sheet_metadata'))
+SHEET_METADATA_CACHE_TTL = float(os.getenv('SHEET_METADATA_CACHE_TTL', '0'))
+
+# purpose별 설정 항목이 위치한 시트와 열
+DATA_CONFIG = {
+    'core_experience': {
+        # setting 시트
+        'situation': {'sheet': 'setting', 'column': 'C:C'},
+        'role': {'sheet': 'setting', 'column': 'B:B'},
+        'knowledge': {'sheet': 'setting', 'column': 'D:D'},
+        # info 시트
+        'company': {'sheet': 'info', 'column': 'B:B'},
+        'job': {'sheet': 'info', 'column': 'C:C'},
+        'job_posting': {'sheet': 'info', 'column': 'D:D'},
+        'core_experience': {'sheet': 'info', 'column': 'E:E'},
+        'question': {'sheet': 'info', 'column': 'F:F'},
+        # prompt_structure 시트
+        'prompt_structure': {'sheet': 'prompt_structure', 'column': 'B:B'},
+        # model_setting 시트
+        'model': {'sheet': 'model_setting', 'column': 'B:B'},
+        'temperature': {'sheet': 'model_setting', 'column': 'C:C'},
+        'max_tokens': {'sheet': 'model_setting', 'column': 'D:D'},
+        'thinking': {'sheet': 'model_setting', 'column': 'E:E'},
+        'budget_tokens': {'sheet': 'model_setting', 'column': 'F:F'},
+        # translation_model_setting 시트
+        'translation_model': {'sheet': 'translation_model_setting', 'column': 'B:B'},
+        'translation_temperature': {'sheet': 'translation_model_setting', 'column': 'C:C'}
+    },
+    'motivation': {
+        # prompt_structure 시트
+        'prompt_structure': {'sheet': 'prompt_structure', 'column': 'B:B'},
+        # model_setting 시트
+        'model': {'sheet': 'model_setting', 'column': 'B:B'},
+        'temperature': {'sheet': 'model_setting', 'column': 'C:C'},
+        'max_tokens': {'sheet': 'model_setting', 'column': 'D:D'},
+        'thinking': {'sheet': 'model_setting', 'column': 'E:E'},
+        'budget_tokens': {'sheet': 'model_setting', 'column': 'F:F'},
+        # translation_model_setting 시트
+        'translation_model': {'sheet': 'translation_model_setting', 'column': 'B:B'},
+        'translation_temperature': {'sheet': 'translation_model_setting', 'column': 'C:C'},
+        # setting 시트
+        'situation': {'sheet': 'setting', 'column': 'C:C'},
+        'role': {'sheet': 'setting', 'column': 'B:B'},
+        'knowledge': {'sheet': 'setting', 'column': 'D:D'},
+        # info 시트
+        'company': {'sheet': 'info', 'column': 'B:B'},
+        'job': {'sheet': 'info', 'column': 'C:C'},
+        'job_posting': {'sheet': 'info', 'column': 'D:D'},
+        'core_experience': {'sheet': 'info', 'column': 'E:E'},
+        'question': {'sheet': 'info', 'column': 'F:F'},
+        'issue': {'sheet': 'info', 'column': 'G:G'},
+    },
+}
+
+
+@dataclass(frozen=True)
+class SheetConfig:
+    """load_config가 반환하는 설정 스냅샷 (각 항목은 해당 열의 마지막 값)"""
+    # setting 시트
+    situation: Optional[str] = None
+    role: Optional[str] = None
+    knowledge: Optional[str] = None
+    # info 시트
+    company: Optional[str] = None
+    job: Optional[str] = None
+    job_posting: Optional[str] = None
+    core_experience: Optional[str] = None
+    question: Optional[str] = None
+    issue: Optional[str] = None
+    # prompt_structure 시트
+    prompt_structure: Optional[str] = None
+    # model_setting 시트
+    model: Optional[str] = None
+    temperature: Optional[str] = None
+    max_tokens: Optional[str] = None
+    thinking: Optional[str] = None
+    budget_tokens: Optional[str] = None
+    # translation_model_setting 시트
+    translation_model: Optional[str] = None
+    translation_temperature: Optional[str] = None
+
+
+def _last_non_empty(values):
+    """시트 값 목록에서 비어있지 않은 마지막 행의 첫 번째 값을 반환하는 함수"""
+    non_empty_rows = [row[0] for row in values if row]
+    if not non_empty_rows:
+        return None
+    return non_empty_rows[-1]
+
+
+def _is_sheet_not_found(error):
+    """batchUpdate 오류가 존재하지 않는 sheetId 때문인지 확인하는 함수"""
+    message = str(error)
+    return 'No grid with id' in message or 'Sheet not found' in message
+
 
 class GoogleSheet:
     def __init__(self, purpose):
@@ -24,126 +125,220 @@ class GoogleSheet:
 
         SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
         SERVICE_ACCOUNT_FILE = os.getenv('GOOGLE_SERVICE_ACCOUNT_FILE')
-        self.credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-        self.sheets_service = build('sheets', 'v4', credentials=self.credentials)
+        self.__scopes = SCOPES
+        self.__service_account_file = SERVICE_ACCOUNT_FILE
+        self._sheets_service = None
+        self._sheet_metadata = None
+
+    @property
+    def credentials(self):
+        """공유 서비스 계정 credentials (처음 접근할 때 읽는다)"""
+        # credentials와 service는 sheet_service 풀에서 공유한다 (생성 비용이 크다)
+        return get_credentials(self.__service_account_file, self.__scopes)
+
+    @property
+    def sheets_service(self):
+        """현재 스레드용 공유 Sheets service"""
+        if self._sheets_service is not None:
+            return self._sheets_service
+        return get_sheets_service(self.__service_account_file, self.__scopes)
+
+    @sheets_service.setter
+    def sheets_service(self, service):
+        self._sheets_service = service
     
     def go_to_sheet(self):
         self.url = f"https://docs.google.com/spreadsheets/d/{self.__spreadsheet_id}"
         webbrowser.open(self.url)
 
+    @traced('sheets.get_last_data')
     def get_last_data(self, data_type):
-        self.data_config = {}
+        self.data_config = DATA_CONFIG.get(self.__purpose, {})
         self.range_str = ''
-        if self.__purpose == 'core_experience': 
-            self.data_config = {
-                # setting 시트
-                'situation': {'sheet': 'setting', 'column': 'C:C'},
-                'role': {'sheet': 'setting', 'column': 'B:B'},
-                'knowledge': {'sheet': 'setting', 'column': 'D:D'},
-                # info 시트
-                'company': {'sheet': 'info', 'column': 'B:B'},
-                'job': {'sheet': 'info', 'column': 'C:C'},
-                'job_posting': {'sheet': 'info', 'column': 'D:D'},
-                'core_experience': {'sheet': 'info', 'column': 'E:E'},
-                'question': {'sheet': 'info', 'column': 'F:F'},
-                # prompt_structure 시트
-                'prompt_structure': {'sheet': 'prompt_structure', 'column': 'B:B'},
-                # model_setting 시트
-                'model': {'sheet': 'model_setting', 'column': 'B:B'},
-                'temperature': {'sheet': 'model_setting', 'column': 'C:C'},
-                'max_tokens': {'sheet': 'model_setting', 'column': 'D:D'},
-                'thinking': {'sheet': 'model_setting', 'column': 'E:E'},
-                'budget_tokens': {'sheet': 'model_setting', 'column': 'F:F'},
-                # translation_model_setting 시트
-                'translation_model': {'sheet': 'translation_model_setting', 'column': 'B:B'},
-                'translation_temperature': {'sheet': 'translation_model_setting', 'column': 'C:C'}
-            }
-            if data_type not in self.data_config:
-                raise ValueError(f"Invalid data type: {data_type}")
-            config = self.data_config[data_type]
-            self.range_str = f"{config['sheet']}!{config['column']}"
-        elif self.__purpose == 'motivation':
-            self.data_config = {
-                # prompt_structure 시트
-                'prompt_structure': {'sheet': 'prompt_structure', 'column': 'B:B'},
-                # model_setting 시트
-                'model': {'sheet': 'model_setting', 'column': 'B:B'},
-                'temperature': {'sheet': 'model_setting', 'column': 'C:C'},
-                'max_tokens': {'sheet': 'model_setting', 'column': 'D:D'},
-                'thinking': {'sheet': 'model_setting', 'column': 'E:E'},
-                'budget_tokens': {'sheet': 'model_setting', 'column': 'F:F'},
-                # translation_model_setting 시트
-                'translation_model': {'sheet': 'translation_model_setting', 'column': 'B:B'},
-                'translation_temperature': {'sheet': 'translation_model_setting', 'column': 'C:C'},
-                # setting 시트
-                'situation': {'sheet': 'setting', 'column': 'C:C'},
-                'role': {'sheet': 'setting', 'column': 'B:B'},
-                'knowledge': {'sheet': 'setting', 'column': 'D:D'},
-                # info 시트
-                'company': {'sheet': 'info', 'column': 'B:B'},
-                'job': {'sheet': 'info', 'column': 'C:C'},
-                'job_posting': {'sheet': 'info', 'column': 'D:D'},
-                'core_experience': {'sheet': 'info', 'column': 'E:E'},
-                'question': {'sheet': 'info', 'column': 'F:F'},
-                'issue': {'sheet': 'info', 'column': 'G:G'},
-            }
-            config = self.data_config[data_type]
-            self.range_str = f"{config['sheet']}!{config['column']}"
+        if data_type not in self.data_config:
+            raise ValueError(f"Invalid data type: {data_type}")
+        config = self.data_config[data_type]
+        self.range_str = f"{config['sheet']}!{config['column']}"
+        set_attributes(purpose=self.__purpose, range=self.range_str)
             
         try:
-            logger.info(f"Fetching data from spreadsheet: {self.__purpose}, range: {self.range_str}")
+            logger.info("Fetching data from spreadsheet: %s, range: %s", self.__purpose, self.range_str)
             
-            result = self.sheets_service.spreadsheets().values().get(
+            result = execute(self.sheets_service.spreadsheets().values().get(
                 spreadsheetId=self.__spreadsheet_id,
                 range=self.range_str
-            ).execute()
+            ))
             
             values = result.get('values', [])
             if not values:
-                logger.warning(f"No data found for range: {self.range_str}")
+                logger.warning("No data found for range: %s", self.range_str)
                 return None
                 
-            non_empty_rows = [row[0] for row in values if row]
-            if not non_empty_rows:
+            last_value = _last_non_empty(values)
+            if last_value is None:
                 return None
-                
-            last_value = non_empty_rows[-1]
-            logger.info(f"Successfully fetched data: {last_value}")
+            logger.info("Successfully fetched data: %s", payload(last_value))
             return last_value
             
         except Exception as e:
-            logger.error(f"Error fetching data: {str(e)}")
+            logger.error("Error fetching data: %s", e)
+            raise
+
+    @traced('sheets.load_config')
+    def load_config(self):
+        """data_config에 정의된 모든 range를 batchGet 한 번으로 가져와 SheetConfig로 반환하는 함수
+
+        Returns:
+            SheetConfig: 각 항목의 마지막 값(비어있지 않은 값)을 담은 스냅샷
+        """
+        self.data_config = DATA_CONFIG.get(self.__purpose, {})
+        data_types = list(self.data_config.keys())
+        ranges = [f"{self.data_config[data_type]['sheet']}!{self.data_config[data_type]['column']}" for data_type in data_types]
+        set_attributes(purpose=self.__purpose, ranges=len(ranges))
+
+        try:
+            logger.info("Fetching config from spreadsheet: %s, ranges: %s", self.__purpose, len(ranges))
+
+            result = execute(self.sheets_service.spreadsheets().values().batchGet(
+                spreadsheetId=self.__spreadsheet_id,
+                ranges=ranges
+            ))
+
+            # valueRanges는 요청한 ranges 순서대로 반환된다
+            value_ranges = result.get('valueRanges', [])
+            values = {}
+            for data_type, range_str, value_range in zip(data_types, ranges, value_ranges):
+                last_value = _last_non_empty(value_range.get('values', []))
+                if last_value is None:
+                    logger.warning("No data found for range: %s", range_str)
+                values[data_type] = last_value
+
+            logger.info("Successfully fetched config: %s", list(values.keys()))
+            return SheetConfig(**values)
+
+        except Exception as e:
+            logger.error("Error fetching config: %s", e)
             raise
 
+    @traced('sheets.get_whole_data')
     def get_whole_data(self, sheet_name, range):
         """시트에서 특정 range의 모든 데이터를 가져오는 함수"""
-        logger.debug(f"Fetching data from {sheet_name}: {range}")
+        logger.debug("Fetching data from %s: %s", sheet_name, range)
         self.range_str = f"{sheet_name}!{range}"
+        set_attributes(range=self.range_str)
         
         try:
-            logger.info(f"Fetching data from spreadsheet ID: {self.__spreadsheet_id}, range: {self.range_str}")
+            logger.info("Fetching data from spreadsheet ID: %s, range: %s", self.__spreadsheet_id, self.range_str)
 
-            result = self.sheets_service.spreadsheets().values().get(
+            result = execute(self.sheets_service.spreadsheets().values().get(
                 spreadsheetId=self.__spreadsheet_id,
                 range=self.range_str
-            ).execute()
+            ))
 
             values = result.get('values', [])
             if not values:
-                logger.warning(f"No data found for range: {self.range_str}")
+                logger.warning("No data found for range: %s", self.range_str)
                 return None
 
-            logger.info(f"Successfully fetched data: {values}")
+            logger.info("Successfully fetched %d rows: %s", len(values), payload(values))
             return values
         
         except Exception as e:
-            logger.error(f"Error fetching data: {str(e)}")
+            logger.error("Error fetching data: %s", e)
             raise
 
+    def get_sheet_metadata(self, refresh=False):
+        """스프레드시트의 시트별 메타데이터(title -> sheetId, 행/열 크기)를 가져오는 함수
+
+        인스턴스에 캐시하며, SHEET_METADATA_CACHE_TTL(초)이 설정되어 있으면 디스크에도 캐시한다.
+
+        Args:
+            refresh (bool): 캐시를 무시하고 다시 가져올지 여부
+
+        Returns:
+            dict: 시트 이름 -> {'sheetId', 'rowCount', 'columnCount'}
+        """
+        if not refresh:
+            if self._sheet_metadata is not None:
+                return self._sheet_metadata
+            cached = self._read_metadata_cache()
+            if cached is not None:
+                logger.debug("Using cached sheet metadata: %s", self.__spreadsheet_id)
+                self._sheet_metadata = cached
+                return cached
+
+        logger.info("Fetching sheet metadata from spreadsheet ID: %s", self.__spreadsheet_id)
+        try:
+            # 그리드 데이터 없이 시트 속성만 가져오기
+            spreadsheet = execute(self.sheets_service.spreadsheets().get(
+                spreadsheetId=self.__spreadsheet_id,
+                fields='sheets.properties(sheetId,title,gridProperties(rowCount,columnCount))'
+            ))
+        except Exception as e:
+            logger.error("Error getting sheet metadata: %s", e)
+            raise
+
+        metadata = {}
+        for sheet in spreadsheet.get('sheets', []):
+            properties = sheet.get('properties', {})
+            grid_properties = properties.get('gridProperties', {})
+            metadata[properties.get('title')] = {
+                'sheetId': properties.get('sheetId'),
+                'rowCount': grid_properties.get('rowCount'),
+                'columnCount': grid_properties.get('columnCount'),
+            }
+        self._sheet_metadata = metadata
+        self._write_metadata_cache(metadata)
+        return metadata
+
+    def invalidate_metadata(self):
+        """인스턴스와 디스크의 시트 메타데이터 캐시를 비우는 함수"""
+        logger.debug("Invalidating sheet metadata cache: %s", self.__spreadsheet_id)
+        self._sheet_metadata = None
+        path = self._metadata_cache_path()
+        if path is not None and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning("Failed to remove sheet metadata cache: %s", e)
+
+    def _metadata_cache_path(self):
+        if SHEET_METADATA_CACHE_TTL <= 0 or not self.__spreadsheet_id:
+            return None
+        return os.path.join(SHEET_METADATA_CACHE_DIR, f"{self.__spreadsheet_id}.json")
+
+    def _read_metadata_cache(self):
+        path = self._metadata_cache_path()
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                cached = json.load(f)
+            if time.time() - cached['fetched_at'] > SHEET_METADATA_CACHE_TTL:
+                return None
+            return cached['sheets']
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable sheet metadata cache: %s", e)
+            return None
+
+    def _write_metadata_cache(self, metadata):
+        path = self._metadata_cache_path()
+        if path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': time.time(), 'sheets': metadata}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to write sheet metadata cache: %s", e)
+
     def get_sheet_id(self, sheet_name):
         """스프레드시트 내의 특정 시트 ID를 가져오는 함수
         
+        캐시된 메타데이터에 시트가 없으면 한 번 다시 가져온 뒤 찾는다.
+
         Args:
             sheet_name (str): 시트 이름
             
@@ -153,141 +348,268 @@ class GoogleSheet:
         Raises:
             ValueError: 시트를 찾을 수 없는 경우
         """
-        logger.debug(f"Getting sheet ID for sheet: {sheet_name}")
+        logger.debug("Getting sheet ID for sheet: %s", sheet_name)
         
-        try:
-            # 스프레드시트의 모든 시트 정보 가져오기
-            spreadsheet = self.sheets_service.spreadsheets().get(
-                spreadsheetId=self.__spreadsheet_id
-            ).execute()
-            
-            # 시트 이름으로 시트 ID 찾기
-            sheets = spreadsheet.get('sheets', [])
-            for sheet in sheets:
-                properties = sheet.get('properties', {})
-                if properties.get('title') == sheet_name:
-                    sheet_id = properties.get('sheetId')
-                    logger.info(f"Found sheet ID {sheet_id} for sheet: {sheet_name}")
-                    return sheet_id
-            
-            # 시트를 찾지 못한 경우
-            logger.error(f"Sheet not found: {sheet_name}")
+        metadata = self.get_sheet_metadata()
+        if sheet_name not in metadata:
+            # 캐시가 오래되었을 수 있으므로 다시 가져오기
+            metadata = self.get_sheet_metadata(refresh=True)
+        if sheet_name not in metadata:
+            logger.error("Sheet not found: %s", sheet_name)
             raise ValueError(f"Sheet not found: {sheet_name}")
-            
-        except Exception as e:
-            logger.error(f"Error getting sheet ID: {str(e)}")
-            raise
+
+        sheet_id = metadata[sheet_name]['sheetId']
+        logger.info("Found sheet ID %s for sheet: %s", sheet_id, sheet_name)
+        return sheet_id
+
+    def get_grid_properties(self, sheet_name):
+        """시트의 행/열 크기를 가져오는 함수
+
+        Returns:
+            dict: {'rowCount', 'columnCount'}
+        """
+        self.get_sheet_id(sheet_name)
+        sheet_metadata = self._sheet_metadata[sheet_name]
+        return {'rowCount': sheet_metadata['rowCount'], 'columnCount': sheet_metadata['columnCount']}
+
+    def _batch_update_sheet(self, sheet_name, build_requests, inserted_rows=0):
+        """sheet_name의 sheetId로 요청을 만들어 batchUpdate를 실행하는 함수
+
+        캐시된 sheetId가 더 이상 유효하지 않으면 메타데이터를 비우고 한 번 재시도한다.
+        행을 삽입하는 요청(inserted_rows > 0)은 중복 삽입을 막기 위해 429 응답만 재시도한다.
+        """
+        for attempt in range(2):
+            sheet_id = self.get_sheet_id(sheet_name)
+            try:
+                response = execute(self.sheets_service.spreadsheets().batchUpdate(
+                    spreadsheetId=self.__spreadsheet_id,
+                    body={"requests": build_requests(sheet_id)}
+                ), idempotent=not inserted_rows)
+            except Exception as e:
+                if attempt == 0 and _is_sheet_not_found(e):
+                    logger.warning("Cached sheet ID %s for %s is stale, refreshing metadata", sheet_id, sheet_name)
+                    self.invalidate_metadata()
+                    continue
+                raise
+            if inserted_rows and self._sheet_metadata and sheet_name in self._sheet_metadata:
+                row_count = self._sheet_metadata[sheet_name].get('rowCount')
+                if row_count is not None:
+                    self._sheet_metadata[sheet_name]['rowCount'] = row_count + inserted_rows
+            return response
 
     def update_sheet(self, sheet_range, values):
         """구글 시트에 데이터를 업데이트하는 함수"""
-        logger.debug(f"Updating sheet range: {sheet_range} with values: {values}")
+        logger.debug("Updating sheet range: %s with values: %s", sheet_range, payload(values))
         try:
             body = {'values': [values]}
-            self.sheets_service.spreadsheets().values().update(
+            execute(self.sheets_service.spreadsheets().values().update(
                 spreadsheetId=self.__spreadsheet_id,
                 range=sheet_range,
                 valueInputOption='RAW',
                 body=body
-            ).execute()
-            logger.info(f"Successfully updated sheet range: {sheet_range}")
+            ))
+            logger.info("Successfully updated sheet range: %s", sheet_range)
         except Exception as e:
-            logger.error(f"Error updating sheet: {str(e)}")
+            logger.error("Error updating sheet: %s", e)
             raise
 
-    def insert_row(self, sheet_name, row_index):
-        """시트에 새로운 행을 삽입하는 함수
-        
+    def get_row_index_value(self, sheet_name, row_index):
+        """시트 row_index 행의 index 열(A열) 값을 가져오는 함수"""
+        self.range_str = f"{sheet_name}!A{row_index}"
+        try:
+            result = execute(self.sheets_service.spreadsheets().values().get(
+                spreadsheetId=self.__spreadsheet_id,
+                range=self.range_str
+            ))
+            index_value = _last_non_empty(result.get('values', []))
+            if index_value is None:
+                logger.warning("No data found for range: %s", self.range_str)
+            return index_value
+        except Exception as e:
+            logger.error("Error getting row index: %s", e)
+            raise
+
+    @traced('sheets.commit_rows')
+    def commit_rows(self, sheet_name, row_index, rows, insert=True, with_index=True):
+        """여러 행의 삽입, index, 셀 값을 spreadsheets().batchUpdate 한 번으로 기록하는 함수
+
+        rows[0]이 row_index 행(가장 위, 가장 큰 index)에 기록된다.
+
         Args:
-            sheet_name (str): 행을 삽입할 시트 이름
-            row_index (int): 삽입할 행의 인덱스 (1부터 시작)
+            sheet_name (str): 행을 기록할 시트 이름
+            row_index (int): 첫 번째 행을 기록할 인덱스 (1부터 시작)
+            rows (list[dict]): 행별 열 문자('B', 'C', ...) -> 값
+            insert (bool): row_index 위치에 len(rows)개의 새 행을 먼저 삽입할지 여부
+            with_index (bool): A열에 기존 row_index 행의 index 다음 값들을 기록할지 여부
+
+        Returns:
+            list[int] | None: 행별로 기록한 index 값 (with_index가 False이면 None)
         """
-        logger.debug(f"Inserting new row at sheet: {sheet_name}, row: {row_index}")
-        self.row_index = row_index - 1  # 0-based index로 변환
-        
+        logger.debug("Committing %s rows from row %s in sheet: %s", len(rows), row_index, sheet_name)
+        if not rows:
+            return [] if with_index else None
+        rows = [dict(cells) for cells in rows]
+        set_attributes(sheet=sheet_name, rows=len(rows))
+        new_indexes = None
         try:
-            # 시트 ID 가져오기
-            sheet_id = self.get_sheet_id(sheet_name)
-            
-            request = {
-                "requests": [
-                    {
+            if with_index:
+                # 삽입 전에는 직전 최신 행이 row_index에 있다
+                prev_index = self.get_row_index_value(sheet_name, row_index)
+                prev_index = int(prev_index) if prev_index is not None else 0
+                new_indexes = [prev_index + len(rows) - offset for offset in range(len(rows))]
+                for cells, new_index in zip(rows, new_indexes):
+                    cells['A'] = new_index
+
+            def build_requests(sheet_id):
+                requests = []
+                if insert:
+                    requests.append({
                         "insertDimension": {
                             "range": {
-                                "sheetId": sheet_id,  # 동적으로 가져온 sheetId 사용
+                                "sheetId": sheet_id,
                                 "dimension": "ROWS",
-                                "startIndex": self.row_index,
-                                "endIndex": self.row_index + 1
+                                "startIndex": row_index - 1,
+                                "endIndex": row_index - 1 + len(rows)
                             }
                         }
-                    }
-                ]
-            }
-
-            self.sheets_service.spreadsheets().batchUpdate(
-                spreadsheetId=self.__spreadsheet_id,
-                body=request
-            ).execute()
+                    })
+                for offset, cells in enumerate(rows):
+                    requests.extend(_update_cells_requests(sheet_id, row_index - 1 + offset, cells))
+                return requests
 
-            logger.info(f"Successfully inserted new row in sheet: {sheet_name} at row: {row_index}")
-        except Exception as e:
-            logger.error(f"Error inserting row: {str(e)}")
-            raise
-    
-    def get_second_row_index(self, sheet_name):
-        """시트의 두 번째 행(제목 행 제외)의 인덱스를 가져오는 함수"""
-        logger.debug(f"Getting second row index for sheet: {sheet_name}")
-        self.range_str = f"{sheet_name}!A:A"
-        try:
-            result = self.sheets_service.spreadsheets().values().get(
-                spreadsheetId=self.__spreadsheet_id,
-                range=self.range_str
-            ).execute()
-            values = result.get('values', [])
-            logger.info(f"Values: {values}")
-            if not values:
-                logger.warning(f"No data found for range: {self.range_str}")
-                return None
-            prev_index_list = values[2]
-            logger.info(f"Prev index list: {prev_index_list}")
-            if not prev_index_list:
-                logger.warning(f"No data found in previous row index for range: {self.range_str}")
-                return None
-            prev_index = prev_index_list[0]
-            logger.info(f"Successfully got previous row index: {prev_index}")
-            return prev_index
+            self._batch_update_sheet(sheet_name, build_requests, inserted_rows=len(rows) if insert else 0)
+            logger.info("Successfully committed %s rows from row %s in sheet: %s", len(rows), row_index, sheet_name)
+            return new_indexes
         except Exception as e:
-            logger.error(f"Error getting previous row index: {str(e)}")
+            logger.error("Error committing rows: %s", e)
             raise
 
-    def update_index(self, sheet_name, row_index):
-        """시트 행의 index 열에 새로운 index 값을 넣는 함수"""
-        logger.debug(f"Updating index in row {row_index}")
-        try:
-            prev_index = self.get_second_row_index(sheet_name)
-            # prev_index를 정수로 변환
-            prev_index = int(prev_index)
-            new_index = prev_index + 1
-            self.update_sheet(f'{sheet_name}!A{row_index}', [new_index])
-            logger.info(f"Successfully updated index to: {new_index}")
-        except Exception as e:
-            logger.error(f"Error updating index: {str(e)}")
-            raise
+    def commit_evaluation_rows(self, data_list, row_index=2):
+        """여러 evaluation data dict를 새 행들로 한 번에 기록하는 함수
+
+        data_list의 마지막 항목이 가장 위(가장 큰 index)에 오도록 기록한다.
+        """
+        rows = [_evaluation_cells(data) for data in reversed(data_list)]
+        return self.commit_rows('evaluation', row_index, rows)
+
+    def get_model_settings(self):
+        """model_setting 시트의 모든 설정 행을 가져오는 함수 (제목 행 제외)
+
+        Returns:
+            list[dict]: 행별 {'model', 'temperature', 'max_tokens', 'thinking', 'budget_tokens'}
+        """
+        keys = ['model', 'temperature', 'max_tokens', 'thinking', 'budget_tokens']
+        rows = self.get_whole_data('model_setting', 'B2:F') or []
+        settings = []
+        for row in rows:
+            if not row or not row[0]:
+                continue
+            row = list(row) + [None] * (len(keys) - len(row))
+            settings.append({key: (value if value != '' else None) for key, value in zip(keys, row)})
+        return settings
+
+    def get_token_usage(self):
+        """evaluation 시트의 결과별 토큰 사용량을 가져오는 함수 (토큰 예산 보정용, 제목 행 제외)
+
+        Returns:
+            list[dict]: 행별 {'thinking', 'result', 'model_name', 'completion_tokens'}
+        """
+        first, last = EVALUATION_COLUMNS['thinking'], EVALUATION_COLUMNS['completion_tokens']
+        rows = self.get_whole_data('evaluation', f'{first}2:{last}') or []
+        offset = _column_to_index(first)
+        positions = {key: _column_to_index(EVALUATION_COLUMNS[key]) - offset
+                     for key in ('thinking', 'result', 'model_name', 'completion_tokens')}
+        usage = []
+        for row in rows:
+            if len(row) <= positions['completion_tokens']:
+                continue
+            usage.append({key: row[position] for key, position in positions.items()})
+        return usage
+
+
+# evaluation 시트의 data 키 -> 열
+EVALUATION_COLUMNS = {
+    'formatted_prompt': 'B',
+    'prompt_english': 'C',
+    'thinking': 'D',
+    'result': 'E',
+    'model_name': 'G',
+    'temperature': 'H',
+    'translation_model_name': 'I',
+    'translation_temperature': 'J',
+    'cost': 'K',
+    'krw_cost': 'L',
+    'prompt_tokens': 'M',
+    'completion_tokens': 'N',
+    'total_tokens': 'O',
+    'translation_prompt_tokens': 'P',
+    'translation_completion_tokens': 'Q',
+    'translation_total_tokens': 'R',
+    'cache_read_tokens': 'T',
+    'cache_creation_tokens': 'U',
+    # TELEMETRY_COLUMNS=on일 때만 기록하는 열
+    'translation_ms': 'V',
+    'generation_ms': 'W',
+    'tokens_per_second': 'X',
+    'retries': 'Y',
+}
+EVALUATION_GRAND_TOTAL_COLUMN = 'S'
+
+
+def _evaluation_cells(data):
+    """evaluation data dict를 열 문자 -> 값 dict로 변환하는 함수"""
+    cells = {}
+    for key, column in EVALUATION_COLUMNS.items():
+        if key in data:
+            cells[column] = data[key]
+    if 'total_tokens' in data and 'translation_total_tokens' in data:
+        cells[EVALUATION_GRAND_TOTAL_COLUMN] = data['total_tokens'] + data['translation_total_tokens']
+    return cells
+
+
+def _column_to_index(column):
+    """열 문자('A', 'AB' 등)를 0부터 시작하는 열 인덱스로 변환하는 함수"""
+    index = 0
+    for char in column.upper():
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index - 1
+
+
+def _cell_data(value):
+    """값을 updateCells용 CellData로 변환하는 함수 (valueInputOption RAW와 동일하게 그대로 기록)"""
+    if value is None:
+        return {}
+    if isinstance(value, bool):
+        return {'userEnteredValue': {'boolValue': value}}
+    if isinstance(value, (int, float)):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
+
+def _update_cells_requests(sheet_id, row_index, cells):
+    """연속된 열끼리 묶어 updateCells 요청 목록을 만드는 함수 (row_index는 0부터 시작)
+
+    값을 쓰지 않는 열(예: evaluation 시트의 F열)은 건드리지 않도록 연속 구간마다 요청을 나눈다.
+    """
+    columns = sorted((_column_to_index(column), value) for column, value in cells.items())
+    requests = []
+    run = []
+    for column_index, value in columns:
+        if run and column_index != run[-1][0] + 1:
+            requests.append(_update_cells_request(sheet_id, row_index, run))
+            run = []
+        run.append((column_index, value))
+    if run:
+        requests.append(_update_cells_request(sheet_id, row_index, run))
+    return requests
+
 
-    def update_evaluation_sheet(self, data):
-        """evaluation 시트에 데이터를 업데이트하는 함수"""
-        self.update_sheet('evaluation!D2', [data['thinking']])
-        self.update_sheet('evaluation!E2', [data['result']])
-        self.update_sheet('evaluation!G2', [data['model_name']])
-        self.update_sheet('evaluation!H2', [data['temperature']])
-        self.update_sheet('evaluation!I2', [data['translation_model_name']])
-        self.update_sheet('evaluation!J2', [data['translation_temperature']])
-        self.update_sheet('evaluation!K2', [data['cost']])
-        self.update_sheet('evaluation!L2', [data['krw_cost']])
-        self.update_sheet('evaluation!M2', [data['prompt_tokens']])
-        self.update_sheet('evaluation!N2', [data['completion_tokens']])
-        self.update_sheet('evaluation!O2', [data['total_tokens']])
-        self.update_sheet('evaluation!P2', [data['translation_prompt_tokens']])
-        self.update_sheet('evaluation!Q2', [data['translation_completion_tokens']])
-        self.update_sheet('evaluation!R2', [data['translation_total_tokens']])
-        self.update_sheet('evaluation!S2', [data['total_tokens'] + data['translation_total_tokens']])
+def _update_cells_request(sheet_id, row_index, run):
+    return {
+        "updateCells": {
+            "start": {"sheetId": sheet_id, "rowIndex": row_index, "columnIndex": run[0][0]},
+            "rows": [{"values": [_cell_data(value) for _, value in run]}],
+            "fields": "userEnteredValue"
+        }
+    }
 
@@ -0,0 +1,78 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCOPES = ('https://www.googleapis.com/auth/spreadsheets',)
+
+# (service_account_file, scopes) -> credentials
+_credentials_pool = {}
+_credentials_lock = threading.Lock()
+# httplib2.Http는 스레드 간 공유할 수 없으므로 service 객체는 스레드별로 보관한다
+_thread_local = threading.local()
+
+
+def get_credentials(service_account_file, scopes=DEFAULT_SCOPES):
+    """서비스 계정 credentials를 프로세스 전체에서 한 번만 읽어 재사용하는 함수
+
+    Args:
+        service_account_file (str): 서비스 계정 JSON 파일 경로
+        scopes (Iterable[str]): 요청할 OAuth scope 목록
+
+    Returns:
+        google.oauth2.service_account.Credentials: 공유 credentials
+    """
+    key = (service_account_file, tuple(sorted(scopes)))
+    credentials = _credentials_pool.get(key)
+    if credentials is not None:
+        return credentials
+
+    with _credentials_lock:
+        credentials = _credentials_pool.get(key)
+        if credentials is None:
+            # google-auth는 실제로 시트에 접근할 때만 불러온다 (시작 시간 단축)
+            from google.oauth2 import service_account
+
+            logger.debug("Loading service account credentials for scopes: %s", key[1])
+            credentials = service_account.Credentials.from_service_account_file(
+                service_account_file, scopes=list(key[1]))
+            _credentials_pool[key] = credentials
+    return credentials
+
+
+def get_sheets_service(service_account_file, scopes=DEFAULT_SCOPES):
+    """Sheets v4 service 객체를 지연 생성하여 재사용하는 함수
+
+    credentials는 프로세스 전체에서, service와 HTTP 연결(keep-alive)은 스레드별로 공유한다.
+
+    Args:
+        service_account_file (str): 서비스 계정 JSON 파일 경로
+        scopes (Iterable[str]): 요청할 OAuth scope 목록
+
+    Returns:
+        googleapiclient.discovery.Resource: 현재 스레드용 Sheets service
+    """
+    key = (service_account_file, tuple(sorted(scopes)))
+    services = getattr(_thread_local, 'services', None)
+    if services is None:
+        services = _thread_local.services = {}
+
+    service = services.get(key)
+    if service is None:
+        from googleapiclient.discovery import build
+        from google_auth_httplib2 import AuthorizedHttp
+        import httplib2
+
+        logger.debug("Building sheets service for thread: %s", threading.current_thread().name)
+        credentials = get_credentials(service_account_file, key[1])
+        http = AuthorizedHttp(credentials, http=httplib2.Http())
+        service = build('sheets', 'v4', http=http, cache_discovery=False)
+        services[key] = service
+    return service
+
+
+def clear_pool():
+    """공유 credentials와 현재 스레드의 service 캐시를 비우는 함수 (서비스 계정 교체 시 사용)"""
+    with _credentials_lock:
+        _credentials_pool.clear()
+    _thread_local.services = {}
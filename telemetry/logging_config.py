@@ -0,0 +1,178 @@
+import atexit
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+from telemetry.tracing import current_span
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+# 'text' 또는 'json' (한 줄에 레코드 하나)
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_FILE = os.getenv('LOG_FILE')
+# payload()로 감싼 값은 이 글자 수까지만 남기고 길이와 해시를 붙인다 (0이면 자르지 않음)
+LOG_PAYLOAD_LIMIT = int(os.getenv('LOG_PAYLOAD_LIMIT', '200'))
+# DEBUG 레코드를 남길 비율 (같은 로그 위치마다 1 / rate번째 레코드만 남긴다)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1.0'))
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+_configure_lock = threading.Lock()
+
+
+class _Payload:
+    __slots__ = ('value', 'limit')
+
+    def __init__(self, value, limit):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        text = self.value if isinstance(self.value, str) else str(self.value)
+        limit = LOG_PAYLOAD_LIMIT if self.limit is None else self.limit
+        if limit <= 0 or len(text) <= limit:
+            return text
+        digest = hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+        return f"{text[:limit]}... <{len(text)} chars, sha1:{digest}>"
+
+
+def payload(value, limit=None):
+    """로그에 넣을 큰 값(프롬프트, 응답, 시트 값)을 감싸는 함수
+
+    %s 인자로 넘기면 레코드가 실제로 출력될 때만 문자열로 바꾸며, limit(기본 LOG_PAYLOAD_LIMIT)자를 넘으면
+    앞부분과 전체 길이, sha1 해시만 남긴다. 같은 값인지는 해시로 비교할 수 있다.
+
+    예: logger.debug("Result: %s", payload(result))
+    """
+    return _Payload(value, limit)
+
+
+class SamplingFilter(logging.Filter):
+    """INFO 미만 레코드를 로그 위치(logger, 줄 번호)마다 1 / rate번째만 통과시키는 filter"""
+
+    def __init__(self, rate=LOG_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.INFO:
+            return True
+        if self.every == 0:
+            return False
+        if self.every == 1:
+            return True
+        key = (record.name, record.lineno)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
+
+class TraceContextFilter(logging.Filter):
+    """레코드에 현재 span의 trace_id, span_id를 붙이는 filter (telemetry.tracing과 연결용)"""
+
+    def filter(self, record):
+        span = current_span()
+        record.trace_id = span.trace.trace_id if span is not None else None
+        record.span_id = span.span_id if span is not None else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """레코드를 JSON 한 줄로 만드는 formatter"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        if getattr(record, 'trace_id', None):
+            entry['trace_id'] = record.trace_id
+            entry['span_id'] = record.span_id
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level=None, format=None, log_file=None, sample_rate=None, use_queue=True):
+    """루트 logger를 설정하는 함수 (진입점 스크립트에서 한 번 호출, 다시 호출하면 교체)
+
+    라이브러리 모듈은 logging.getLogger(__name__)만 쓰고 루트 logger를 설정하지 않는다.
+    use_queue가 True이면 QueueHandler.prepare()가 호출 스레드에서 메시지를 만든다
+    (%s 인자 치환, payload() 자르기, 예외 traceback 문자열화). QueueListener 스레드는
+    handler의 formatter(TEXT_FORMAT 또는 JsonFormatter)를 적용하고 stderr, log_file에 쓰는 일만 맡는다.
+    따라서 큐는 메시지 치환 비용이 아니라 출력(I/O) 대기를 호출 스레드에서 덜어 낸다.
+
+    Args:
+        level (str | int): 로그 레벨 (기본 LOG_LEVEL)
+        format (str): 'text' 또는 'json' (기본 LOG_FORMAT)
+        log_file (str): 추가로 기록할 파일 경로 (기본 LOG_FILE)
+        sample_rate (float): DEBUG 레코드를 남길 비율 (기본 LOG_DEBUG_SAMPLE_RATE)
+    """
+    global _listener
+
+    level = level or LOG_LEVEL
+    if isinstance(level, str):
+        level = level.upper()
+    format = format or LOG_FORMAT
+    if format not in ('text', 'json'):
+        raise ValueError(f"Invalid log format: {format}")
+    log_file = log_file or LOG_FILE
+    sample_rate = LOG_DEBUG_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    formatter = JsonFormatter() if format == 'json' else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    with _configure_lock:
+        root = logging.getLogger()
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+
+        if use_queue:
+            records = queue.SimpleQueue()
+            front = logging.handlers.QueueHandler(records)
+            _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+            _listener.start()
+            front_handlers = [front]
+        else:
+            front_handlers = handlers
+        for handler in front_handlers:
+            # 필터는 호출 스레드에서 실행되어야 현재 span을 알 수 있다
+            handler.addFilter(SamplingFilter(sample_rate))
+            handler.addFilter(TraceContextFilter())
+            root.addHandler(handler)
+        root.setLevel(level)
+
+
+def shutdown_logging():
+    """QueueListener에 남은 레코드를 모두 출력하고 멈추는 함수 (프로세스 종료 시 자동 호출)"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
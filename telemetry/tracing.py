@@ -0,0 +1,255 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# on이면 끝난 trace를 TELEMETRY_PATH에 JSON Lines로 내보낸다
+TELEMETRY_ENABLED = os.getenv('TELEMETRY', 'off') == 'on'
+TELEMETRY_PATH = os.getenv('TELEMETRY_PATH', os.path.join('.cache', 'telemetry.jsonl'))
+# 파일이 이 크기를 넘으면 TELEMETRY_PATH.1로 옮기고 새 파일에 쓴다 (이전 .1 파일은 지워진다)
+TELEMETRY_MAX_BYTES = int(os.getenv('TELEMETRY_MAX_BYTES', str(10 * 1024 * 1024)))
+# 'json': 한 줄에 span 하나, 'otlp': 한 줄에 trace 하나 (OTLP/JSON의 resourceSpans, OpenTelemetry collector로 전달 가능)
+TELEMETRY_FORMAT = os.getenv('TELEMETRY_FORMAT', 'json')
+SERVICE_NAME = 'jadongsoseol'
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+_export_lock = threading.Lock()
+
+
+class Trace:
+    """한 최상위 span과 그 아래에서 끝난 span들의 모음"""
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def descendants(self, span):
+        """span과 그 아래에서 끝난 모든 span"""
+        with self._lock:
+            spans = list(self.spans)
+        ids = {span.span_id}
+        result = [span] if span in spans else []
+        added = True
+        while added:
+            added = False
+            for candidate in spans:
+                if candidate.span_id not in ids and candidate.parent_id in ids:
+                    ids.add(candidate.span_id)
+                    result.append(candidate)
+                    added = True
+        return result
+
+
+class Span:
+    """한 단계의 소요 시간과 속성 (completion_tokens가 있으면 끝날 때 tokens_per_second를 계산)"""
+
+    def __init__(self, name, trace, parent=None, attributes=None):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self.end_time = None
+        self.duration_ms = None
+        self.error = None
+        self._started_at = time.perf_counter()
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._started_at) * 1000
+
+    def set(self, **attributes):
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+        return self
+
+    def add(self, key, amount=1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+        return self
+
+    def mark_first_token(self):
+        """스트리밍 첫 조각을 받은 시점을 ttft_ms로 기록하는 함수 (처음 한 번만)"""
+        if 'ttft_ms' not in self.attributes:
+            self.attributes['ttft_ms'] = round(self.elapsed_ms(), 1)
+
+    def end(self, error=None):
+        self.duration_ms = round(self.elapsed_ms(), 1)
+        self.end_time = self.start_time + self.duration_ms / 1000
+        if error is not None:
+            self.error = f"{type(error).__name__}: {str(error)}"
+        completion_tokens = self.attributes.get('completion_tokens')
+        if completion_tokens and self.duration_ms:
+            # 스트리밍이면 첫 토큰 이후 시간으로 생성 속도를 계산한다
+            generation_ms = self.duration_ms - self.attributes.get('ttft_ms', 0)
+            if generation_ms > 0:
+                self.attributes['tokens_per_second'] = round(completion_tokens / generation_ms * 1000, 1)
+        self.trace.add(self)
+
+    def total(self, key):
+        """이 span과 하위 span의 key 속성 합계 (예: retries)"""
+        return sum(span.attributes.get(key, 0) for span in self.trace.descendants(self))
+
+    def as_dict(self):
+        return {'trace_id': self.trace.trace_id, 'span_id': self.span_id, 'parent_id': self.parent_id,
+                'name': self.name, 'start_time': self.start_time, 'end_time': self.end_time,
+                'duration_ms': self.duration_ms, 'status': 'error' if self.error else 'ok', 'error': self.error,
+                'attributes': self.attributes}
+
+    def as_otlp(self):
+        span = {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(int(self.start_time * 1e9)),
+            'endTimeUnixNano': str(int(self.end_time * 1e9)),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in self.attributes.items()],
+            'status': {'code': 2, 'message': self.error} if self.error else {'code': 1},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def trace_records(trace, format=TELEMETRY_FORMAT):
+    """trace를 내보낼 JSON 레코드 목록으로 변환하는 함수"""
+    spans = sorted(trace.spans, key=lambda span: span.start_time)
+    if format == 'otlp':
+        return [{'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+            'scopeSpans': [{'scope': {'name': __name__}, 'spans': [span.as_otlp() for span in spans]}],
+        }]}]
+    return [span.as_dict() for span in spans]
+
+
+def _rotate(path, max_bytes):
+    try:
+        if max_bytes and os.path.getsize(path) >= max_bytes:
+            os.replace(path, f"{path}.1")
+    except FileNotFoundError:
+        pass
+
+
+def export_trace(trace, path=TELEMETRY_PATH, max_bytes=TELEMETRY_MAX_BYTES):
+    """끝난 trace를 path에 JSON Lines로 추가하는 함수 (TELEMETRY=on일 때만 기록)
+
+    파일이 max_bytes를 넘으면 path.1 하나만 남기고 새 파일로 바꾸므로 디스크 사용량은 약 2 * max_bytes로 제한된다.
+    """
+    if not TELEMETRY_ENABLED or not path:
+        return
+    try:
+        records = trace_records(trace)
+        telemetry_dir = os.path.dirname(path)
+        if telemetry_dir:
+            os.makedirs(telemetry_dir, exist_ok=True)
+        with _export_lock:
+            _rotate(path, max_bytes)
+            with open(path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+    except OSError as e:
+        logger.warning("Failed to export telemetry: %s", e)
+
+
+class _SpanContext:
+    """span()이 반환하는 context manager (with/async with 모두 지원)"""
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.span = None
+        self._token = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        trace = parent.trace if parent is not None else Trace()
+        self.span = Span(self.name, trace, parent, self.attributes)
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        self.span.end(exc)
+        if self.span.parent_id is None:
+            export_trace(self.span.trace)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+def span(name, **attributes):
+    """name 단계의 소요 시간을 기록하는 span을 여는 함수
+
+    현재 span(같은 스레드, 같은 asyncio task, 또는 to_thread/create_task로 이어진 context)의 하위 span이 되며,
+    최상위 span이 끝나면 trace 전체를 TELEMETRY_PATH로 내보낸다 (TELEMETRY=on일 때).
+
+    예: with span('sheets.load_config', purpose='motivation') as s: ...
+    """
+    return _SpanContext(name, attributes)
+
+
+def traced(name):
+    """함수 호출 전체를 name span으로 감싸는 decorator (코루틴 함수도 지원)"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    """현재 span (없으면 None)"""
+    return _current_span.get()
+
+
+def set_attributes(**attributes):
+    """현재 span에 속성을 기록하는 함수 (span 밖에서는 무시)"""
+    span = _current_span.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+def record_retry():
+    """현재 span의 재시도 횟수를 1 늘리는 함수 (resilience.retry에서 호출)"""
+    span = _current_span.get()
+    if span is not None:
+        span.add('retries')
+
+
+def mark_first_token():
+    span = _current_span.get()
+    if span is not None:
+        span.mark_first_token()
@@ -1,40 +1,40 @@
-from langchain_openai import ChatOpenAI
+from use_llm.client_registry import get_chat_model
+from fit_length.fitter import fit_answer, fit_stats
+from fit_length.length_counter import DEFAULT_COUNT_RULE
+from resilience.retry import call_with_retry
+from telemetry.logging_config import configure_logging
 from langchain.prompts import ChatPromptTemplate
 import re
 from dotenv import load_dotenv
 import logging
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
 class CoverLetterGenerator:
-    def __init__(self):
+    def __init__(self, count_rule=DEFAULT_COUNT_RULE):
+        self.count_rule = count_rule
         try:
-            self.llm = ChatOpenAI(model_name="o1-mini")
+            self.llm = get_chat_model('openai', 'o1-mini')
             logger.info("ChatOpenAI 초기화 성공")
         except Exception as e:
-            logger.error(f"ChatOpenAI 초기화 실패: {str(e)}")
+            logger.error("ChatOpenAI 초기화 실패: %s", e)
             raise
         
     def count_korean_chars(self, text):
         try:
-            # 공백을 제거하지 않고 전체 문자열 길이를 계산
-            count = len(text)
-            logger.debug(f"글자 수 계산: {count}자")
+            # 지원 사이트의 글자 수 계산 규칙 적용 (기본: 공백 포함 문자 수)
+            count = self.count_rule.count(text)
+            logger.debug("글자 수 계산: %s자", count)
             return count
         except Exception as e:
-            logger.error(f"글자 수 계산 중 오류 발생: {str(e)}")
+            logger.error("글자 수 계산 중 오류 발생: %s", e)
             raise
     
     def generate_answer(self, question, char_limit):
         try:
-            logger.info(f"답변 생성 시작 - 질문: {question[:50]}... (글자수 제한: {char_limit}자)")
+            logger.info("답변 생성 시작 - 질문: %s... (글자수 제한: %s자)", question[:50], char_limit)
             prompt_limit = char_limit * 2
             
             initial_prompt = ChatPromptTemplate.from_messages([
@@ -52,25 +52,33 @@ class CoverLetterGenerator:
             ])
             
             logger.debug("첫 번째 답변 생성 시도")
-            answer = (
+            answer = call_with_retry((
                 initial_prompt | 
                 self.llm
-            ).invoke({
+            ).invoke, {
                 "char_limit": char_limit,
                 "prompt_limit": prompt_limit,
                 "question": question
-            }).content
+            }, endpoint='openai').content
             
             max_attempts = 5
             attempt = 1
             
             while attempt < max_attempts:
                 current_length = self.count_korean_chars(answer)
-                logger.info(f"시도 {attempt}: 현재 글자수 {current_length}자")
+                logger.info("시도 %s: 현재 글자수 %s자", attempt, current_length)
                 
                 if current_length == char_limit:
                     logger.info("목표 글자수 달성")
                     break
+
+                # LLM 조정 전에 로컬 길이 조정 시도
+                fit_result = fit_answer(answer, char_limit, char_limit, count=self.count_korean_chars)
+                fit_stats.record(fit_result, needed_fit=True)
+                if fit_result.fitted:
+                    logger.info("로컬 길이 조정으로 목표 글자수 달성 (절약한 LLM 호출: %s회)", fit_stats.llm_calls_saved)
+                    answer = fit_result.text
+                    break
                     
                 diff = char_limit - current_length
                 direction = "추가" if diff > 0 else "삭제"
@@ -78,7 +86,7 @@ class CoverLetterGenerator:
                 
                 # 총 {char_limit}자가 되도록 수정해주세요.
 
-                logger.debug(f"글자수 조정 필요: {abs(diff)}자 {direction} 필요")
+                logger.debug("글자수 조정 필요: %s자 %s 필요", abs(diff), direction)
                 adjust_prompt = ChatPromptTemplate.from_messages([
                     ("user", f"""당신은 자기소개서 작성을 돕는 전문가입니다.
                     현재 답변을 수정하여 정확히 {char_limit}자가 되도록 해주세요.
@@ -96,37 +104,38 @@ class CoverLetterGenerator:
                     ("user", "답변을 자연스럽게 수정해주세요.")
                 ])
                 
-                logger.debug(f"답변 조정 시도 {attempt}")
-                answer = (
+                logger.debug("답변 조정 시도 %s", attempt)
+                answer = call_with_retry((
                     adjust_prompt | 
                     self.llm
-                ).invoke({
+                ).invoke, {
                     "char_limit": char_limit,
                     "diff": abs(diff),
                     "current_length": current_length
-                }).content
+                }, endpoint='openai').content
                 
                 attempt += 1
             
             final_length = self.count_korean_chars(answer)
             if final_length != char_limit:
-                logger.warning(f"최종 글자수 불일치 (목표: {char_limit}자, 최종: {final_length}자)")
+                logger.warning("최종 글자수 불일치 (목표: %s자, 최종: %s자)", char_limit, final_length)
             else:
                 logger.info("글자수 조정 성공")
                 
             return answer
             
         except Exception as e:
-            logger.error(f"답변 생성 중 오류 발생: {str(e)}")
+            logger.error("답변 생성 중 오류 발생: %s", e)
             raise
 
 if __name__ == "__main__":
+    configure_logging()
     try:
         generator = CoverLetterGenerator()
         question = "본인의 장점과 단점을 서술해주세요."
         answer = generator.generate_answer(question, 1000)
         final_count = generator.count_korean_chars(answer)
         logger.info("답변 생성 성공")
-        logger.debug(f"생성된 답변 ({final_count}자): {answer}")
+        logger.debug("생성된 답변 (%s자): %s", final_count, answer)
     except Exception as e:
-        logger.error(f"프로그램 실행 중 오류 발생: {str(e)}")
\ No newline at end of file
+        logger.error("프로그램 실행 중 오류 발생: %s", e)
\ No newline at end of file
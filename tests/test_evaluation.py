@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from get_data.get_token_price import PriceTable
+from pipeline.evaluation import RenderedPrompt, add_cost, agenerate, answer_language
+from use_llm.token_budget import TOKEN_BUDGET_MIN_SAMPLES, TokenBudget
+
+
+def price_row(model, input_price, output_price):
+    # B열 모델 이름, I열 입력 가격, J열 출력 가격
+    return [model, '', '', '', '', '', '', input_price, output_price]
+
+
+class FakeCostSheet:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get_whole_data(self, sheet_name, range):
+        return [list(row) for row in self.rows]
+
+
+def evaluation_data(**values):
+    data = {'model': 'gpt-4o', 'model_name': 'gpt-4o-2024-08-06',
+            'translation_model': 'gpt-4o-mini', 'translation_model_name': 'gpt-4o-mini-2024-07-18',
+            'prompt_tokens': 1000, 'completion_tokens': 100,
+            'translation_prompt_tokens': 500, 'translation_completion_tokens': 50}
+    data.update(values)
+    return data
+
+
+class AddCostTest(unittest.TestCase):
+    def test_prices_by_requested_model(self):
+        table = PriceTable(FakeCostSheet([price_row('gpt-4o', '0.01', '0.1'),
+                                          price_row('gpt-4o-mini', '0.001', '0.01')]), ttl=None)
+        data = add_cost(evaluation_data(), table, 1000)
+        self.assertAlmostEqual(data['cost'], 1000 * 0.01 + 100 * 0.1 + 500 * 0.001 + 50 * 0.01)
+        self.assertAlmostEqual(data['krw_cost'], data['cost'] * 1000)
+
+    def test_falls_back_to_snapshot_names(self):
+        # 가격표가 응답의 스냅샷 이름으로만 되어 있어도 비용을 계산한다
+        table = PriceTable(FakeCostSheet([price_row('gpt-4o-2024-08-06', '0.01', '0.1'),
+                                          price_row('gpt-4o-mini-2024-07-18', '0.001', '0.01')]), ttl=None)
+        data = add_cost(evaluation_data(), table, 1000)
+        self.assertNotIn('cost_error', data)
+        self.assertAlmostEqual(data['cost'], 1000 * 0.01 + 100 * 0.1 + 500 * 0.001 + 50 * 0.01)
+
+    def test_missing_price_keeps_row(self):
+        table = PriceTable(FakeCostSheet([price_row('gpt-4o-mini', '0.001', '0.01')]), ttl=None)
+        data = add_cost(evaluation_data(), table, 1000)
+        self.assertIsNone(data['cost'])
+        self.assertIsNone(data['krw_cost'])
+        self.assertIn('gpt-4o', data['cost_error'])
+
+
+
+class AnswerLanguageBudgetTest(unittest.TestCase):
+    """프롬프트는 영어로 번역되지만 답변은 한국어인 실행의 토큰 예산"""
+
+    def setUp(self):
+        self.config = SimpleNamespace(question='지원 동기를 작성해 주세요. (1,000자 이내)', model='gpt-4o',
+                                      temperature=1, max_tokens=4000, thinking=None, budget_tokens=None,
+                                      translation_model='gpt-4o-mini', translation_temperature=0)
+        self.translation = {'prompt_english': 'Write your motivation for applying (within 1,000 characters).',
+                            'prompt_english_prefix': '', 'translation_model': 'gpt-4o-mini',
+                            'translation_model_name': 'gpt-4o-mini', 'translation_temperature': 0,
+                            'translation_prompt_tokens': 0, 'translation_completion_tokens': 0,
+                            'translation_total_tokens': 0}
+
+    def test_answer_language_follows_question(self):
+        self.assertEqual(answer_language(self.config), 'ko')
+        self.assertEqual(answer_language(SimpleNamespace(question='Why do you want to join? (500 words)')), 'en')
+        self.assertEqual(answer_language(SimpleNamespace(question=None)), 'ko')
+
+    def test_translated_prompt_uses_korean_budget(self):
+        # 한국어 답변은 토큰당 1글자, 영어는 토큰당 4글자로 보정되어 있다
+        token_budget = TokenBudget({'gpt-4o|ko': [1.0] * TOKEN_BUDGET_MIN_SAMPLES,
+                                    'gpt-4o|en': [4.0] * TOKEN_BUDGET_MIN_SAMPLES})
+        generated = ('답변', None, 10, 10, 20, 'gpt-4o-2024-08-06', 0, 0)
+        with mock.patch('pipeline.evaluation.agenerate_cover_letter',
+                        new=mock.AsyncMock(return_value=generated)) as generate:
+            asyncio.run(agenerate(self.config, RenderedPrompt('프롬프트', 'key'), translation=self.translation,
+                                  token_budget=token_budget))
+        self.assertEqual(generate.call_args.kwargs['max_tokens'],
+                         token_budget.limit_max_tokens('gpt-4o', 1000, 4000, language='ko'))
+        self.assertGreater(generate.call_args.kwargs['max_tokens'],
+                           token_budget.limit_max_tokens('gpt-4o', 1000, 4000, language='en'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from fit_length.fitter import MAX_FINE_EDITS, FitStats, fit_answer, split_sentences
+from fit_length.length_counter import COUNT_RULES
+
+SENTENCES = "첫 문장입니다. 둘째 문장입니다. 셋째 문장입니다."
+
+
+class FitAnswerTest(unittest.TestCase):
+    def test_split_sentences(self):
+        spans = split_sentences(SENTENCES)
+        self.assertEqual([SENTENCES[start:end].strip() for start, end in spans],
+                         ['첫 문장입니다.', '둘째 문장입니다.', '셋째 문장입니다.'])
+
+    def test_in_range_is_unchanged(self):
+        result = fit_answer(SENTENCES, 0, len(SENTENCES))
+        self.assertTrue(result.fitted)
+        self.assertEqual(result.text, SENTENCES)
+        self.assertEqual(result.operations, [])
+
+    def test_shrinks_with_contraction(self):
+        text = '저는 프로젝트를 완료하였습니다. 결과도 좋았습니다.'
+        result = fit_answer(text, len(text) - 3, len(text) - 1)
+        self.assertTrue(result.fitted)
+        self.assertIn('완료했습니다', result.text)
+        self.assertEqual(result.length, len(result.text))
+        self.assertLessEqual(result.length, len(text) - 1)
+
+    def test_expands_with_full_form(self):
+        text = '프로젝트를 완료했습니다.'
+        result = fit_answer(text, len(text) + 1, len(text) + 1)
+        self.assertTrue(result.fitted)
+        self.assertEqual(result.text, '프로젝트를 완료하였습니다.')
+
+    def test_unreachable_target_keeps_text(self):
+        result = fit_answer(SENTENCES, 1, 5)
+        self.assertFalse(result.fitted)
+        self.assertEqual(result.text, SENTENCES)
+
+    def test_stats_count_only_needed_fits(self):
+        stats = FitStats()
+        stats.record(fit_answer(SENTENCES, 0, len(SENTENCES)), needed_fit=False)
+        stats.record(fit_answer('완료했습니다.', 8, 8), needed_fit=True)
+        self.assertEqual(stats.as_dict(), {'attempts': 2, 'local_fits': 1, 'llm_calls_saved': 1})
+
+    def test_byte_rule_reaches_targets_beyond_char_deltas(self):
+        # cp949에서 '굉장히 '는 7바이트이므로 글자 수(4자) 기준 경계로는 닿을 수 없다고 판단하면 안 된다
+        count = COUNT_RULES['cp949_bytes']
+        text = '저는 ' + '굉장히 ' * MAX_FINE_EDITS + '열심히 했습니다.'
+        max_length = count(text) - MAX_FINE_EDITS * 7
+        self.assertGreater(count(text), max_length + MAX_FINE_EDITS * 4)
+        result = fit_answer(text, 0, max_length, count=count)
+        self.assertTrue(result.fitted)
+        self.assertEqual(result.text, '저는 열심히 했습니다.')
+        self.assertEqual(result.length, count(result.text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import itertools
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from use_llm.generation_cache import GenerationCache, generation_key
+
+
+def result(content, model_name='gpt-4o-2024-08-06'):
+    return {'content': content, 'thinking': None, 'completion_tokens': 10, 'prompt_tokens': 20,
+            'total_tokens': 30, 'model_name': model_name}
+
+
+class GenerationCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        # 같은 시각으로 기록되어 LRU 순서가 섞이지 않도록 시계를 1초씩 진행시킨다
+        clock = itertools.count(1000)
+        patcher = mock.patch('use_llm.generation_cache.time.time', side_effect=lambda: float(next(clock)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_keys(self):
+        self.assertEqual(generation_key('prompt', 'gpt-4o', 1), generation_key('prompt', 'gpt-4o', '1.0'))
+        self.assertNotEqual(generation_key('prompt', 'gpt-4o', 1), generation_key('other', 'gpt-4o', 1))
+        self.assertNotEqual(generation_key('prompt', 'claude-3-7-sonnet', 1, 'on', 1024),
+                            generation_key('prompt', 'claude-3-7-sonnet', 1, 'on', 2048))
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            GenerationCache('always', path=self.path('generations.sqlite3'))
+        with self.assertRaises(ValueError):
+            GenerationCache('sample', samples=0, path=self.path('generations.sqlite3'))
+
+    def test_exact_mode_stores_one_result(self):
+        cache = GenerationCache('exact', path=self.path('generations.sqlite3'))
+        self.assertIsNone(cache.get('k', temperature=1))
+        self.assertTrue(cache.set('k', result('first'), temperature=1))
+        self.assertFalse(cache.set('k', result('second'), temperature=1))
+        self.assertEqual(cache.get('k', temperature=1)['content'], 'first')
+
+    def test_sample_mode_rotates_results(self):
+        cache = GenerationCache('sample', samples=2, path=self.path('generations.sqlite3'))
+        cache.set('k', result('first'), temperature=1)
+        self.assertIsNone(cache.get('k', temperature=1))
+        cache.set('k', result('second'), temperature=1)
+        contents = [cache.get('k', temperature=1)['content'] for _ in range(4)]
+        self.assertEqual(contents, ['first', 'second', 'first', 'second'])
+        self.assertEqual(cache.samples_for(0), 1)
+
+    def test_evicts_least_recently_used(self):
+        size = len(json.dumps(result('a'), ensure_ascii=False).encode('utf-8'))
+        cache = GenerationCache('exact', path=self.path('generations.sqlite3'), max_bytes=size * 2)
+        cache.set('a', result('a'))
+        cache.set('b', result('b'))
+        cache.get('a')
+        cache.set('c', result('c'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a')['content'], 'a')
+        self.assertEqual(cache.get('c')['content'], 'c')
+
+
+if __name__ == '__main__':
+    unittest.main()
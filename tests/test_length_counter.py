@@ -0,0 +1,45 @@
+import unicodedata
+import unittest
+
+from fit_length.length_counter import COUNT_RULES, CountRule, LengthCounter, get_count_rule
+
+
+class CountRuleTest(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(CountRule().count('가a'), 2)
+        self.assertEqual(CountRule(unit='utf8_bytes').count('가a'), 4)
+        self.assertEqual(CountRule(unit='cp949_bytes').count('가a'), 3)
+
+    def test_whitespace_and_newlines(self):
+        self.assertEqual(COUNT_RULES['chars_no_space'].count('가 나\n다'), 3)
+        self.assertEqual(COUNT_RULES['chars_crlf'].count('a\nb'), 4)
+
+    def test_normalizes_before_counting(self):
+        self.assertEqual(CountRule().count(unicodedata.normalize('NFD', '한글')), 2)
+        self.assertEqual(CountRule(normalize=None).count(unicodedata.normalize('NFD', '한글')), 6)
+
+    def test_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            CountRule(unit='words')
+        with self.assertRaises(ValueError):
+            get_count_rule('words')
+        self.assertIs(get_count_rule(None), COUNT_RULES['chars'])
+
+
+class LengthCounterTest(unittest.TestCase):
+    def test_streamed_jamo_match_full_count(self):
+        text = unicodedata.normalize('NFD', '한글 자기소개서')
+        counter = LengthCounter()
+        for char in text:
+            counter.append(char)
+        self.assertEqual(counter.value, CountRule().count(text))
+
+    def test_apply_edit_and_reset(self):
+        counter = LengthCounter(text='프로젝트를 완료하였습니다.')
+        self.assertEqual(counter.apply_edit('하였', '했'), len('프로젝트를 완료했습니다.'))
+        self.assertEqual(counter.reset('abc'), 3)
+        self.assertEqual(counter.reset(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
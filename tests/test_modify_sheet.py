@@ -0,0 +1,46 @@
+import unittest
+
+from sheet.modify_sheet import (EVALUATION_GRAND_TOTAL_COLUMN, _cell_data, _column_to_index, _evaluation_cells,
+                                _update_cells_requests)
+
+
+class EvaluationCellsTest(unittest.TestCase):
+    def test_maps_keys_to_columns(self):
+        cells = _evaluation_cells({'formatted_prompt': '프롬프트', 'result': '답변', 'model_name': 'gpt-4o',
+                                   'cost': None, 'total_tokens': 30, 'translation_total_tokens': 12,
+                                   'prompt_key': 'abc'})
+        self.assertEqual(cells, {'B': '프롬프트', 'E': '답변', 'G': 'gpt-4o', 'K': None, 'O': 30, 'R': 12,
+                                 EVALUATION_GRAND_TOTAL_COLUMN: 42})
+
+    def test_grand_total_needs_both_totals(self):
+        self.assertNotIn(EVALUATION_GRAND_TOTAL_COLUMN, _evaluation_cells({'total_tokens': 30}))
+
+
+class UpdateCellsRequestsTest(unittest.TestCase):
+    def test_column_to_index(self):
+        self.assertEqual([_column_to_index(column) for column in ('A', 'z', 'AA', 'AB')], [0, 25, 26, 27])
+
+    def test_cell_data(self):
+        self.assertEqual(_cell_data(None), {})
+        self.assertEqual(_cell_data(True), {'userEnteredValue': {'boolValue': True}})
+        self.assertEqual(_cell_data(1.5), {'userEnteredValue': {'numberValue': 1.5}})
+        self.assertEqual(_cell_data('=1+1'), {'userEnteredValue': {'stringValue': '=1+1'}})
+
+    def test_splits_on_gaps(self):
+        # F열은 기록하지 않으므로 E, G열은 다른 요청으로 나뉜다
+        requests = _update_cells_requests(7, 4, {'G': 'gpt-4o', 'E': '답변', 'D': None, 'H': 1})
+        self.assertEqual(len(requests), 2)
+        first, second = (request['updateCells'] for request in requests)
+        self.assertEqual(first['start'], {'sheetId': 7, 'rowIndex': 4, 'columnIndex': 3})
+        self.assertEqual(first['rows'], [{'values': [{}, {'userEnteredValue': {'stringValue': '답변'}}]}])
+        self.assertEqual(second['start']['columnIndex'], 6)
+        self.assertEqual(second['rows'][0]['values'],
+                         [{'userEnteredValue': {'stringValue': 'gpt-4o'}}, {'userEnteredValue': {'numberValue': 1}}])
+        self.assertEqual(first['fields'], 'userEnteredValue')
+
+    def test_empty_cells(self):
+        self.assertEqual(_update_cells_requests(7, 0, {}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from fit_length.patch import PatchError, apply_patch, parse_patch
+
+SENTENCES = "첫 문장입니다. 둘째 문장입니다. 셋째 문장입니다."
+
+
+class PatchTest(unittest.TestCase):
+    def test_parse_patch_ignores_code_fence(self):
+        response = '```json\n[{"op": "delete", "index": 2}]\n```'
+        self.assertEqual(parse_patch(response), [{'op': 'delete', 'index': 2}])
+
+    def test_parse_patch_errors(self):
+        for response in ('패치 없음', '[{"op": }]', '[1, 2]'):
+            with self.assertRaises(PatchError):
+                parse_patch(response)
+        self.assertTrue(issubclass(PatchError, ValueError))
+
+    def test_apply_patch(self):
+        self.assertEqual(apply_patch(SENTENCES, [{'op': 'replace', 'index': 2, 'text': '바뀐 문장입니다.'}]),
+                         '첫 문장입니다. 바뀐 문장입니다. 셋째 문장입니다.')
+        self.assertEqual(apply_patch(SENTENCES, [{'op': 'delete', 'index': 1}]),
+                         '둘째 문장입니다. 셋째 문장입니다.')
+        self.assertEqual(apply_patch(SENTENCES, [{'op': 'insert', 'after': 0, 'text': '새 문장.'},
+                                                 {'op': 'insert', 'after': 3, 'text': '끝 문장.'}]),
+                         '새 문장. 첫 문장입니다. 둘째 문장입니다. 셋째 문장입니다. 끝 문장.')
+
+    def test_apply_patch_rejects_bad_operations(self):
+        for operation in ({'op': 'replace', 'index': 4, 'text': 'x'},
+                          {'op': 'insert', 'after': -1, 'text': 'x'},
+                          {'op': 'replace', 'index': 1},
+                          {'op': 'move', 'index': 1}):
+            with self.assertRaises(PatchError):
+                apply_patch(SENTENCES, [operation])
+
+
+if __name__ == '__main__':
+    unittest.main()
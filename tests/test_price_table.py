@@ -0,0 +1,68 @@
+import unittest
+
+from get_data.get_token_price import PRICE_RANGE, PriceTable
+
+
+def price_row(model, input_price, output_price, *cache_prices):
+    # B열 모델 이름, I열 입력 가격, J열 출력 가격, K, L열 캐시 가격
+    return [model, '', '', '', '', '', '', input_price, output_price, *cache_prices]
+
+
+class FakeCostSheet:
+    """get_whole_data만 흉내 내는 cost 시트 (읽은 횟수를 센다)"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.reads = []
+
+    def get_whole_data(self, sheet_name, range):
+        self.reads.append((sheet_name, range))
+        return [list(row) for row in self.rows]
+
+
+class PriceTableTest(unittest.TestCase):
+    def setUp(self):
+        self.sheet = FakeCostSheet([
+            ['model', '', '', '', '', '', '', 'input', 'output'],
+            price_row('gpt-4o', '2.5', '10', '1.25'),
+            price_row('claude-3-7-sonnet-latest', '3', '15', '0.3', '3.75'),
+            price_row('gpt-4o', '99', '99'),
+            ['incomplete', '', ''],
+        ])
+        self.table = PriceTable(self.sheet, ttl=None)
+
+    def test_reads_sheet_once(self):
+        self.assertEqual(self.table.get_price('gpt-4o'), ('2.5', '10'))
+        self.assertEqual(self.table.get_price('claude-3-7-sonnet-latest'), ('3', '15'))
+        self.assertEqual(self.sheet.reads, [('cost', PRICE_RANGE)])
+
+    def test_snapshot_names_fall_back_to_base_name(self):
+        self.assertEqual(self.table.get_price('gpt-4o-2024-08-06'), ('2.5', '10'))
+        self.assertEqual(self.table.get_price('claude-3-7-sonnet-20250219'), ('3', '15'))
+
+    def test_missing_model_raises_after_one_refresh(self):
+        self.table.load()
+        with self.assertRaises(ValueError):
+            self.table.get_price('o1-mini')
+        self.assertEqual(len(self.sheet.reads), 2)
+
+    def test_model_added_to_sheet_is_found_on_refresh(self):
+        self.table.load()
+        self.sheet.rows.append(price_row('o1-mini', '1.1', '4.4'))
+        self.assertEqual(self.table.get_price('o1-mini'), ('1.1', '4.4'))
+
+    def test_cache_prices(self):
+        self.table.load()
+        self.assertEqual(self.table.get_cache_price('gpt-4o'), ('1.25', None))
+        self.assertEqual(self.table.get_cache_price('claude-3-7-sonnet-20250219'), ('0.3', '3.75'))
+        self.assertEqual(self.table.get_cache_price('o1-mini'), (None, None))
+
+    def test_ttl_expiry(self):
+        table = PriceTable(self.sheet, ttl=0)
+        table.get_price('gpt-4o')
+        table.get_price('gpt-4o')
+        self.assertEqual(len(self.sheet.reads), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from types import SimpleNamespace
+
+from pipeline.evaluation import PROMPT_INPUT_FIELDS, render_prompt
+from pipeline.prompt_template import compile_template, content_hash
+
+FIELDS = ('company', 'job')
+
+
+def sheet_config(**values):
+    config = dict.fromkeys(PROMPT_INPUT_FIELDS, '')
+    config.update(prompt_structure='{role}\n{situation}\n질문: {question}', situation='{company} {job} 지원',
+                  company='회사', job='백엔드', role='지원자', question='지원 동기')
+    config.update(values)
+    return SimpleNamespace(**config)
+
+
+class CompileTemplateTest(unittest.TestCase):
+    def test_render_matches_str_format(self):
+        template = '{company}의 {job!r} 직무 ({company:>4})'
+        compiled = compile_template(template, FIELDS)
+        values = {'company': '회사', 'job': '백엔드'}
+        self.assertEqual(compiled.render(values), template.format(**values))
+        self.assertEqual(compiled.fields, ('company', 'job'))
+
+    def test_escaped_braces(self):
+        self.assertEqual(compile_template('{{company}} {company}', FIELDS).render({'company': 'A'}), '{company} A')
+
+    def test_reuses_compiled_template(self):
+        self.assertIs(compile_template('{job}', FIELDS), compile_template('{job}', FIELDS))
+
+    def test_invalid_placeholders(self):
+        for template in ('{}', '{0}', '{company.name}', '{job[0]}', '{salary}', '{job:{company}}', '{job'):
+            with self.assertRaises(ValueError, msg=template):
+                compile_template(template, FIELDS)
+
+    def test_content_hash(self):
+        self.assertEqual(content_hash({'a': 1, 'b': 2}), content_hash({'b': 2, 'a': 1}))
+        self.assertNotEqual(content_hash('a', 'b'), content_hash('ab'))
+
+
+class RenderPromptTest(unittest.TestCase):
+    def test_renders_situation_and_structure(self):
+        rendered = render_prompt(sheet_config())
+        self.assertEqual(rendered.text, '지원자\n회사 백엔드 지원\n질문: 지원 동기')
+
+    def test_key_follows_inputs(self):
+        self.assertEqual(render_prompt(sheet_config()).key, render_prompt(sheet_config()).key)
+        self.assertNotEqual(render_prompt(sheet_config()).key, render_prompt(sheet_config(question='성장 과정')).key)
+        self.assertNotEqual(render_prompt(sheet_config()).key,
+                            render_prompt(sheet_config(prompt_structure='{question}\n{role}')).key)
+
+    def test_invalid_template_is_rejected_before_calls(self):
+        with self.assertRaises(ValueError):
+            render_prompt(sheet_config(prompt_structure='{company}'))
+        with self.assertRaises(ValueError):
+            render_prompt(sheet_config(situation=''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import email.utils
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from resilience.retry import (CircuitBreaker, CircuitOpenError, RetryPolicy, TokenBucket, call_with_retry,
+                              is_retryable, retry_after, status_code, stream_with_retry)
+
+NO_WAIT = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0, jitter=0)
+
+
+class APIError(Exception):
+    """OpenAI/Anthropic SDK 예외처럼 status_code와 response.headers를 가진 오류"""
+
+    def __init__(self, status, headers=None):
+        super().__init__(f"status {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class _Response(dict):
+    """httplib2.Response처럼 헤더 dict이면서 status 속성을 가진 응답"""
+
+    @property
+    def status(self):
+        return self['status']
+
+
+class HttpError(Exception):
+    """googleapiclient HttpError처럼 resp에 상태 코드와 헤더가 있는 오류"""
+
+    def __init__(self, status, headers=None):
+        super().__init__(f"status {status}")
+        self.resp = _Response({'status': str(status), **(headers or {})})
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_exponential_backoff(self):
+        policy = RetryPolicy(base_delay=1, max_delay=5, jitter=0)
+        self.assertEqual([policy.delay(n) for n in (1, 2, 3, 4)], [1, 2, 4, 5])
+
+    def test_jitter_only_shortens(self):
+        policy = RetryPolicy(base_delay=2, max_delay=60, jitter=0.5)
+        for _ in range(20):
+            self.assertTrue(1.0 <= policy.delay(1) <= 2.0)
+
+    def test_retry_after_wins_but_is_capped(self):
+        policy = RetryPolicy(base_delay=1, max_delay=10, jitter=0)
+        self.assertEqual(policy.delay(1, APIError(429, {'retry-after': '3'})), 3.0)
+        self.assertEqual(policy.delay(1, APIError(429, {'retry-after': '120'})), 10)
+
+
+class RetryAfterTest(unittest.TestCase):
+    def test_seconds_and_milliseconds(self):
+        self.assertEqual(retry_after(APIError(429, {'retry-after': '2.5'})), 2.5)
+        self.assertEqual(retry_after(APIError(429, {'retry-after-ms': '1500', 'retry-after': '9'})), 1.5)
+        self.assertEqual(retry_after(APIError(429, {'retry-after': '-3'})), 0.0)
+
+    def test_http_date(self):
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        delay = retry_after(APIError(503, {'retry-after': email.utils.format_datetime(when, usegmt=True)}))
+        self.assertTrue(25 <= delay <= 30)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(retry_after(APIError(429)))
+        self.assertIsNone(retry_after(APIError(429, {'retry-after': 'soon'})))
+        self.assertIsNone(retry_after(ValueError('no response')))
+
+    def test_http_error_headers(self):
+        error = HttpError(429, {'retry-after': '4'})
+        self.assertEqual(status_code(error), 429)
+        self.assertEqual(retry_after(error), 4.0)
+
+
+class IsRetryableTest(unittest.TestCase):
+    def test_status_codes(self):
+        self.assertTrue(is_retryable(APIError(429), idempotent=False))
+        self.assertTrue(is_retryable(APIError(503)))
+        self.assertFalse(is_retryable(APIError(503), idempotent=False))
+        self.assertFalse(is_retryable(APIError(400)))
+
+    def test_exception_types(self):
+        self.assertTrue(is_retryable(ConnectionError()))
+        self.assertFalse(is_retryable(ConnectionError(), idempotent=False))
+        self.assertFalse(is_retryable(ValueError()))
+        self.assertFalse(is_retryable(CircuitOpenError('open')))
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        wait = bucket.reserve()
+        self.assertTrue(0 < wait <= 0.1)
+        self.assertTrue(0.1 < bucket.reserve() <= 0.2)
+
+    def test_refills_over_time(self):
+        bucket = TokenBucket(rate=1000, capacity=1)
+        bucket.reserve()
+        time.sleep(0.01)
+        self.assertEqual(bucket.reserve(), 0.0)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_success_resets(self):
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.before_call()
+
+    def test_half_open_failure_reopens(self):
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=0)
+        breaker.record_failure()
+        breaker.record_failure()
+        # reset_timeout이 지나면 한 번 호출을 허용하고, 그 호출이 실패하면 바로 다시 연다
+        breaker.before_call()
+        breaker.reset_timeout = 60
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+
+class CallWithRetryTest(unittest.TestCase):
+    def test_retries_transient_errors(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ConnectionError('reset')
+            return 'ok'
+
+        self.assertEqual(call_with_retry(flaky, policy=NO_WAIT), 'ok')
+        self.assertEqual(len(calls), 3)
+
+    def test_gives_up(self):
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise APIError(503)
+
+        with self.assertRaises(APIError):
+            call_with_retry(broken, policy=NO_WAIT)
+        self.assertEqual(len(calls), NO_WAIT.max_attempts)
+
+        calls.clear()
+        with self.assertRaises(APIError):
+            call_with_retry(broken, policy=NO_WAIT, idempotent=False)
+        self.assertEqual(len(calls), 1)
+
+
+class StreamWithRetryTest(unittest.TestCase):
+    def test_retries_before_first_chunk(self):
+        calls = []
+
+        def stream():
+            calls.append(1)
+            if len(calls) == 1:
+                raise APIError(429)
+            yield from ['a', 'b']
+
+        self.assertEqual(list(stream_with_retry(stream, policy=NO_WAIT)), ['a', 'b'])
+        self.assertEqual(len(calls), 2)
+
+    def test_does_not_retry_after_first_chunk(self):
+        calls = []
+
+        def stream():
+            calls.append(1)
+            yield 'a'
+            raise ConnectionError('reset')
+
+        received = []
+        with self.assertRaises(ConnectionError):
+            for chunk in stream_with_retry(stream, policy=NO_WAIT):
+                received.append(chunk)
+        self.assertEqual(received, ['a'])
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from pipeline.run_store import RunStore, SheetExporter
+
+
+class TransientError(Exception):
+    status_code = 503
+
+
+class FakeEvaluationSheet:
+    """commit_evaluation_rows만 흉내 내는 시트 (bad=True인 행이 섞이면 ValueError)"""
+
+    def __init__(self):
+        self.rows = []
+        self.error = None
+
+    def commit_evaluation_rows(self, data_list):
+        if self.error is not None:
+            raise self.error
+        if any(data.get('bad') for data in data_list):
+            raise ValueError('invalid row')
+        self.rows.extend(data_list)
+
+
+class RunStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = RunStore(os.path.join(directory.name, 'runs.sqlite3'), max_attempts=2)
+        self.sheet = FakeEvaluationSheet()
+        self.exporter = SheetExporter(self.store, self.sheet, 'core_experience', batch_size=2)
+
+    def test_append_and_pending(self):
+        ids = self.store.append('core_experience', [{'n': 1}, {'n': 2}, {'n': 3}])
+        self.store.append('motivation', [{'n': 4}])
+        self.assertEqual(self.store.pending('core_experience', limit=2), [(ids[0], {'n': 1}), (ids[1], {'n': 2})])
+        self.assertEqual(self.store.pending('core_experience', after_id=ids[1]), [(ids[2], {'n': 3})])
+        self.assertEqual(sorted(self.store.pending_purposes()), ['core_experience', 'motivation'])
+
+    def test_flush_exports_in_batches(self):
+        self.store.append('core_experience', [{'n': n} for n in range(5)])
+        self.assertEqual(self.exporter.flush(), 5)
+        self.assertEqual([data['n'] for data in self.sheet.rows], [0, 1, 2, 3, 4])
+        self.assertEqual(self.store.pending('core_experience'), [])
+
+    def test_bad_row_becomes_dead_letter(self):
+        self.store.append('core_experience', [{'n': 1}, {'n': 2, 'bad': True}, {'n': 3}])
+        self.assertEqual(self.exporter.flush(), 2)
+        self.assertEqual(self.store.dead_letters(), [])
+        # 두 번째 실패에서 max_attempts(2)에 이르러 더 이상 내보내지 않는다
+        self.assertEqual(self.exporter.flush(), 0)
+        dead = self.store.dead_letters('core_experience')
+        self.assertEqual([(attempts, error) for _, _, attempts, error in dead], [(2, 'invalid row')])
+        self.assertEqual(self.store.pending('core_experience'), [])
+        self.assertEqual(self.store.pending_purposes(), [])
+
+    def test_reset_failures(self):
+        self.store.append('core_experience', [{'n': 1, 'bad': True}])
+        self.exporter.flush()
+        self.exporter.flush()
+        self.assertEqual(self.store.reset_failures('motivation'), 0)
+        self.assertEqual(self.store.reset_failures(), 1)
+        self.assertEqual(len(self.store.pending('core_experience')), 1)
+
+    def test_transient_errors_are_not_counted(self):
+        self.store.append('core_experience', [{'n': 1}])
+        self.sheet.error = TransientError('unavailable')
+        for _ in range(3):
+            with self.assertRaises(TransientError):
+                self.exporter.flush()
+        self.sheet.error = None
+        self.assertEqual(self.exporter.flush(), 1)
+        self.assertEqual(self.store.dead_letters(), [])
+
+    def test_runs_filtered_by_prompt_key(self):
+        self.store.append('core_experience', [{'prompt_key': 'a', 'n': 1}, {'prompt_key': 'b', 'n': 2}])
+        self.store.append('motivation', [{'prompt_key': 'a', 'n': 3}])
+        self.assertEqual([data['n'] for data in self.store.runs(prompt_key='a')], [1, 3])
+        self.assertEqual([data['n'] for data in self.store.runs('core_experience', 'a')], [1])
+        self.assertEqual(len(self.store.runs()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+
+from benchmarks.startup import ENTRY_POINTS, measure
+
+
+class StartupBudgetTest(unittest.TestCase):
+    """진입점 import가 benchmarks/startup.py의 예산 안에 끝나고 무거운 모듈을 불러오지 않는지 확인한다"""
+
+    def test_entry_points(self):
+        for module, (budget_ms, forbidden) in ENTRY_POINTS.items():
+            with self.subTest(module=module):
+                # python -X importtime 하위 프로세스로 재며, 중앙값으로 일시적인 지연을 흡수한다
+                total_ms, entries = measure(module)
+                imported = {name for name, _, _, _ in entries}
+                self.assertEqual(sorted(name for name in forbidden if name in imported), [])
+                self.assertLessEqual(total_ms, budget_ms, f"{module} import took {total_ms:.1f}ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import math
+import os
+import tempfile
+import unittest
+
+from use_llm.token_budget import (MIN_MAX_TOKENS, TOKEN_BUDGET_MARGIN, TOKEN_BUDGET_MIN_SAMPLES, TokenBudget,
+                                  detect_language, estimate_tokens, parse_max_length)
+
+
+def calibrated(model='gpt-4o', language='ko', ratio=2.0, count=TOKEN_BUDGET_MIN_SAMPLES):
+    return TokenBudget({f"{model}|{language}": [ratio] * count})
+
+
+class ParseMaxLengthTest(unittest.TestCase):
+    def test_formats(self):
+        self.assertEqual(parse_max_length('지원 동기를 작성해 주세요. (1,000자 이내)'), 1000)
+        self.assertEqual(parse_max_length('성장 과정 500 자'), 500)
+        self.assertEqual(parse_max_length('12,345자'), 12345)
+
+    def test_missing(self):
+        self.assertIsNone(parse_max_length(None))
+        self.assertIsNone(parse_max_length(''))
+        self.assertIsNone(parse_max_length('글자 수 제한 없음'))
+
+
+class LimitMaxTokensTest(unittest.TestCase):
+    def test_without_calibration_keeps_max_tokens(self):
+        self.assertEqual(TokenBudget().limit_max_tokens('gpt-4o', 1000, 4000), 4000)
+        few = calibrated(count=TOKEN_BUDGET_MIN_SAMPLES - 1)
+        self.assertEqual(few.limit_max_tokens('gpt-4o', 1000, 4000), 4000)
+
+    def test_without_max_length_keeps_max_tokens(self):
+        self.assertEqual(calibrated().limit_max_tokens('gpt-4o', None, 4000), 4000)
+
+    def test_predicts_and_caps(self):
+        predicted = math.ceil(1000 / 2.0 * (1 + TOKEN_BUDGET_MARGIN))
+        budget = calibrated()
+        self.assertEqual(budget.limit_max_tokens('gpt-4o', 1000, 4000), predicted)
+        self.assertEqual(budget.limit_max_tokens('gpt-4o', 1000, '300'), 300)
+        self.assertEqual(budget.limit_max_tokens('gpt-4o', 1000, None), predicted)
+        self.assertEqual(budget.limit_max_tokens('gpt-4o', 1000, 4000, extra_tokens=1024), predicted + 1024)
+
+    def test_minimum_budget(self):
+        self.assertEqual(calibrated().limit_max_tokens('gpt-4o', 10, 4000), MIN_MAX_TOKENS)
+
+    def test_language_is_separate(self):
+        self.assertEqual(calibrated().limit_max_tokens('gpt-4o', 1000, 4000, language='en'), 4000)
+
+    def test_snapshot_names_share_calibration(self):
+        budget = TokenBudget()
+        for _ in range(TOKEN_BUDGET_MIN_SAMPLES):
+            self.assertTrue(budget.observe('gpt-4o-2024-08-06', '가' * 200, 100))
+        self.assertEqual(budget.chars_per_token('gpt-4o'), 2.0)
+        self.assertEqual(budget.chars_per_token('gpt-4o-2024-11-20'), 2.0)
+
+    def test_observe_skips_unusable_rows(self):
+        budget = TokenBudget()
+        self.assertFalse(budget.observe('gpt-4o', '', 10))
+        self.assertFalse(budget.observe('gpt-4o', '답변', 0))
+        self.assertFalse(budget.observe('gpt-4o', '답변', 'n/a'))
+        self.assertFalse(budget.observe('claude-3-7-sonnet', '답변', 10, thinking='생각'))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'token_budget.json')
+            calibrated().save(path)
+            self.assertEqual(TokenBudget.load(path).chars_per_token('gpt-4o'), 2.0)
+            self.assertIsNone(TokenBudget.load(os.path.join(directory, 'missing.json')).chars_per_token('gpt-4o'))
+
+
+class EstimateTest(unittest.TestCase):
+    def test_detect_language(self):
+        self.assertEqual(detect_language('안녕하세요 hello'), 'ko')
+        self.assertEqual(detect_language('Hello, 세계'), 'en')
+        self.assertEqual(detect_language('1234'), 'en')
+
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens('abcdefgh'), 2)
+        self.assertEqual(estimate_tokens('abcde가나'), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import itertools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from use_llm import translation_cache
+from use_llm.translation_cache import TranslationCache, get_translation_cache, translation_key
+
+
+class TranslationCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        # 같은 시각으로 기록되어 LRU 순서가 섞이지 않도록 시계를 1초씩 진행시킨다
+        clock = itertools.count(1000)
+        patcher = mock.patch('use_llm.translation_cache.time.time', side_effect=lambda: float(next(clock)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_keys(self):
+        self.assertEqual(translation_key('원문', 'gpt-4o', 0), translation_key('원문', 'gpt-4o', '0'))
+        self.assertNotEqual(translation_key('원문', 'gpt-4o', 0), translation_key('원문', 'gpt-4o-mini', 0))
+        self.assertEqual(translation_key('원문', 'gpt-4o', 0, 'key'), translation_key('다른 원문', 'gpt-4o', 0, 'key'))
+        self.assertNotEqual(translation_key('key', 'gpt-4o', 0), translation_key('원문', 'gpt-4o', 0, 'key'))
+
+    def test_get_and_set(self):
+        cache = TranslationCache(self.path('translations.sqlite3'))
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 'translated', 'gpt-4o-2024-08-06')
+        self.assertEqual(cache.get('a'), ('translated', 'gpt-4o-2024-08-06'))
+
+    def test_evicts_least_recently_used(self):
+        cache = TranslationCache(self.path('translations.sqlite3'), max_bytes=25)
+        cache.set('a', 'x' * 10, 'm')
+        cache.set('b', 'y' * 10, 'm')
+        cache.get('a')
+        cache.set('c', 'z' * 10, 'm')
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+
+
+class TranslationCacheModeTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = TranslationCache(os.path.join(directory.name, 'translations.sqlite3'))
+        patcher = mock.patch.object(translation_cache, '_default_translation_cache', cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = cache
+
+    def mode(self, mode):
+        patcher = mock.patch.object(translation_cache, 'TRANSLATION_CACHE_MODE', mode)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_auto_caches_only_zero_temperature(self):
+        self.mode('auto')
+        self.assertIs(get_translation_cache(0), self.cache)
+        self.assertIs(get_translation_cache('0.0'), self.cache)
+        self.assertIsNone(get_translation_cache(0.7))
+        self.assertIsNone(get_translation_cache(''))
+        self.assertIsNone(get_translation_cache())
+
+    def test_on_and_off(self):
+        self.mode('on')
+        self.assertIs(get_translation_cache(0.7), self.cache)
+        self.mode('off')
+        self.assertIsNone(get_translation_cache(0))
+
+    def test_invalid_mode(self):
+        self.mode('yes')
+        with self.assertRaises(ValueError):
+            get_translation_cache(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# (provider, model, temperature, max_tokens, thinking) -> LLM 인스턴스
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _normalize_number(value, cast):
+    """시트에서 읽은 문자열 설정값('1', '4000')을 숫자로 맞추는 함수 (캐시 키 통일용)"""
+    if value is None or value == '':
+        return None
+    return cast(value)
+
+
+def _thinking_key(thinking):
+    if not thinking:
+        return None
+    return tuple(sorted(thinking.items()))
+
+
+def create_chat_model(provider, thinking=None, **kwargs):
+    """제공자 SDK로 새 LLM 인스턴스를 만드는 함수 (kwargs는 ChatOpenAI/ChatAnthropic 인자)"""
+    # 제공자 SDK는 무거우므로 실제로 쓰는 제공자만 불러온다
+    if provider == 'openai':
+        from langchain_openai import ChatOpenAI
+        # 스트리밍 응답의 마지막 조각에도 토큰 사용량을 받는다 (토큰 예산 보정용)
+        return ChatOpenAI(stream_usage=True, **kwargs)
+    if provider == 'anthropic':
+        from langchain_anthropic import ChatAnthropic
+        if thinking:
+            kwargs['thinking'] = dict(thinking)
+        return ChatAnthropic(**kwargs)
+    raise ValueError(f"Invalid provider: {provider}")
+
+
+def get_chat_model(provider, model, temperature=None, max_tokens=None, thinking=None):
+    """설정이 같은 LLM 인스턴스(와 내부 HTTP 연결 풀)를 재사용하여 반환하는 함수
+
+    Args:
+        provider (str): 'openai' 또는 'anthropic'
+        model (str): 모델 이름
+        temperature (float | str | None): 샘플링 온도 (None이면 모델 기본값)
+        max_tokens (int | str | None): 최대 출력 토큰 수 (None이면 모델 기본값)
+        thinking (dict | None): Anthropic extended thinking 설정 ({"type": "enabled", "budget_tokens": N})
+
+    Returns:
+        BaseChatModel: 캐시된 ChatOpenAI 또는 ChatAnthropic 인스턴스
+    """
+    temperature = _normalize_number(temperature, float)
+    max_tokens = _normalize_number(max_tokens, int)
+    key = (provider, model, temperature, max_tokens, _thinking_key(thinking))
+
+    llm = _clients.get(key)
+    if llm is not None:
+        return llm
+
+    with _clients_lock:
+        llm = _clients.get(key)
+        if llm is None:
+            logger.debug("Creating %s client: %s", provider, key)
+            # 재시도는 resilience.retry에서 한 번만 하도록 SDK 자체 재시도를 끈다
+            kwargs = {'model': model, 'max_retries': 0}
+            if temperature is not None:
+                kwargs['temperature'] = temperature
+            if max_tokens is not None:
+                kwargs['max_tokens'] = max_tokens
+            llm = _clients[key] = create_chat_model(provider, thinking=thinking, **kwargs)
+    return llm
+
+
+def clear_clients():
+    """캐시된 LLM 인스턴스를 모두 비우는 함수 (API 키 교체 시 사용)"""
+    with _clients_lock:
+        _clients.clear()
+
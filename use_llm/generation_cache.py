@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 'off' (기본), 'exact': 같은 입력이면 저장된 결과를 반환,
+# 'sample': 입력마다 결과를 GENERATION_CACHE_SAMPLES개까지 모은 뒤에는 모은 결과를 돌아가며 반환 (temperature > 0 실험용)
+GENERATION_CACHE_MODE = os.getenv('GENERATION_CACHE', 'off')
+GENERATION_CACHE_SAMPLES = int(os.getenv('GENERATION_CACHE_SAMPLES', '3'))
+GENERATION_CACHE_PATH = os.getenv('GENERATION_CACHE_PATH', os.path.join('.cache', 'generation_cache.sqlite3'))
+GENERATION_CACHE_MAX_BYTES = int(os.getenv('GENERATION_CACHE_MAX_BYTES', str(100 * 1024 * 1024)))
+GENERATION_CACHE_MODES = ('off', 'exact', 'sample')
+
+# 생성 결과 tuple 중 저장하는 값 (cache_read_tokens, cache_creation_tokens는 API 호출마다 달라 저장하지 않음)
+RESULT_FIELDS = ('content', 'thinking', 'completion_tokens', 'prompt_tokens', 'total_tokens', 'model_name')
+
+
+def generation_key(prompt_key, model, temperature, thinking=None, budget_tokens=None):
+    """(프롬프트 키, 모델, temperature, thinking, budget_tokens)의 sha256 해시를 캐시 키로 반환하는 함수
+
+    prompt_key는 생성 입력을 식별하는 해시로, pipeline.evaluation이 프롬프트 입력 해시(RenderedPrompt.key)와
+    번역 설정으로 만든다. 프롬프트 본문을 다시 해시하지 않는다.
+    max_tokens는 토큰 예산 보정에 따라 실행마다 달라지므로 키에 넣지 않는다 (잘린 결과는 저장하지 않음).
+    """
+    temperature = float(temperature) if temperature not in (None, '') else None
+    budget_tokens = int(budget_tokens) if budget_tokens not in (None, '') else None
+    payload = json.dumps([prompt_key, model, temperature, thinking or None, budget_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class GenerationCache:
+    """생성 결과와 토큰 사용량을 SQLite에 저장하는 캐시
+
+    키마다 결과를 samples개까지 저장한다 (exact 모드는 1개). get은 저장된 결과가 samples개 미만이면 None을
+    반환해 새로 생성하게 하고, 다 모이면 가장 오래 사용하지 않은 결과를 반환하므로 결과들을 돌아가며 쓴다.
+    저장된 결과의 총 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 결과부터 지운다.
+    """
+
+    def __init__(self, mode=GENERATION_CACHE_MODE, samples=GENERATION_CACHE_SAMPLES, path=GENERATION_CACHE_PATH,
+                 max_bytes=GENERATION_CACHE_MAX_BYTES):
+        if mode not in GENERATION_CACHE_MODES:
+            raise ValueError(f"Invalid generation cache mode: {mode} (available: {', '.join(GENERATION_CACHE_MODES)})")
+        if samples < 1:
+            raise ValueError(f"Invalid generation cache samples: {samples}")
+        self.mode = mode
+        self.samples = samples
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            cache_dir = os.path.dirname(self.path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS generations ("
+                "key TEXT NOT NULL, sample INTEGER NOT NULL, result TEXT NOT NULL, "
+                "size INTEGER NOT NULL, created REAL NOT NULL, last_access REAL NOT NULL, "
+                "PRIMARY KEY (key, sample))"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS generations_last_access ON generations (last_access)")
+            self._connection.commit()
+        return self._connection
+
+    def samples_for(self, temperature):
+        """키마다 모을 결과 수 (temperature가 0이면 결과가 하나뿐이므로 sample 모드도 1개)"""
+        if self.mode != 'sample' or not temperature or float(temperature) == 0:
+            return 1
+        return self.samples
+
+    def get(self, key, temperature=None):
+        """저장된 생성 결과 dict(RESULT_FIELDS)를 반환하는 함수 (모을 결과가 남았으면 None)"""
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute(
+                "SELECT sample, result FROM generations WHERE key = ? ORDER BY last_access", (key,)).fetchall()
+            if len(rows) < self.samples_for(temperature):
+                return None
+            sample, result = rows[0]
+            connection.execute("UPDATE generations SET last_access = ? WHERE key = ? AND sample = ?",
+                               (time.time(), key, sample))
+            connection.commit()
+            return json.loads(result)
+
+    def set(self, key, result, temperature=None):
+        """생성 결과 dict를 새 sample로 저장하는 함수 (이미 다 모았으면 저장하지 않음)
+
+        Returns:
+            bool: 저장했으면 True
+        """
+        encoded = json.dumps({field: result.get(field) for field in RESULT_FIELDS}, ensure_ascii=False)
+        size = len(encoded.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            stored, last_sample = connection.execute(
+                "SELECT COUNT(*), MAX(sample) FROM generations WHERE key = ?", (key,)).fetchone()
+            if stored >= self.samples_for(temperature):
+                return False
+            # 중간 sample이 정리되었을 수 있으므로 개수가 아니라 마지막 번호 다음으로 저장한다
+            sample = 0 if last_sample is None else last_sample + 1
+            connection.execute(
+                "INSERT INTO generations (key, sample, result, size, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (key, sample, encoded, size, now, now))
+            self._evict(connection)
+            connection.commit()
+            return True
+
+    def _evict(self, connection):
+        total_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM generations").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        evicted = 0
+        rows = connection.execute("SELECT key, sample, size FROM generations ORDER BY last_access").fetchall()
+        for key, sample, size in rows:
+            if total_size <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM generations WHERE key = ? AND sample = ?", (key, sample))
+            total_size -= size
+            evicted += 1
+        logger.debug("Evicted %s generation cache entries", evicted)
+
+    def clear(self):
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM generations")
+            connection.commit()
+
+
+_default_generation_cache = None
+_default_generation_cache_lock = threading.Lock()
+
+
+def get_generation_cache():
+    """공용 GenerationCache를 반환하는 함수 (GENERATION_CACHE=off이면 None)"""
+    global _default_generation_cache
+    if GENERATION_CACHE_MODE == 'off':
+        return None
+    with _default_generation_cache_lock:
+        if _default_generation_cache is None:
+            _default_generation_cache = GenerationCache()
+    return _default_generation_cache
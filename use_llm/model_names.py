@@ -0,0 +1,24 @@
+import re
+
+# 응답의 model_name에 붙는 스냅샷 날짜 ('gpt-4o-2024-08-06', 'claude-3-7-sonnet-20250219')
+SNAPSHOT_SUFFIX_PATTERN = re.compile(r'-(?:\d{4}-\d{2}-\d{2}|\d{8})$')
+LATEST_SUFFIX = '-latest'
+
+
+def base_model_name(model_name):
+    """스냅샷 날짜나 '-latest'를 뗀 기본 모델 이름을 반환하는 함수
+
+    예: 'gpt-4o-2024-08-06' -> 'gpt-4o', 'claude-3-7-sonnet-latest' -> 'claude-3-7-sonnet'
+    """
+    model_name = model_name.strip()
+    if model_name.endswith(LATEST_SUFFIX):
+        return model_name[:-len(LATEST_SUFFIX)]
+    return SNAPSHOT_SUFFIX_PATTERN.sub('', model_name)
+
+
+def model_name_candidates(model_name):
+    """가격표처럼 모델 이름으로 찾는 표에서 시도할 이름 목록 (원래 이름, 기본 이름, 기본 이름-latest 순)"""
+    model_name = model_name.strip()
+    base = base_model_name(model_name)
+    candidates = [model_name, base, base + LATEST_SUFFIX]
+    return list(dict.fromkeys(candidates))
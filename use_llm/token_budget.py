@@ -0,0 +1,202 @@
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import deque
+
+from use_llm.model_names import base_model_name
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUDGET_PATH = os.getenv('TOKEN_BUDGET_PATH', os.path.join('.cache', 'token_budget.json'))
+# 보정값을 쓰기 위한 최소 관측 수 (부족하면 예측하지 않고 기존 max_tokens를 쓴다)
+TOKEN_BUDGET_MIN_SAMPLES = int(os.getenv('TOKEN_BUDGET_MIN_SAMPLES', '5'))
+# 토큰당 글자 수의 하위 분위수 (작을수록 넉넉한 예산)
+TOKEN_BUDGET_QUANTILE = float(os.getenv('TOKEN_BUDGET_QUANTILE', '0.1'))
+# 예측값에 더하는 여유 비율
+TOKEN_BUDGET_MARGIN = float(os.getenv('TOKEN_BUDGET_MARGIN', '0.1'))
+# (모델, 언어)별로 보관하는 최근 관측 수
+TOKEN_BUDGET_MAX_SAMPLES = 200
+# 너무 작은 예산으로 답변이 비는 것을 막기 위한 하한
+MIN_MAX_TOKENS = 256
+
+# 문항의 글자 수 제한 표기 ('1,000자 이내', '(500자)')
+MAX_LENGTH_PATTERN = re.compile(r'(\d{1,2}(?:,\d{3})+|\d+)\s*자')
+
+
+def detect_language(text):
+    """한글 음절이 글자(공백, 숫자, 기호 제외)의 절반 이상이면 'ko', 아니면 'en'을 반환하는 함수"""
+    letters = [char for char in text if char.isalpha()]
+    if not letters:
+        return 'en'
+    hangul = sum(1 for char in letters if '가' <= char <= '힣')
+    return 'ko' if hangul * 2 >= len(letters) else 'en'
+
+
+def estimate_tokens(text):
+    """보정 데이터 없이 쓰는 대략적인 토큰 수 (ASCII 4글자당 1토큰, 그 외 글자는 1글자당 1토큰)
+
+    한글은 실제보다 많게 세므로, 한국어 원문으로 센 값은 번역한 영어 텍스트의 토큰 수보다 크다.
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_chars / 4) + len(text) - ascii_chars
+
+
+def parse_max_length(question):
+    """자기소개서 문항에서 글자 수 제한을 찾아 반환하는 함수 (없으면 None)"""
+    if not question:
+        return None
+    match = MAX_LENGTH_PATTERN.search(question)
+    if match is None:
+        return None
+    return int(match.group(1).replace(',', ''))
+
+
+class TokenBudget:
+    """과거 evaluation 결과로 모델별 토큰당 글자 수를 보정하고 max_tokens를 예측하는 클래스
+
+    completion_tokens에는 추론(reasoning) 토큰도 포함되므로, 모델별 보정값에는 추론 비용이 자연히 반영된다.
+    응답의 스냅샷 이름('gpt-4o-2024-08-06')과 요청한 이름('gpt-4o')이 같은 보정값을 쓰도록 모델 이름은 기본 이름으로 맞춘다.
+    Anthropic extended thinking 결과는 thinking 토큰을 따로 알 수 없어 보정에서 제외한다.
+    """
+
+    def __init__(self, samples=None):
+        self._samples = {}
+        self._lock = threading.Lock()
+        for key, ratios in (samples or {}).items():
+            model, language = key.rsplit('|', 1)
+            for ratio in ratios:
+                self._add(model, language, ratio)
+
+    def _add(self, model, language, ratio):
+        key = (base_model_name(model), language)
+        if key not in self._samples:
+            self._samples[key] = deque(maxlen=TOKEN_BUDGET_MAX_SAMPLES)
+        self._samples[key].append(ratio)
+
+    def observe(self, model, text, completion_tokens, thinking=None):
+        """생성 결과 하나(모델, 결과 텍스트, 출력 토큰 수)를 보정값에 반영하는 함수
+
+        Returns:
+            bool: 반영했으면 True (빈 결과, 토큰 0, thinking 결과는 건너뛴다)
+        """
+        try:
+            completion_tokens = int(completion_tokens)
+        except (TypeError, ValueError):
+            return False
+        if not model or not text or completion_tokens <= 0 or thinking:
+            return False
+        with self._lock:
+            self._add(model, detect_language(text), len(text) / completion_tokens)
+        return True
+
+    def load_rows(self, rows):
+        """GoogleSheet.get_token_usage 결과로 보정하는 함수 (반영한 행 수 반환)"""
+        observed = 0
+        for row in rows:
+            if self.observe(row['model_name'], row['result'], row['completion_tokens'], row.get('thinking')):
+                observed += 1
+        logger.info("Token budget calibrated from %s/%s rows", observed, len(rows))
+        return observed
+
+    def chars_per_token(self, model, language='ko'):
+        """(모델, 언어)의 보수적인 토큰당 글자 수 (관측이 부족하면 None)"""
+        with self._lock:
+            ratios = sorted(self._samples.get((base_model_name(model), language), ()))
+        if len(ratios) < TOKEN_BUDGET_MIN_SAMPLES:
+            return None
+        index = min(len(ratios) - 1, int(len(ratios) * TOKEN_BUDGET_QUANTILE))
+        return ratios[index]
+
+    def predict_max_tokens(self, model, max_length, language='ko', extra_tokens=0):
+        """max_length자 답변에 필요한 max_tokens를 예측하는 함수
+
+        Args:
+            model (str): 모델 이름
+            max_length (int): 답변의 최대 글자 수
+            language (str): 답변 언어 ('ko' 또는 'en')
+            extra_tokens (int): 답변 외에 필요한 토큰 (extended thinking의 budget_tokens 등)
+
+        Returns:
+            int | None: 예측한 max_tokens (보정 데이터가 부족하면 None)
+        """
+        ratio = self.chars_per_token(model, language)
+        if ratio is None:
+            return None
+        tokens = math.ceil(max_length / ratio * (1 + TOKEN_BUDGET_MARGIN))
+        return max(tokens, MIN_MAX_TOKENS) + int(extra_tokens or 0)
+
+    def limit_max_tokens(self, model, max_length, max_tokens=None, language='ko', extra_tokens=0):
+        """예측값과 기존 max_tokens 중 작은 값을 반환하는 함수 (예측할 수 없으면 기존 값)"""
+        predicted = self.predict_max_tokens(model, max_length, language, extra_tokens) if max_length else None
+        if predicted is None:
+            return max_tokens
+        if max_tokens not in (None, ''):
+            predicted = min(predicted, int(max_tokens))
+        logger.debug("Token budget for %s (%s자): %s -> %s", model, max_length, max_tokens, predicted)
+        return predicted
+
+    def as_dict(self):
+        with self._lock:
+            return {f"{model}|{language}": list(ratios) for (model, language), ratios in self._samples.items()}
+
+    def save(self, path=TOKEN_BUDGET_PATH):
+        """보정 데이터를 JSON 파일로 저장하는 함수"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=TOKEN_BUDGET_PATH):
+        """저장된 보정 데이터를 읽는 함수 (파일이 없거나 손상되었으면 빈 TokenBudget)"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to read token budget file %s: %s", path, e)
+            return cls()
+
+
+_default_token_budget = None
+_default_token_budget_lock = threading.Lock()
+
+
+def get_default_token_budget():
+    """TOKEN_BUDGET_PATH에서 읽은 공용 TokenBudget을 반환하는 함수"""
+    global _default_token_budget
+    with _default_token_budget_lock:
+        if _default_token_budget is None:
+            _default_token_budget = TokenBudget.load()
+    return _default_token_budget
+
+
+def calibrate_from_sheet(sheet, token_budget=None, path=TOKEN_BUDGET_PATH):
+    """evaluation 시트의 기존 결과로 보정하고 저장하는 함수"""
+    if token_budget is None:
+        token_budget = TokenBudget()
+    token_budget.load_rows(sheet.get_token_usage())
+    token_budget.save(path)
+    return token_budget
+
+
+if __name__ == "__main__":
+    from sheet.modify_sheet import GoogleSheet
+    from telemetry.logging_config import configure_logging
+
+    parser = argparse.ArgumentParser(description="evaluation 시트의 결과로 모델별 토큰 예산을 보정합니다.")
+    parser.add_argument('purpose', choices=['motivation', 'core_experience'])
+    args = parser.parse_args()
+    configure_logging()
+    budget = calibrate_from_sheet(GoogleSheet(args.purpose))
+    for key, ratios in budget.as_dict().items():
+        model, language = key.rsplit('|', 1)
+        print(f"{model} ({language}): {len(ratios)} samples, {budget.chars_per_token(model, language)} chars/token")
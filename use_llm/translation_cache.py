@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_CACHE_PATH = os.getenv('TRANSLATION_CACHE_PATH', os.path.join('.cache', 'translation_cache.sqlite3'))
+TRANSLATION_CACHE_MAX_BYTES = int(os.getenv('TRANSLATION_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+# 'auto' (기본): temperature가 0인 번역만 캐시 ('on'이면 temperature와 관계없이, 'off'이면 캐시하지 않음)
+# temperature > 0인 번역은 실행마다 새로 번역하던 동작을 유지하도록 'on'일 때만 재사용한다
+TRANSLATION_CACHE_MODE = os.getenv('TRANSLATION_CACHE', 'auto')
+TRANSLATION_CACHE_MODES = ('off', 'auto', 'on')
+
+
+def translation_key(text, model, temperature, source_key=None):
+    """(원문, 번역 모델, temperature)의 sha256 해시를 캐시 키로 반환하는 함수
+
+    source_key(원문을 만든 프롬프트 입력의 해시, RenderedPrompt.key)가 있으면 원문 대신 사용한다.
+    """
+    temperature = float(temperature) if temperature not in (None, '') else None
+    source = {'source_key': source_key} if source_key else text
+    payload = json.dumps([source, model, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TranslationCache:
+    """번역 결과를 SQLite에 저장하는 content-addressed 캐시
+
+    저장된 번역의 총 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 지운다.
+    """
+
+    def __init__(self, path=TRANSLATION_CACHE_PATH, max_bytes=TRANSLATION_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            cache_dir = os.path.dirname(self.path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, model_name TEXT, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS translations_last_access ON translations (last_access)")
+            self._connection.commit()
+        return self._connection
+
+    def get(self, key):
+        """캐시된 (content, model_name)을 반환하는 함수 (없으면 None)"""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT content, model_name FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE translations SET last_access = ? WHERE key = ?", (time.time(), key))
+            connection.commit()
+            return row
+
+    def set(self, key, content, model_name):
+        """번역 결과를 저장하고 용량을 넘으면 LRU 순으로 정리하는 함수"""
+        size = len(content.encode('utf-8'))
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO translations (key, content, model_name, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?)", (key, content, model_name, size, time.time()))
+            self._evict(connection)
+            connection.commit()
+
+    def _evict(self, connection):
+        total_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        evicted = 0
+        rows = connection.execute("SELECT key, size FROM translations ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if total_size <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM translations WHERE key = ?", (key,))
+            total_size -= size
+            evicted += 1
+        logger.debug("Evicted %s translation cache entries", evicted)
+
+    def clear(self):
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM translations")
+            connection.commit()
+
+
+_default_translation_cache = None
+_default_translation_cache_lock = threading.Lock()
+
+
+def _is_zero(temperature):
+    try:
+        return temperature not in (None, '') and float(temperature) == 0
+    except (TypeError, ValueError):
+        return False
+
+
+def get_translation_cache(temperature=None):
+    """temperature의 번역에 쓸 공용 TranslationCache를 반환하는 함수
+
+    TRANSLATION_CACHE=off이거나, auto(기본)이고 temperature가 0이 아니면 None을 반환한다.
+    """
+    global _default_translation_cache
+    if TRANSLATION_CACHE_MODE not in TRANSLATION_CACHE_MODES:
+        raise ValueError(f"Invalid translation cache mode: {TRANSLATION_CACHE_MODE} "
+                         f"(available: {', '.join(TRANSLATION_CACHE_MODES)})")
+    if TRANSLATION_CACHE_MODE == 'off' or (TRANSLATION_CACHE_MODE == 'auto' and not _is_zero(temperature)):
+        return None
+    with _default_translation_cache_lock:
+        if _default_translation_cache is None:
+            _default_translation_cache = TranslationCache()
+    return _default_translation_cache